@@ -0,0 +1,128 @@
+# async_database.py
+"""database.py fonksiyonlarının asyncio karşılıkları.
+
+Arayüz içermeyen araçlar ve ileride eklenecek yerel API içindir; tkinter
+import etmez. Okumalar ayrı bir thread havuzunda paralel çalışır, yazmalar
+tek bir yazıcı thread'inde sırayla uygulanır. Her thread database.py'deki
+thread-local bağlantıyı kullandığından havuzun bağlantıları arayüzün
+bağlantılarından ayrıdır; WAL modunda okumalar yazıcıyı beklemez.
+
+Örnek:
+    rows = await async_fetch_all("SELECT * FROM products WHERE branch_id = ?", (1,))
+    trans_id = await async_add_transaction(1, "GELIR", 100.0, "NAKIT", "2024-01-01")
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+# Eşzamanlı okuma thread'i sayısı (sqlite3 sorgu sırasında GIL'i bırakır)
+ASYNC_READ_WORKERS = min(4, os.cpu_count() or 1)
+
+_readers = None
+_writer = None
+_executors_lock = threading.Lock()
+
+
+def _get_executors():
+    global _readers, _writer
+    with _executors_lock:
+        if _readers is None:
+            _readers = ThreadPoolExecutor(max_workers=ASYNC_READ_WORKERS, thread_name_prefix="db-async-read")
+            _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-async-write")
+        return _readers, _writer
+
+
+def shutdown_async_database():
+    """Havuzları kapatır (çalışan işler bitirilir); ardından database.shutdown_database çağrılabilir"""
+    global _readers, _writer
+    with _executors_lock:
+        executors = (_readers, _writer)
+        _readers = _writer = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _async_reader(func):
+    """Senkron okuma fonksiyonunu okuma havuzunda çalışan coroutine'e çevirir"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        readers, _ = _get_executors()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(readers, functools.partial(func, *args, **kwargs))
+    wrapper.__name__ = wrapper.__qualname__ = f"async_{func.__name__}"
+    return wrapper
+
+
+def _async_writer(func):
+    """Senkron yazma fonksiyonunu tek yazıcı thread'inde çalışan coroutine'e çevirir.
+
+    Yazmalar gönderildikleri sırayla, birbiri ardına uygulanır.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        _, writer = _get_executors()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(writer, functools.partial(func, *args, **kwargs))
+    wrapper.__name__ = wrapper.__qualname__ = f"async_{func.__name__}"
+    return wrapper
+
+
+# === OKUMALAR ===
+async_fetch_all = _async_reader(database.fetch_all)
+async_fetch_one = _async_reader(database.fetch_one)
+
+async_get_all_branches = _async_reader(database.get_all_branches)
+async_get_branch_by_id = _async_reader(database.get_branch_by_id)
+
+async_get_all_products = _async_reader(database.get_all_products)
+async_search_products = _async_reader(database.search_products)
+async_get_product_by_barcode = _async_reader(database.get_product_by_barcode)
+async_get_low_stock_products = _async_reader(database.get_low_stock_products)
+async_validate_stock_movements = _async_reader(database.validate_stock_movements)
+
+async_get_stock_movements_report = _async_reader(database.get_stock_movements_report)
+async_get_stock_movements_page = _async_reader(database.get_stock_movements_page)
+async_get_stock_movements_summary = _async_reader(database.get_stock_movements_summary)
+
+async_get_all_suppliers = _async_reader(database.get_all_suppliers)
+async_get_supplier_overview = _async_reader(database.get_supplier_overview)
+async_get_supplier_balances = _async_reader(database.get_supplier_balances)
+async_count_suppliers = _async_reader(database.count_suppliers)
+async_get_supplier_total_balance = _async_reader(database.get_supplier_total_balance)
+async_get_due_supplier_balances = _async_reader(database.get_due_supplier_balances)
+async_get_supplier_transaction_history = _async_reader(database.get_supplier_transaction_history)
+async_get_due_payments = _async_reader(database.get_due_payments)
+
+async_get_transactions = _async_reader(database.get_transactions)
+async_get_transactions_page = _async_reader(database.get_transactions_page)
+async_get_transactions_summary = _async_reader(database.get_transactions_summary)
+async_get_daily_total = _async_reader(database.get_daily_total)
+async_get_period_summary = _async_reader(database.get_period_summary)
+async_get_transaction_stats = _async_reader(database.get_transaction_stats)
+
+# === YAZMALAR (tek yazıcı) ===
+async_execute_query = _async_writer(database.execute_query)
+
+async_create_branch = _async_writer(database.create_branch)
+
+async_add_product = _async_writer(database.add_product)
+async_update_product_quantity = _async_writer(database.update_product_quantity)
+async_apply_stock_movements = _async_writer(database.apply_stock_movements)
+async_apply_barcode_scan = _async_writer(database.apply_barcode_scan)
+async_update_product_info = _async_writer(database.update_product_info)
+async_delete_product = _async_writer(database.delete_product)
+
+async_add_supplier = _async_writer(database.add_supplier)
+async_update_supplier = _async_writer(database.update_supplier)
+async_delete_supplier = _async_writer(database.delete_supplier)
+async_add_smart_balance_transaction = _async_writer(database.add_smart_balance_transaction)
+async_update_balance_status = _async_writer(database.update_balance_status)
+
+async_add_transaction = _async_writer(database.add_transaction)
+async_update_transaction = _async_writer(database.update_transaction)
+async_delete_transaction = _async_writer(database.delete_transaction)
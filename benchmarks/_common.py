@@ -0,0 +1,29 @@
+# benchmarks/_common.py
+"""Benchmark betikleri için ortak yardımcılar.
+
+Betikler depo kökünden çalıştırılır (python benchmarks/<betik>.py) ve
+business_manager.db'ye dokunmaz; her ölçüm geçici bir veritabanında yapılır.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+
+def use_temp_database(name="bench.db"):
+    """database modülünü yeni, şemaları kurulmuş geçici bir veritabanına yönlendirir"""
+    database.close_all_connections()
+    database.DB_NAME = os.path.join(tempfile.mkdtemp(prefix="bm-bench-"), name)
+    database.initialize_database()
+    return database.DB_NAME
+
+
+def timed(func, *args, **kwargs):
+    """(sonuç, geçen süre saniye) döner"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
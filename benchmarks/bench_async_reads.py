@@ -0,0 +1,113 @@
+# benchmarks/bench_async_reads.py
+"""async_database okuma hızı: sıralı senkron çağrılar ile asyncio.gather karşılaştırması.
+
+Geçici veritabanına stok hareketleri eklenir, ardından aynı keyset sayfa sorgusu
+önce sırayla senkron, sonra async_database üzerinden eşzamanlı çalıştırılır.
+Olay döngüsünün en uzun gecikmesi (loop lag) de raporlanır; ağır bir toplama
+sorgusu senkron çalışırken döngüyü ne kadar bloklardı, facade ile ne kadar.
+
+    python benchmarks/bench_async_reads.py --rows 200000 --queries 400 --workers 4
+"""
+import argparse
+import asyncio
+import time
+
+from _common import database, timed, use_temp_database
+
+import async_database
+
+PAGE_QUERY = '''
+    SELECT * FROM stock_movements
+    WHERE branch_id = ? AND date >= ?
+    ORDER BY date DESC, id DESC
+    LIMIT 200
+'''
+HEAVY_QUERY = '''
+    SELECT product_id, type, COUNT(*) AS n, SUM(quantity) AS total
+    FROM stock_movements WHERE branch_id = ?
+    GROUP BY product_id, type
+'''
+TICK = 0.005
+
+
+def _seed(rows):
+    branch_id = database.create_branch("Benchmark")
+    with database.transaction() as cursor:
+        cursor.executemany('''
+            INSERT INTO products (branch_id, name, name_key, barcode, quantity, created_date)
+            VALUES (?, ?, ?, NULL, 0, '2025-01-01 00:00:00')
+        ''', [(branch_id, f"Ürün {i}", database.turkish_sort_key(f"Ürün {i}")) for i in range(1000)])
+        cursor.executemany('''
+            INSERT INTO stock_movements
+                (product_id, branch_id, type, quantity, old_quantity, new_quantity, note, date)
+            VALUES (?, ?, ?, 1, 0, 1, '', ?)
+        ''', [(i % 1000 + 1, branch_id, "IN" if i % 2 else "OUT",
+               f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:00:00") for i in range(rows)])
+    return branch_id
+
+
+async def _measure(coro_factory):
+    """coro_factory()'yi çalıştırırken olay döngüsünün en uzun gecikmesini ölçer"""
+    lag = 0.0
+    
+    async def ticker():
+        nonlocal lag
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lag = max(lag, time.perf_counter() - started - TICK)
+    
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(TICK * 2)  # bloklanan tick'in gecikmesi de ölçülsün
+    task.cancel()
+    return elapsed, lag
+
+
+async def _run_async(branch_id, queries):
+    params = (branch_id, "2025-01-01")
+    await async_database.async_fetch_all(PAGE_QUERY, params)  # havuzu ısıt
+    
+    async def pages():
+        await asyncio.gather(*[async_database.async_fetch_all(PAGE_QUERY, params) for _ in range(queries)])
+    
+    async def blocking_heavy():
+        database.fetch_all(HEAVY_QUERY, (branch_id,))
+    
+    async def async_heavy():
+        await async_database.async_fetch_all(HEAVY_QUERY, (branch_id,))
+    
+    return (await _measure(pages), await _measure(blocking_heavy), await _measure(async_heavy))
+
+
+def run(rows, queries, workers):
+    async_database.ASYNC_READ_WORKERS = workers
+    use_temp_database()
+    branch_id = _seed(rows)
+    
+    params = (branch_id, "2025-01-01")
+    database.fetch_all(PAGE_QUERY, params)
+    _, sequential = timed(lambda: [database.fetch_all(PAGE_QUERY, params) for _ in range(queries)])
+    
+    (gathered, page_lag), (heavy, heavy_lag), (_, async_heavy_lag) = asyncio.run(_run_async(branch_id, queries))
+    
+    print(f"{rows:,} hareket, {queries} sayfa sorgusu (200 satır)")
+    print(f"  senkron, sıralı   : {queries / sequential:8,.0f} sorgu/s")
+    print(f"  async, {workers} okuyucu : {queries / gathered:8,.0f} sorgu/s, en uzun döngü gecikmesi {page_lag * 1000:.1f} ms")
+    print(f"  ağır toplama ({heavy * 1000:.0f} ms): senkron çağrıda döngü gecikmesi {heavy_lag * 1000:.1f} ms, "
+          f"facade ile {async_heavy_lag * 1000:.1f} ms")
+    async_database.shutdown_async_database()
+    database.shutdown_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000, help="stok hareketi sayısı")
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=async_database.ASYNC_READ_WORKERS,
+                        help="okuma thread'i sayısı (ASYNC_READ_WORKERS)")
+    args = parser.parse_args()
+    run(args.rows, args.queries, args.workers)
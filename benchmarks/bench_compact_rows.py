@@ -0,0 +1,117 @@
+# benchmarks/bench_compact_rows.py
+"""Büyük stok hareket raporu: dict satırlar ile compact satırların süresi ve bellek tepesi.
+
+Geçici veritabanına N stok hareketi yazılır. Her mod ayrı bir alt süreçte
+get_stock_movements_report(compact=...) çağırır ve satırların üzerinden bir
+kez geçer; böylece her ölçümün tepe RSS değeri yalnızca o moda aittir.
+
+    python benchmarks/bench_compact_rows.py --rows 200000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+
+from _common import database, timed, use_temp_database
+
+PRODUCTS = 1000
+
+
+def _seed(rows):
+    branch_id = database.create_branch("Benchmark")
+    with database.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO products (branch_id, name, barcode, quantity, min_stock, unit_price, created_date) "
+            "VALUES (?, ?, ?, ?, 10, 1, '2025-01-01 00:00:00')",
+            ((branch_id, f"Ürün {i:04d}", f"869{i:010d}", rows) for i in range(PRODUCTS))
+        )
+        product_ids = [row[0] for row in cursor.execute("SELECT id FROM products ORDER BY id")]
+    # Hareketler uygulamanın toplu yolundan yazılır; başlangıç stoğu çıkışları karşılar
+    database.apply_stock_movements(branch_id, [
+        (product_ids[i % PRODUCTS], "IN" if i % 2 else "OUT", 1 + i % 9, "teslimat" if i % 2 else "satış")
+        for i in range(rows)
+    ])
+    return branch_id
+
+
+def _report_pass(branch_id, compact):
+    """Raporu alır ve rapor ekranının yaptığı gibi her satırdan birkaç alan okur"""
+    rows = database.get_stock_movements_report(branch_id, compact=compact)
+    total_in = total_out = 0
+    if compact:
+        c = rows.columns
+        type_i, qty_i, name_i = c['type'], c['quantity'], c['product_name']
+        for row in rows:
+            if row[type_i] == "IN":
+                total_in += row[qty_i]
+            else:
+                total_out += row[qty_i]
+            row[name_i]
+    else:
+        for row in rows:
+            if row['type'] == "IN":
+                total_in += row['quantity']
+            else:
+                total_out += row['quantity']
+            row['product_name']
+    return len(rows), total_in, total_out
+
+
+def _peak_rss_mb():
+    """Sürecin tepe RSS değeri (MB).
+
+    Linux'ta /proc/self/status VmHWM okunur; ru_maxrss exec sonrasında üst
+    sürecin tepe değerini taşıyabildiğinden yalnızca yedek olarak kullanılır.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(db_name, branch_id, mode):
+    database.DB_NAME = db_name
+    rss_before = _peak_rss_mb()
+    result, elapsed = timed(_report_pass, branch_id, mode == "compact")
+    rss_peak = _peak_rss_mb()
+    print(json.dumps({"rows": result[0], "ms": elapsed * 1000,
+                      "peak_mb": rss_peak, "delta_mb": rss_peak - rss_before}))
+
+
+def run(rows):
+    db_name = use_temp_database()
+    branch_id, elapsed = timed(_seed, rows)
+    database.close_all_connections()
+    print(f"{rows} stok hareketi ({elapsed:.1f} s hazırlık)")
+
+    results = {}
+    for mode in ("dict", "compact"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--db", db_name, "--branch", str(branch_id)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+        r = results[mode]
+        print(f"  {mode:>7}: {r['ms']:8.1f} ms | tepe RSS {r['peak_mb']:6.1f} MB "
+              f"(rapor için +{r['delta_mb']:.1f} MB) | {r['rows']} satır")
+
+    d, c = results["dict"], results["compact"]
+    print(f"  compact: süre {c['ms'] / d['ms']:.2f}x, ek bellek {c['delta_mb'] / max(d['delta_mb'], 0.1):.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--child", choices=("dict", "compact"), help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--branch", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.db, args.branch, args.child)
+    else:
+        run(args.rows)
@@ -0,0 +1,98 @@
+# benchmarks/bench_pragma_profile.py
+"""PRAGMA profili karşılaştırması: yazma hızı, okuma süresi ve okuma altında yazma gecikmesi.
+
+Eski ayarlar (DELETE journal, synchronous=FULL) ile database.PRAGMA_PROFILE
+(WAL, synchronous=NORMAL, ...) ayrı geçici veritabanlarında ölçülür:
+  - tek satırlık add_transaction commit'leri (commit/s)
+  - işlem tablosu üzerinde tarih aralığı toplamı (rapor sorgusu) süresi
+  - başka bir bağlantı uzun bir rapor okurken tek kaydın commit süresi
+
+    python benchmarks/bench_pragma_profile.py --writes 500 --rows 50000
+"""
+import argparse
+import threading
+import time
+
+from _common import database, timed, use_temp_database
+
+LEGACY_PROFILE = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "busy_timeout": 5000,
+}
+
+# Okuyucunun rapor satırları arasında bekleyeceği süre (s); yazma bu süre boyunca okumayla çakışır
+READER_HOLD = 0.3
+
+
+def _seed(branch_id, rows):
+    with database.transaction() as cursor:
+        for i in range(rows):
+            date = f"2025-01-{i % 28 + 1:02d} 10:00:00"
+            cursor.execute('''
+                INSERT INTO transactions (branch_id, type, amount, payment_method, date, description)
+                VALUES (?, ?, ?, 'NAKIT', ?, 'bench')
+            ''', (branch_id, "GELIR" if i % 3 else "GIDER", 1 + i % 50, date))
+
+
+REPORT_QUERY = '''
+    SELECT type, COUNT(*) AS n, SUM(amount) AS total FROM transactions
+    WHERE branch_id = ? AND date >= ? AND date < ?
+    GROUP BY type
+'''
+
+
+def _write_under_read(branch_id):
+    """Okuyucu açık bir rapor sorgusunun ortasındayken bir kaydın commit süresini ölçer"""
+    reading = threading.Event()
+    
+    def reader():
+        # Thread'in kendi bağlantısında açık kalan imleç okuma işlemini sürdürür
+        rows = database.get_db_connection().execute(
+            "SELECT * FROM transactions WHERE branch_id = ? ORDER BY date, id", (branch_id,)
+        )
+        next(rows)
+        reading.set()
+        time.sleep(READER_HOLD)
+        for _ in rows:
+            pass
+        database.close_db_connection()
+    
+    thread = threading.Thread(target=reader)
+    thread.start()
+    reading.wait()
+    _, elapsed = timed(database.add_transaction, branch_id, "GELIR", 1.0, "NAKIT")
+    thread.join()
+    return elapsed
+
+
+def run(name, profile, writes, rows):
+    database.PRAGMA_PROFILE = profile
+    use_temp_database(f"{name}.db")
+    branch_id = database.create_branch("Benchmark")
+    
+    _, elapsed = timed(lambda: [database.add_transaction(branch_id, "GELIR", 1.0, "NAKIT") for _ in range(writes)])
+    write_rate = writes / elapsed
+    
+    _seed(branch_id, rows)
+    params = (branch_id, "2025-01-01", "2025-01-29")
+    database.fetch_all(REPORT_QUERY, params)
+    repeats = 20
+    _, elapsed = timed(lambda: [database.fetch_all(REPORT_QUERY, params) for _ in range(repeats)])
+    read_ms = elapsed / repeats * 1000
+    
+    blocked_ms = _write_under_read(branch_id) * 1000
+    print(f"{name:>8}: {write_rate:8,.0f} commit/s | rapor toplamı {read_ms:6.2f} ms | "
+          f"okuma sırasında commit {blocked_ms:7.1f} ms")
+    database.shutdown_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writes", type=int, default=500, help="ölçülen tek satırlık commit sayısı")
+    parser.add_argument("--rows", type=int, default=50000, help="okuma ölçümü için işlem satırı")
+    args = parser.parse_args()
+    
+    current = dict(database.PRAGMA_PROFILE)
+    run("eski", LEGACY_PROFILE, args.writes, args.rows)
+    run("profil", current, args.writes, args.rows)
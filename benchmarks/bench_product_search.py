@@ -0,0 +1,70 @@
+# benchmarks/bench_product_search.py
+"""Yazarken arama: 100k ürünlük katalogda search_products süresi ve 10 ms hedefi.
+
+Geçici veritabanına N ürün yazılır (arama indeksi add_product'ın kullandığı
+_sync_product_search ile doldurulur). Ardından birkaç aramanın her harfi,
+arama kutusunda yazılıyormuş gibi sırayla sorgulanır. Her önek için en iyi
+ve ortanca süre yazılır; en iyi süre hedefi aşan önek varsa betik 1 ile çıkar.
+
+    python benchmarks/bench_product_search.py --products 100000
+"""
+import argparse
+import statistics
+
+from _common import database, timed, use_temp_database
+
+BRANDS = ["Ülker", "Eti", "Pınar", "Sütaş", "Torku", "Doğadan", "Çaykur", "Tat", "Tamek", "Şölen"]
+ITEMS = ["Süt", "Çay", "Bisküvi", "Kraker", "Peynir", "Yoğurt", "Makarna", "Salça", "Çikolata", "Gofret",
+         "Ayran", "Kahve", "Pirinç", "Bulgur", "Zeytin", "Reçel", "Bal", "Un", "Şeker", "Tuz"]
+SIZES = ["200 g", "500 g", "1 kg", "1 L", "2 L", "330 ml", "12'li", "5 kg"]
+
+TYPED = ["süt", "çaykur", "8690000012", "bisküvi 500"]
+
+
+def _seed(products):
+    branch_id = database.create_branch("Benchmark")
+    with database.transaction() as cursor:
+        for i in range(products):
+            name = f"{BRANDS[i % 10]} {ITEMS[i // 10 % 20]} {SIZES[i // 200 % 8]} #{i}"
+            barcode = f"869{i:010d}"
+            name_key = database.turkish_sort_key(name)
+            cursor.execute('''
+                INSERT INTO products (branch_id, name, name_key, barcode, quantity, min_stock, unit_price, created_date)
+                VALUES (?, ?, ?, ?, ?, 10, 1, '2025-01-01 00:00:00')
+            ''', (branch_id, name, name_key, barcode, i % 40))
+            database._sync_product_search(cursor, cursor.lastrowid, new=(name_key, barcode))
+    return branch_id
+
+
+def run(products, repeats, budget_ms):
+    use_temp_database()
+    branch_id, elapsed = timed(_seed, products)
+    print(f"{products} ürün ({elapsed:.1f} s hazırlık)")
+
+    slowest = 0.0
+    for text in TYPED:
+        for end in range(1, len(text) + 1):
+            query = text[:end]
+            database.search_products(branch_id, query)
+            timings = []
+            for _ in range(repeats):
+                rows, elapsed = timed(database.search_products, branch_id, query)
+                timings.append(elapsed * 1000)
+            best = min(timings)
+            slowest = max(slowest, best)
+            print(f"  {query!r:>14}: en iyi {best:6.2f} ms, ortanca {statistics.median(timings):6.2f} ms, "
+                  f"{len(rows)} sonuç")
+
+    ok = slowest < budget_ms
+    print(f"  en yavaş önek {slowest:.2f} ms, hedef {budget_ms:.0f} ms: {'tamam' if ok else 'AŞILDI'}")
+    database.close_all_connections()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.products, args.repeats, args.budget_ms) else 1)
@@ -0,0 +1,68 @@
+# benchmarks/bench_smart_balance.py
+"""Eşzamanlı akıllı bakiye kayıtları: saniyedeki kayıt sayısı ve bakiye tutarlılığı.
+
+Birden fazla thread aynı toptancıya ALIS/ALACAK kaydeder. Her kayıt
+add_smart_balance_transaction ile tek BEGIN IMMEDIATE işleminde yapılır;
+sonunda suppliers.balance hem beklenen toplamla hem de supplier_balances
+satırlarından yeniden hesaplanan bakiyeyle karşılaştırılır.
+
+    python benchmarks/bench_smart_balance.py --threads 8 --postings 100
+"""
+import argparse
+import threading
+
+from _common import database, timed, use_temp_database
+
+
+def run(threads, postings):
+    use_temp_database()
+    branch_id = database.create_branch("Benchmark")
+    supplier_id = database.add_supplier(branch_id, "Benchmark Toptan", "Gıda")
+    failures = []
+    
+    def posting(thread_no, i):
+        """(işlem türü, tutar); ALIS bakiyeden düşer, ALACAK ekler"""
+        transaction_type = "ALACAK" if i % 3 == 0 else "ALIS"
+        return transaction_type, 1 + thread_no
+    
+    def worker(thread_no):
+        for i in range(postings):
+            transaction_type, amount = posting(thread_no, i)
+            if database.add_smart_balance_transaction(supplier_id, transaction_type, amount) is None:
+                failures.append((thread_no, i))
+        database.close_db_connection()
+    
+    def post_all():
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    
+    _, elapsed = timed(post_all)
+    total = threads * postings
+    
+    stored = database.fetch_one("SELECT balance FROM suppliers WHERE id = ?", (supplier_id,))['balance']
+    expected = 0.0
+    for thread_no in range(threads):
+        for i in range(postings):
+            transaction_type, amount = posting(thread_no, i)
+            expected += -amount if transaction_type == "ALIS" else amount
+    recomputed = database.fetch_one('''
+        SELECT COALESCE(SUM(CASE WHEN type = 'ALACAK' THEN amount ELSE -amount END), 0) AS balance
+        FROM supplier_balances WHERE supplier_id = ? AND status = 'AKTIF'
+    ''', (supplier_id,))['balance']
+    
+    print(f"{threads} thread x {postings} kayıt = {total} kayıt, {elapsed:.2f} s")
+    print(f"  {total / elapsed:,.0f} kayıt/s, başarısız: {len(failures)}")
+    print(f"  bakiye: saklanan {stored:.2f}, beklenen {expected:.2f}, hesaplanan {recomputed:.2f}")
+    database.close_all_connections()
+    return not failures and abs(stored - expected) < 1e-6 and abs(recomputed - expected) < 1e-6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--postings", type=int, default=100, help="thread başına kayıt")
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.threads, args.postings) else 1)
@@ -0,0 +1,95 @@
+# benchmarks/bench_startup.py
+"""Açılış süresi: pencere dışındaki açılış işi (import + initialize_database) ve STARTUP_BUDGET_MS.
+
+Geçici veritabanı güncel şemayla kurulur. Her tekrar yeni bir Python süreci
+başlatır; süreç main'i import eder, güncel veritabanında initialize_database()
+çağırır ve çıkar. Sürecin toplam duvar saati süresi main.STARTUP_BUDGET_MS ile
+karşılaştırılır; en iyi süre bütçeyi aşarsa betik 1 ile çıkar. Bir kez de
+-X importtime ile çalıştırılıp en pahalı importlar yazılır.
+
+Pencerenin çizilmesi ekran gerektirdiğinden burada ölçülmez; onu da içeren
+ölçüm için: python -X importtime main.py --startup-time
+
+    python benchmarks/bench_startup.py --repeats 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from _common import database, use_temp_database
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import sys, time, json
+started = time.perf_counter()
+import main, database
+imported = time.perf_counter()
+database.DB_NAME = sys.argv[1]
+database.initialize_database()
+done = time.perf_counter()
+database.close_all_connections()
+print(json.dumps({"import_ms": (imported - started) * 1000, "init_ms": (done - imported) * 1000}))
+'''
+
+
+def _run_child(db_name, importtime=False):
+    """(duvar saati ms, çocuk sürecin ölçümleri, stderr) döner"""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD, db_name]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, check=True, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    return wall_ms, json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def _slowest_imports(stderr, count):
+    """-X importtime çıktısından kendi süresi en uzun importlar: [(ms, modül)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def run(repeats, budget_ms):
+    db_name = use_temp_database()
+    database.close_all_connections()
+    _run_child(db_name)  # dosya önbelleğini ısıt
+
+    walls, imports, inits = [], [], []
+    for _ in range(repeats):
+        wall_ms, measured, _ = _run_child(db_name)
+        walls.append(wall_ms)
+        imports.append(measured["import_ms"])
+        inits.append(measured["init_ms"])
+
+    print(f"{repeats} açılış (yeni süreç, güncel şemalı veritabanı)")
+    print(f"  süreç toplamı       : en iyi {min(walls):6.1f} ms, ortanca {statistics.median(walls):6.1f} ms")
+    print(f"  import main         : en iyi {min(imports):6.1f} ms, ortanca {statistics.median(imports):6.1f} ms")
+    print(f"  initialize_database : en iyi {min(inits):6.2f} ms, ortanca {statistics.median(inits):6.2f} ms")
+
+    _, _, stderr = _run_child(db_name, importtime=True)
+    print("  en pahalı importlar (-X importtime, kendi süresi):")
+    for ms, name in _slowest_imports(stderr, 5):
+        print(f"    {ms:6.1f} ms  {name}")
+
+    ok = min(walls) <= budget_ms
+    print(f"  bütçe {budget_ms:.0f} ms (pencere hariç): {'tamam' if ok else 'AŞILDI'}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, ROOT)
+    import main
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=main.STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.repeats, args.budget_ms) else 1)
@@ -0,0 +1,72 @@
+# benchmarks/bench_supplier_overview.py
+"""Toptancı listesi: get_supplier_overview süresi ve 30 ms hedefi.
+
+Geçici veritabanına N toptancı ve M bakiye satırı yazılır, suppliers özet
+sütunları yeniden hesaplanır. Ardından her sıralama ve arama için
+get_supplier_overview birkaç kez çağrılır; en iyi ve ortanca süre yazılır.
+En iyi süre hedefi aşan bir ölçüm varsa betik 1 ile çıkar.
+
+    python benchmarks/bench_supplier_overview.py --suppliers 5000 --balances 500000
+"""
+import argparse
+import statistics
+
+from _common import database, timed, use_temp_database
+
+STATUSES = ("AKTIF", "ODENDI", "GECIKMIS")
+
+CASES = [
+    ("ad A-Z", dict(sort="name", direction="ASC")),
+    ("ad Z-A", dict(sort="name", direction="DESC")),
+    ("bakiye", dict(sort="balance", direction="DESC")),
+    ("arama", dict(sort="name", direction="ASC", search="Toptancı 01")),
+]
+
+
+def _seed(branch_id, suppliers, balances):
+    with database.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO suppliers (branch_id, name, name_key, supplier_type, created_date) VALUES (?, ?, ?, ?, ?)",
+            ((branch_id, f"Toptancı {i:05d}", database.turkish_sort_key(f"Toptancı {i:05d}"), "Gıda",
+              "2025-01-01 00:00:00") for i in range(suppliers))
+        )
+        supplier_ids = [row[0] for row in cursor.execute("SELECT id FROM suppliers ORDER BY id")]
+        cursor.executemany(
+            "INSERT INTO supplier_balances (supplier_id, type, amount, status, date) VALUES (?, ?, ?, ?, ?)",
+            ((supplier_ids[i % suppliers], "ALACAK" if i % 2 else "BORC", float(1 + i % 500),
+              STATUSES[i % 3], "2025-01-01") for i in range(balances))
+        )
+        database._rebuild_supplier_balances(cursor)
+
+
+def run(suppliers, balances, repeats, budget_ms):
+    use_temp_database()
+    branch_id = database.create_branch("Benchmark")
+    _, elapsed = timed(_seed, branch_id, suppliers, balances)
+    print(f"{suppliers} toptancı, {balances} bakiye satırı ({elapsed:.1f} s hazırlık)")
+
+    ok = True
+    for name, kwargs in CASES:
+        database.get_supplier_overview(branch_id, **kwargs)
+        timings = []
+        for _ in range(repeats):
+            overview, elapsed = timed(database.get_supplier_overview, branch_id, **kwargs)
+            timings.append(elapsed * 1000)
+        best = min(timings)
+        ok = ok and best < budget_ms
+        print(f"  {name:>7}: en iyi {best:6.2f} ms, ortanca {statistics.median(timings):6.2f} ms, "
+              f"{overview['match_count']} satır")
+
+    print(f"  hedef {budget_ms:.0f} ms: {'tamam' if ok else 'AŞILDI'}")
+    database.close_all_connections()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suppliers", type=int, default=5000)
+    parser.add_argument("--balances", type=int, default=500000)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=30.0)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.suppliers, args.balances, args.repeats, args.budget_ms) else 1)
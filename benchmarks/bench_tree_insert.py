@@ -0,0 +1,132 @@
+# benchmarks/bench_tree_insert.py
+"""Treeview doldurma: satır başına tree.insert ile bulk_insert karşılaştırması.
+
+StockReportsDialog satırlarıyla aynı biçimde (8 sütun, 'in'/'out' etiketi)
+10k/50k/100k satır eklenir ve tablo temizlenir. Ekran varsa gerçek bir
+ttk.Treeview ölçülür; yoksa (sunucu, CI) Python→Tcl geçiş maliyeti, satırları
+yalnızca saklayan Tcl'de yazılmış bir yedek widget komutuyla ölçülür ve
+Treeview'in kendi eleman maliyeti dahil olmaz.
+
+    python benchmarks/bench_tree_insert.py --rows 10000 50000 100000
+"""
+import argparse
+import time
+import tkinter
+
+import _common  # noqa: F401  (depo kökünü sys.path'e ekler)
+
+from modules.ui_helpers import INSERT_SLICE_ROWS, bulk_insert
+
+COLUMNS = ("Date", "Product", "Barcode", "Type", "Qty", "OldQty", "NewQty", "Note")
+
+# Yedek widget: insert satırı bir Tcl dizisine yazar, delete siler, children listeler
+_STAND_IN = '''
+proc .tree {cmd args} {
+    switch -- $cmd {
+        insert {
+            lassign $args parent index - iid - values - tags
+            set ::tree_rows($iid) [list $values $tags]
+        }
+        delete {
+            foreach iid [lindex $args 0] { unset -nocomplain ::tree_rows($iid) }
+        }
+        children { return [array names ::tree_rows] }
+    }
+}
+'''
+
+
+class _StandInTree:
+    """bulk_insert'in kullandığı kadarıyla Treeview (tk + widget adı)"""
+
+    def __init__(self, interp):
+        self.tk = interp
+        interp.eval(_STAND_IN)
+
+    def __str__(self):
+        return ".tree"
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.tk.call(".tree", "insert", parent, index, "-id", iid, "-values", values, "-tags", tags)
+
+    def get_children(self):
+        return self.tk.splitlist(self.tk.call(".tree", "children"))
+
+    def delete(self, *items):
+        self.tk.call(".tree", "delete", items)
+
+
+def _make_tree():
+    """(tree, açıklama) döner: ekran varsa gerçek Treeview, yoksa yedek widget"""
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        return _StandInTree(tkinter.Tcl()), "yedek Tcl widget'ı (ekran yok, Treeview maliyeti hariç)"
+    from tkinter import ttk
+    root.withdraw()
+    tree = ttk.Treeview(root, columns=COLUMNS, show="headings")
+    tree.tag_configure('in', foreground='#4CAF50')
+    tree.tag_configure('out', foreground='#c62828')
+    return tree, "ttk.Treeview"
+
+
+def _report_rows(count):
+    """StockReportsDialog.show_page ile aynı biçimde satırlar; değerlerde Tcl özel karakterleri de var"""
+    rows = []
+    for i in range(count):
+        incoming = i % 2 == 0
+        rows.append((str(i + 1), (
+            f"2025-01-{i % 28 + 1:02d} 10:{i % 60:02d}:00",
+            f"Ürün {{{i % 1000}}} \"özel\" [a]",
+            f"869{i:010d}",
+            "GİRİŞ" if incoming else "ÇIKIŞ",
+            i % 50 + 1, i % 500, i % 500 + 1,
+            "not $x" if i % 7 else "-",
+        ), ('in' if incoming else 'out',)))
+    return rows
+
+
+def _clear_per_row(tree):
+    for item in tree.get_children():
+        tree.delete(item)
+
+
+def run(counts):
+    tree, kind = _make_tree()
+    print(f"Ölçülen: {kind}, bulk_insert dilimi {INSERT_SLICE_ROWS} satır")
+    for count in counts:
+        rows = _report_rows(count)
+        
+        started = time.perf_counter()
+        for iid, values, tags in rows:
+            tree.insert("", "end", iid=iid, values=values, tags=tags)
+        per_row = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        _clear_per_row(tree)
+        clear_per_row = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        for start in range(0, count, INSERT_SLICE_ROWS):
+            bulk_insert(tree, rows[start:start + INSERT_SLICE_ROWS])
+        bulk = time.perf_counter() - started
+        
+        last = rows[-1]
+        stored = tree.item(last[0], "values") if hasattr(tree, "item") else \
+            tree.tk.splitlist(tree.tk.call("lindex", tree.tk.call("set", f"::tree_rows({last[0]})"), 0))
+        intact = [str(value) for value in stored] == [str(value) for value in last[1]]
+        
+        started = time.perf_counter()
+        tree.delete(*tree.get_children())
+        clear_once = time.perf_counter() - started
+        
+        print(f"{count:>7,} satır: ekleme satır başına {per_row * 1000:7.0f} ms, bulk {bulk * 1000:7.0f} ms "
+              f"({per_row / bulk:.1f}x) | temizleme satır başına {clear_per_row * 1000:6.0f} ms, "
+              f"tek çağrı {clear_once * 1000:6.0f} ms | değerler sağlam: {intact}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 50000, 100000])
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,73 @@
+# benchmarks/bench_write_queue.py
+"""Yazma hızı: çağrı başına commit ile WriteQueue toplu commit karşılaştırması ve 10x hedefi.
+
+Her synchronous ayarı (NORMAL ve FULL) için ayrı geçici veritabanında aynı iş
+yükü iki kez çalıştırılır: add_transaction ve update_product_quantity çağrıları
+önce doğrudan (her biri kendi commit'i ile), sonra WriteQueue'ya submit edilip
+Future'lar beklenerek. Saniyedeki işlem, commit sayısı ve hızlanma yazılır;
+hızlanma hedefin altında kalan bir ayar varsa betik 1 ile çıkar.
+
+    python benchmarks/bench_write_queue.py --ops 4000
+"""
+import argparse
+
+from _common import database, timed, use_temp_database
+
+
+def _workload(branch_id, product_id, ops):
+    """(fonksiyon, argümanlar) listesi: 3 gelir/gider kaydına 1 stok hareketi"""
+    calls = []
+    for i in range(ops):
+        if i % 4 == 3:
+            calls.append((database.update_product_quantity, (product_id, "IN" if i % 8 == 3 else "OUT", 1)))
+        else:
+            calls.append((database.add_transaction, (branch_id, "GELIR" if i % 2 else "GIDER", 10.0, "NAKIT")))
+    return calls
+
+
+def _direct(calls):
+    for func, args in calls:
+        func(*args)
+
+
+def _queued(calls):
+    writer = database.WriteQueue().start()
+    try:
+        futures = [writer.submit(func, *args) for func, args in calls]
+        for future in futures:
+            future.result()
+    finally:
+        writer.stop()
+    return writer.batches
+
+
+def run(synchronous, ops, target):
+    database.PRAGMA_PROFILE = dict(database.PRAGMA_PROFILE, synchronous=synchronous)
+    use_temp_database(f"{synchronous.lower()}.db")
+    branch_id = database.create_branch("Benchmark")
+    product_id = database.add_product(branch_id, "Ürün", "8690000000001", ops)
+
+    _, direct = timed(_direct, _workload(branch_id, product_id, ops))
+    batches, queued = timed(_queued, _workload(branch_id, product_id, ops))
+    speedup = direct / queued
+    print(f"  synchronous={synchronous:<6}: doğrudan {ops / direct:8,.0f} işlem/s ({ops} commit) | "
+          f"kuyruk {ops / queued:8,.0f} işlem/s ({batches} commit) | {speedup:.1f}x")
+    database.shutdown_database()
+    return speedup >= target
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=4000, help="her yöntemde yapılan yazma çağrısı")
+    parser.add_argument("--target", type=float, default=10.0, help="beklenen en az hızlanma (kat)")
+    args = parser.parse_args()
+
+    profile = dict(database.PRAGMA_PROFILE)
+    print(f"{args.ops} yazma çağrısı (3 add_transaction : 1 update_product_quantity)")
+    results = []
+    for synchronous in ("NORMAL", "FULL"):
+        results.append(run(synchronous, args.ops, args.target))
+        database.PRAGMA_PROFILE = profile
+    ok = all(results)
+    print(f"  hedef {args.target:.0f}x: {'tamam' if ok else 'karşılanmadı'}")
+    raise SystemExit(0 if ok else 1)
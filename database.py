@@ -1,21 +1,285 @@
 # database.py
 import sqlite3
 import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 DB_NAME = "business_manager.db"
 
-def get_db_connection():
-    """Veritabanı bağlantısını oluşturur"""
-    conn = sqlite3.connect(DB_NAME)
+# UPDATE ... RETURNING desteği (SQLite 3.35+)
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+def _has_fts5_trigram():
+    """FTS5 trigram tokenizer'ı kullanılabilir mi? (FTS5 derlenmiş ve SQLite 3.34+)"""
+    try:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(x, tokenize='trigram')")
+        finally:
+            conn.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+# Ürün araması için FTS5 trigram indeksi (yoksa LIKE ile aranır)
+HAS_FTS5_TRIGRAM = _has_fts5_trigram()
+
+# get_product_by_barcode LRU önbelleğinin boyutu ((şube, barkod) -> ürün)
+BARCODE_CACHE_SIZE = 1024
+
+class _WriteFailure:
+    """Nedeni belli başarısız yazma sonucu; bool değeri False olduğundan 'if sonuç:' kontrolleri değişmez"""
+    def __init__(self, message):
+        self.message = message
+    
+    def __bool__(self):
+        return False
+    
+    def __repr__(self):
+        return f"<{self.message}>"
+
+# add_product / update_product_info: barkod bu şubede başka bir üründe kayıtlı
+DUPLICATE_BARCODE = _WriteFailure("barkod zaten kayıtlı")
+
+# search_products varsayılan sonuç sayısı ve bm25 sıralaması yapılacak en fazla eşleşme
+SEARCH_LIMIT = 200
+SEARCH_RANK_LIMIT = 500
+
+# WriteQueue toplu commit ayarları: ilk istekten sonra en fazla bu kadar ms
+# beklenir ya da bu kadar istek birikince commit edilir
+GROUP_COMMIT_INTERVAL_MS = 5
+GROUP_COMMIT_MAX_OPS = 200
+
+# Kilitli veritabanında (SQLITE_BUSY) yeniden deneme ayarları
+BUSY_RETRIES = 5
+BUSY_RETRY_DELAY = 0.05
+
+# Her bağlantıya uygulanan PRAGMA profili (değiştirilebilir; None olanlar atlanır)
+PRAGMA_PROFILE = {
+    "journal_mode": "WAL",        # Okumalar yazmaları bloklamaz
+    "synchronous": "NORMAL",      # WAL ile güvenli, commit başına fsync yok
+    "cache_size": -32000,         # ~32 MB sayfa önbelleği
+    "temp_store": "MEMORY",
+    "mmap_size": 128 * 1024 * 1024,
+    "busy_timeout": 5000,         # ms
+}
+
+# Periyodik WAL checkpoint aralığı (ms) - main.py kullanır
+CHECKPOINT_INTERVAL_MS = 5 * 60 * 1000
+
+# Thread başına tek, uzun ömürlü bağlantı (sayfa ve statement cache korunur)
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+
+# === TÜRKÇE SIRALAMA ===
+# Türk alfabesi sırası (q, w, x Latin konumlarında); harfler bu sıraya göre kodlanır
+TURKISH_ALPHABET = "abcçdefgğhıijklmnoöpqrsştuüvwxyz"
+_TURKISH_KEY_TABLE = {ord(ch): chr(0x100 + i) for i, ch in enumerate(TURKISH_ALPHABET)}
+# Şapkalı harfler (Kâğıt, İslâm, Ûmit) şapkasız karşılıklarıyla aynı sıralanır ve aranır
+_CIRCUMFLEX_TABLE = str.maketrans("âîû", "aiu")
+
+def turkish_fold(text):
+    """Türkçe küçük harfe çevirir ('I' -> 'ı', 'İ' -> 'i', 'â/î/û' -> 'a/i/u')"""
+    return (text or "").replace("I", "ı").replace("İ", "i").lower().translate(_CIRCUMFLEX_TABLE)
+
+def turkish_sort_key(text):
+    """Türkçe büyük/küçük harf duyarsız sıralama anahtarı (products/suppliers.name_key).
+
+    Harf harf kodlandığından bir önekin anahtarı, adın anahtarının da önekidir.
+    """
+    return turkish_fold(text).translate(_TURKISH_KEY_TABLE)
+
+def _turkish_collation(a, b):
+    """SQLite 'TURKISH' collation'ı"""
+    a, b = turkish_sort_key(a), turkish_sort_key(b)
+    return (a > b) - (a < b)
+
+def _prefix_range(prefix):
+    """name_key üzerinde önek araması için [alt, üst) aralığı"""
+    low = turkish_sort_key(prefix)
+    return low, low + "\U0010ffff"
+
+def _like_pattern(text):
+    """LIKE ... ESCAPE '\\' için içerir deseni"""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def _open_connection():
+    """Yeni bağlantı açar ve ayarlarını uygular"""
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    conn.create_collation("TURKISH", _turkish_collation)
+    apply_pragma_profile(conn)
     return conn
 
-def initialize_database():
-    """Tüm tabloları oluşturur"""
+def apply_pragma_profile(conn, profile=None):
+    """PRAGMA profilini bağlantıya uygular"""
+    for name, value in (profile or PRAGMA_PROFILE).items():
+        if value is not None:
+            conn.execute(f"PRAGMA {name} = {value}")
+
+def get_db_connection():
+    """Bu thread'e ait, tekrar kullanılan veritabanı bağlantısını döndürür"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "db_name", None) != DB_NAME:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.db_name = DB_NAME
+        _local.depth = 0
+        with _connections_lock:
+            _connections.append(conn)
+    return conn
+
+def get_read_connection():
+    """Uzun akış okumaları (fetch_iter) için bu thread'e ait ayrı, salt-okunur bağlantı.
+
+    WAL modunda kendi anlık görüntüsünü okur; yazma bağlantısının işlemlerini beklemez.
+    """
+    conn = getattr(_local, "read_conn", None)
+    if conn is None or getattr(_local, "read_db_name", None) != DB_NAME:
+        conn = _open_connection()
+        conn.execute("PRAGMA query_only = ON")
+        _local.read_conn = conn
+        _local.read_db_name = DB_NAME
+        with _connections_lock:
+            _connections.append(conn)
+    return conn
+
+def close_db_connection():
+    """Bu thread'in bağlantılarını kapatır"""
+    for attr in ("conn", "read_conn"):
+        conn = getattr(_local, attr, None)
+        if conn is None:
+            continue
+        with _connections_lock:
+            if conn in _connections:
+                _connections.remove(conn)
+        conn.close()
+        setattr(_local, attr, None)
+
+def close_all_connections():
+    """Uygulama kapanırken tüm açık bağlantıları kapatır"""
+    with _connections_lock:
+        connections = list(_connections)
+        _connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _local.conn = None
+    _local.read_conn = None
+
+def checkpoint_database(mode="PASSIVE"):
+    """WAL dosyasını ana veritabanına aktarır (PASSIVE, FULL, RESTART, TRUNCATE)"""
+    try:
+        return get_db_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    except sqlite3.Error as e:
+        print(f"Checkpoint hatası: {e}")
+        return None
+
+def shutdown_database():
+    """Kapanışta istatistikleri günceller, WAL'ı boşaltır ve bağlantıları kapatır"""
+    try:
+        conn = get_db_connection()
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.Error as e:
+        print(f"Kapanış hatası: {e}")
+    finally:
+        close_all_connections()
+
+@contextmanager
+def db_connection():
+    """Paylaşılan bağlantıyı verir: with db_connection() as conn: ..."""
+    yield get_db_connection()
+
+@contextmanager
+def transaction(immediate=False):
+    """Tek işlem (BEGIN/COMMIT) içinde cursor verir, hata olursa geri alır.
+
+    immediate=True ise yazma kilidi baştan alınır (BEGIN IMMEDIATE); oku-hesapla-yaz
+    akışları başka bir bağlantıyla yarışmaz. İç içe kullanımda yalnızca en dıştaki
+    blok BEGIN/COMMIT yapar; içteki bloklar SAVEPOINT açar, hata olursa yalnızca
+    kendi değişikliklerini geri alır (WriteQueue toplu commit'i buna dayanır).
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
+    depth = _local.depth
+    savepoint = f"sp_{depth}"
+    try:
+        if depth == 0:
+            cursor.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            cursor.execute(f"SAVEPOINT {savepoint}")
+    except BaseException:
+        cursor.close()
+        raise
+    _local.depth = depth + 1
+    try:
+        yield cursor
+    except BaseException:
+        _local.depth = depth
+        if depth == 0:
+            conn.rollback()
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        raise
+    else:
+        _local.depth = depth
+        try:
+            if depth == 0:
+                conn.commit()
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        except BaseException:
+            # COMMIT/RELEASE başarısızsa işlem açık kalmasın; bağlantı temiz dönsün
+            _rollback_quietly(conn, depth, savepoint)
+            raise
+    finally:
+        cursor.close()
+
+def _rollback_quietly(conn, depth, savepoint):
+    """Başarısız COMMIT/RELEASE sonrası açık kalan işlemi ya da savepoint'i geri alır"""
+    try:
+        if depth == 0:
+            conn.rollback()
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+    except sqlite3.Error:
+        pass
+
+def initialize_database():
+    """Tüm tabloları oluşturur.
+
+    Şema güncelse (PRAGMA user_version == SCHEMA_VERSION) her açılışta
+    CREATE TABLE IF NOT EXISTS ifadeleri ve commit çalıştırılmaz.
+    """
+    conn = get_db_connection()
+    up_to_date = conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    if up_to_date and (_has_product_search_index(conn) or not HAS_FTS5_TRIGRAM):
+        return
     
+    with transaction() as cursor:
+        _create_tables(cursor)
+        _apply_migrations(cursor)
+        # FTS5'siz bir SQLite ile taşınmış veritabanında arama indeksi eksik kalmış olabilir
+        if HAS_FTS5_TRIGRAM and not _has_product_search_index(cursor):
+            _create_product_search_index(cursor)
+    print("✅ Veritabanı başarıyla oluşturuldu!")
+
+def _has_product_search_index(cursor):
+    return cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'products_fts'").fetchone() is not None
+
+def _create_tables(cursor):
+    """Tablo tanımları"""
     # Şubeler tablosu
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS branches (
@@ -99,301 +363,934 @@ def initialize_database():
             FOREIGN KEY (branch_id) REFERENCES branches(id)
         )
     ''')
+
+def _is_busy_error(error):
+    """SQLITE_BUSY / SQLITE_LOCKED hatası mı?"""
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+def run_with_busy_retry(func, *args, **kwargs):
+    """Veritabanı kilitliyse kısa beklemelerle fonksiyonu yeniden dener"""
+    for attempt in range(BUSY_RETRIES):
+        try:
+            return func(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if not _is_busy_error(e) or attempt == BUSY_RETRIES - 1:
+                raise
+            time.sleep(BUSY_RETRY_DELAY * (attempt + 1))
+
+# === ŞEMA SÜRÜMLERİ ===
+# (sürüm, açıklama, adımlar) - adım SQL metni ya da cursor alan fonksiyon olabilir.
+# Uygulanan son sürüm PRAGMA user_version içinde tutulur.
+SCHEMA_MIGRATIONS = [
+    (1, "Sıcak sorgu yolları için indeksler", [
+        # get_all_products / get_low_stock_products: branch_id filtresi + ORDER BY name
+        "CREATE INDEX IF NOT EXISTS idx_products_branch_name ON products(branch_id, name)",
+        # get_all_suppliers / get_supplier_balances join'i
+        "CREATE INDEX IF NOT EXISTS idx_suppliers_branch_name ON suppliers(branch_id, name)",
+        # get_stock_movements_report: product_id join'i + date aralığı
+        "CREATE INDEX IF NOT EXISTS idx_stock_movements_product_date ON stock_movements(product_id, date)",
+        # get_supplier_total_balance: SUM tablo okumadan indeksten hesaplanır (covering)
+        "CREATE INDEX IF NOT EXISTS idx_supplier_balances_supplier_status "
+        "ON supplier_balances(supplier_id, status, type, amount)",
+        # get_transactions / özetler: branch_id + date aralığı
+        "CREATE INDEX IF NOT EXISTS idx_transactions_branch_date ON transactions(branch_id, date)",
+    ]),
+    (2, "İşlem tarihlerini 'YYYY-MM-DD HH:MM:SS' biçimine normalize et", [
+        "UPDATE transactions SET date = date || ' 00:00:00' WHERE length(date) = 10",
+    ]),
+    (3, "Toptancı bakiyesini suppliers.balance sütununda tut", [
+        "ALTER TABLE suppliers ADD COLUMN balance REAL NOT NULL DEFAULT 0",
+        """UPDATE suppliers SET balance = COALESCE((
+               SELECT SUM(CASE WHEN sb.type = 'ALACAK' THEN sb.amount ELSE -sb.amount END)
+               FROM supplier_balances sb
+               WHERE sb.supplier_id = suppliers.id AND sb.status = 'AKTIF'
+           ), 0)""",
+    ]),
+    (4, "Toptancı aktif/gecikmiş bakiye sayaçları", [
+        "ALTER TABLE suppliers ADD COLUMN active_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE suppliers ADD COLUMN overdue_count INTEGER NOT NULL DEFAULT 0",
+        lambda cursor: _rebuild_supplier_balances(cursor),
+    ]),
+    (5, "Keyset sayfalama için stok hareketlerinde şube sütunu", [
+        "ALTER TABLE stock_movements ADD COLUMN branch_id INTEGER",
+        """UPDATE stock_movements SET branch_id = (
+               SELECT p.branch_id FROM products p WHERE p.id = stock_movements.product_id
+           )""",
+        # get_stock_movements_page: branch_id + (date, id) < (?, ?) ve ORDER BY date DESC, id DESC
+        "CREATE INDEX IF NOT EXISTS idx_stock_movements_branch_date_id "
+        "ON stock_movements(branch_id, date, id)",
+    ]),
+    (6, "Gelir/gider özetleri için günlük toplam tablosu", [
+        # get_daily_total / get_period_summary: (branch_id, day) aralığı, gün başına birkaç satır
+        """CREATE TABLE IF NOT EXISTS transaction_daily_rollup (
+               branch_id INTEGER NOT NULL,
+               day TEXT NOT NULL,
+               type TEXT NOT NULL,
+               payment_method TEXT NOT NULL,
+               category TEXT NOT NULL,
+               amount REAL NOT NULL,
+               count INTEGER NOT NULL,
+               PRIMARY KEY (branch_id, day, type, payment_method, category)
+           ) WITHOUT ROWID""",
+        lambda cursor: _rebuild_transaction_rollup(cursor),
+    ]),
+    (7, "get_transaction_stats için şube başına sayaçlar", [
+        """CREATE TABLE IF NOT EXISTS transaction_stats (
+               branch_id INTEGER PRIMARY KEY,
+               total_count INTEGER NOT NULL DEFAULT 0,
+               income_count INTEGER NOT NULL DEFAULT 0,
+               expense_count INTEGER NOT NULL DEFAULT 0,
+               cash_total REAL NOT NULL DEFAULT 0,
+               credit_total REAL NOT NULL DEFAULT 0,
+               bank_total REAL NOT NULL DEFAULT 0
+           )""",
+        lambda cursor: _rebuild_transaction_stats(cursor),
+    ]),
+    (8, "Ürün adı ve barkodu için FTS5 trigram arama indeksi", [
+        # İndeks name_key sütununa dayandığından sürüm 11'de kurulur
+    ]),
+    (9, "Türkçe sıralama anahtarı (name_key) ve indeksleri", [
+        "ALTER TABLE products ADD COLUMN name_key TEXT NOT NULL DEFAULT ''",
+        "ALTER TABLE suppliers ADD COLUMN name_key TEXT NOT NULL DEFAULT ''",
+        lambda cursor: _backfill_name_keys(cursor),
+        # get_all_products / get_all_suppliers: branch_id + ORDER BY name_key / önek aralığı
+        "CREATE INDEX IF NOT EXISTS idx_products_branch_name_key ON products(branch_id, name_key)",
+        "CREATE INDEX IF NOT EXISTS idx_suppliers_branch_name_key ON suppliers(branch_id, name_key)",
+        # (branch_id, name) indeksleri artık name_key indeksleriyle karşılanıyor
+        "DROP INDEX IF EXISTS idx_products_branch_name",
+        "DROP INDEX IF EXISTS idx_suppliers_branch_name",
+    ]),
+    (10, "Şapkalı harfler için name_key değerlerini yeniden hesapla", [
+        lambda cursor: _backfill_name_keys(cursor),
+    ]),
+    (11, "Ürün arama indeksini Türkçe katlanmış ad (name_key) üzerinde yeniden kur", [
+        lambda cursor: _recreate_product_search_index(cursor),
+    ]),
+    (12, "Şube başına tekil barkod indeksi", [
+        lambda cursor: _create_barcode_index(cursor),
+    ]),
+]
+
+# Keyset sayfalarının varsayılan satır sayısı
+PAGE_SIZE = 200
+
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+def _backfill_name_keys(cursor):
+    """Mevcut ürün ve toptancıların name_key değerlerini hesaplar"""
+    for table in ("products", "suppliers"):
+        rows = cursor.execute(f"SELECT id, name FROM {table}").fetchall()
+        cursor.executemany(
+            f"UPDATE {table} SET name_key = ? WHERE id = ?",
+            [(turkish_sort_key(row[1]), row[0]) for row in rows]
+        )
+
+def _create_barcode_index(cursor):
+    """(branch_id, barcode) tekil indeksini oluşturur; çift barkod varsa tekil olmayan indeks kurar"""
+    duplicates = cursor.execute('''
+        SELECT branch_id, barcode, COUNT(*) FROM products
+        WHERE barcode IS NOT NULL AND barcode <> ''
+        GROUP BY branch_id, barcode HAVING COUNT(*) > 1
+    ''').fetchall()
+    if duplicates:
+        listed = ", ".join(f"{row[1]} (şube {row[0]}, {row[2]} ürün)" for row in duplicates[:10])
+        print(f"⚠️ Aynı şubede tekrar eden barkodlar var, tekil indeks kurulamadı: {listed}")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_products_branch_barcode ON products(branch_id, barcode)"
+        )
+        return
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_products_branch_barcode
+        ON products(branch_id, barcode) WHERE barcode IS NOT NULL AND barcode <> ''
+    ''')
+
+def _apply_migrations(cursor):
+    """Eksik şema sürümlerini sırayla uygular"""
+    current = cursor.execute("PRAGMA user_version").fetchone()[0]
+    for version, description, steps in SCHEMA_MIGRATIONS:
+        if version <= current:
+            continue
+        for step in steps:
+            if callable(step):
+                step(cursor)
+            else:
+                cursor.execute(step)
+        cursor.execute(f"PRAGMA user_version = {int(version)}")
+        print(f"✅ Şema sürümü {version}: {description}")
+
+# check_query_plans: bu kontrollerin planında mutlaka görülmesi gereken indeksler
+REQUIRED_PLAN_INDEXES = {
+    "get_product_by_barcode": "idx_products_branch_barcode",
+}
+
+def check_query_plans(branch_id=1):
+    """Sıcak sorguların tam tablo taraması yapmadığını EXPLAIN QUERY PLAN ile doğrular.
+
+    Fonksiyonlar gerçekten çağrılır, çalıştırdıkları SELECT'ler yakalanır ve
+    planlarında 'SCAN <tablo>' görülürse ya da REQUIRED_PLAN_INDEXES'teki indeks
+    kullanılmıyorsa RuntimeError fırlatılır.
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    supplier = fetch_one("SELECT id FROM suppliers WHERE branch_id = ? LIMIT 1", (branch_id,))
+    checks = [
+        ("get_all_products", lambda: get_all_products(branch_id)),
+        ("get_all_products(prefix)", lambda: get_all_products(branch_id, prefix="şe")),
+        ("get_all_suppliers(prefix)", lambda: get_all_suppliers(branch_id, prefix="İs")),
+        ("get_stock_movements_report",
+         lambda: get_stock_movements_report(branch_id, start_date=today, end_date=today)),
+        ("get_supplier_total_balance",
+         lambda: get_supplier_total_balance(supplier['id'] if supplier else 0)),
+        ("get_transactions", lambda: get_transactions(branch_id, today, today)),
+        ("get_stock_movements_page",
+         lambda: get_stock_movements_page(branch_id, after_date=today, after_id=1)),
+        ("get_transactions_page",
+         lambda: get_transactions_page(branch_id, after_date=today, after_id=1)),
+        ("search_products", lambda: search_products(branch_id, "ürün", limit=20)),
+        ("get_product_by_barcode", lambda: get_product_by_barcode(branch_id, "0000000000000")),
+    ]
     
-    conn.commit()
-    conn.close()
-    print("✅ Veritabanı başarıyla oluşturuldu!")
+    conn = get_db_connection()
+    problems = []
+    for name, call in checks:
+        captured = []
+        conn.set_trace_callback(captured.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+        
+        details = []
+        for sql in captured:
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            for row in conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall():
+                detail = row['detail']
+                details.append(detail)
+                # Alt sorgu sonucunun taranması tablo taraması değildir; FTS5'in kendi
+                # gölge tablo (products_fts_*) okumaları da hariç
+                if (detail.startswith("SCAN ") and not detail.startswith("SCAN CONSTANT")
+                        and "VIRTUAL TABLE" not in detail and "subquery" not in detail.lower()
+                        and "_fts_" not in detail):
+                    problems.append(f"{name}: {detail}")
+        
+        index = REQUIRED_PLAN_INDEXES.get(name)
+        if index and not any(f"INDEX {index} " in detail + " " for detail in details):
+            problems.append(f"{name}: {index} kullanılmıyor ({'; '.join(details) or 'sorgu yok'})")
+    
+    if problems:
+        raise RuntimeError("Sorgu planı sorunları:\n" + "\n".join(problems))
+    return True
 
 # === BRANCH OPERASYONLARI ===
 def create_branch(name, address=""):
     """Yeni şube oluşturur"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute('''
-            INSERT INTO branches (name, address, created_date)
-            VALUES (?, ?, ?)
-        ''', (name, address, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        conn.commit()
-        branch_id = cursor.lastrowid
+        with transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO branches (name, address, created_date)
+                VALUES (?, ?, ?)
+            ''', (name, address, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            branch_id = cursor.lastrowid
         print(f"✅ Şube oluşturuldu: {name}")
         return branch_id
     except sqlite3.IntegrityError:
         print(f"❌ '{name}' adlı şube zaten var!")
         return None
-    finally:
-        conn.close()
 
 def get_all_branches():
     """Tüm şubeleri getirir"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM branches ORDER BY name")
-    branches = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return branches
+    return fetch_all("SELECT * FROM branches ORDER BY name COLLATE TURKISH")
 
 def get_branch_by_id(branch_id):
     """ID ile şube getirir"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM branches WHERE id = ?", (branch_id,))
-    branch = cursor.fetchone()
-    conn.close()
-    return dict(branch) if branch else None
+    return fetch_one("SELECT * FROM branches WHERE id = ?", (branch_id,))
 
 # === PRODUCT OPERASYONLARI ===
-def get_all_products(branch_id):
-    """Tüm ürünleri getirir"""
+def get_all_products(branch_id, compact=False, prefix=None):
+    """Tüm ürünleri Türkçe ad sırasıyla getirir (prefix: ad öneki, büyük/küçük harf duyarsız)"""
+    if prefix:
+        return fetch_all(
+            "SELECT * FROM products WHERE branch_id = ? AND name_key >= ? AND name_key < ? ORDER BY name_key",
+            (branch_id, *_prefix_range(prefix)),
+            compact
+        )
     return fetch_all(
-        "SELECT * FROM products WHERE branch_id = ? ORDER BY name",
-        (branch_id,)
+        "SELECT * FROM products WHERE branch_id = ? ORDER BY name_key",
+        (branch_id,),
+        compact
     )
 
-def add_product(branch_id, name, barcode, quantity, min_stock=10, unit_price=0):
-    """Yeni ürün ekler"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def _create_product_search_index(cursor):
+    """products_fts (name_key + barkod, trigram) indeksini oluşturur ve doldurur.
+
+    Ad, Türkçe katlanmış name_key üzerinden indekslenir (I/ı, İ/i, â/a aynı aranır).
+    name_key harfleri U+0100 bloğuna kodlandığından FTS5'in kendi büyük/küçük harf
+    katlaması bu harfleri karıştırmasın diye tokenizer case_sensitive çalışır.
+    """
+    if not HAS_FTS5_TRIGRAM:
+        print("⚠️ FTS5 trigram desteklenmiyor, ürün araması LIKE ile yapılacak")
+        return
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name_key, barcode, content='products', content_rowid='id',
+            tokenize='trigram case_sensitive 1'
+        )
+    ''')
+    cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+def _recreate_product_search_index(cursor):
+    """Eski tanımlı products_fts indeksini silip yeniden kurar"""
+    if not HAS_FTS5_TRIGRAM:
+        return
+    cursor.execute("DROP TABLE IF EXISTS products_fts")
+    _create_product_search_index(cursor)
+
+def _sync_product_search(cursor, product_id, old=None, new=None):
+    """products_fts indeksini aynı işlem içinde günceller (old / new: (name_key, barkod))"""
+    if not HAS_FTS5_TRIGRAM:
+        return
+    if old:
+        cursor.execute(
+            "INSERT INTO products_fts(products_fts, rowid, name_key, barcode) VALUES ('delete', ?, ?, ?)",
+            (product_id, *old)
+        )
+    if new:
+        cursor.execute(
+            "INSERT INTO products_fts(rowid, name_key, barcode) VALUES (?, ?, ?)",
+            (product_id, *new)
+        )
+
+def _product_search_phrase(query):
+    """FTS5 MATCH ifadesi: ad name_key ile aynı katlanır, barkod olduğu gibi (ve büyük/küçük) aranır"""
+    def quote(text):
+        return '"' + text.replace('"', '""') + '"'
+    terms = [f"name_key : {quote(turkish_sort_key(query))}"]
+    for variant in dict.fromkeys((query, query.upper(), query.lower())):
+        terms.append(f"barcode : {quote(variant)}")
+    return " OR ".join(terms)
+
+def rebuild_product_search():
+    """Ürün arama indeksini products tablosundan yeniden oluşturur"""
+    if not HAS_FTS5_TRIGRAM:
+        return
+    with transaction() as cursor:
+        cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+def search_products(branch_id, query, limit=SEARCH_LIMIT, compact=False, low_stock=False):
+    """Ürün adı ve barkodunda arar (low_stock=True ise yalnızca stoğu azalanlar).
+
+    3 ve daha uzun aramalar FTS5 trigram indeksinden (ad Türkçe katlanmış) yapılır;
+    şubedeki eşleşme sayısı SEARCH_RANK_LIMIT'i aşmıyorsa bm25'e göre sıralanır,
+    aşıyorsa (arama henüz çok genel) sıralamadan ilk limit eşleşme döner. Daha kısa
+    aramalar ad öneki olarak name_key indeksinden, yalnızca rakamsa barkod öneki
+    olarak da yapılır.
+    """
+    query = (query or "").strip()
+    stock_filter = " AND p.quantity <= p.min_stock" if low_stock else ""
+    if HAS_FTS5_TRIGRAM and len(query) >= 3:
+        phrase = _product_search_phrase(query)
+        # +p.branch_id: şube indeksini devre dışı bırakır, plan FTS eşleşmelerinden başlar
+        match_sql = '''
+            FROM products_fts
+            JOIN products p ON p.id = products_fts.rowid
+            WHERE products_fts MATCH ? AND +p.branch_id = ?''' + stock_filter
+        # Sayım şube filtresiyle yapılır ve SEARCH_RANK_LIMIT + 1 satırda durur
+        matches = fetch_one(
+            f"SELECT COUNT(*) AS total FROM (SELECT 1 {match_sql} LIMIT ?)",
+            (phrase, branch_id, SEARCH_RANK_LIMIT + 1)
+        )['total']
+        order_by = " ORDER BY products_fts.rank" if matches <= SEARCH_RANK_LIMIT else ""
+        return fetch_all(
+            f"SELECT p.* {match_sql}{order_by} LIMIT ?", (phrase, branch_id, limit), compact
+        )
+    
+    if len(query) < 3:
+        name_sql = '''
+            SELECT * FROM products p
+            WHERE branch_id = ? AND name_key >= ? AND name_key < ?''' + stock_filter + '''
+            ORDER BY name_key
+            LIMIT ?'''
+        params = (branch_id, *_prefix_range(query), limit)
+        if not query.isdigit():
+            return fetch_all(name_sql, params, compact)
+        # Rakamla başlayan kısa arama okutulan/yazılan barkodun başı da olabilir
+        barcode_sql = '''
+            SELECT * FROM products p
+            WHERE branch_id = ? AND barcode >= ? AND barcode < ?''' + stock_filter + '''
+            LIMIT ?'''
+        return fetch_all(
+            f"SELECT * FROM ({name_sql}) UNION SELECT * FROM ({barcode_sql}) ORDER BY name_key LIMIT ?",
+            (*params, branch_id, query, query + "\U0010ffff", limit, limit), compact
+        )
     
+    # FTS5 yok: Türkçe duyarlı içerir araması (name_key üzerinde)
+    return fetch_all('''
+        SELECT * FROM products p
+        WHERE branch_id = ? AND (name_key LIKE ? ESCAPE '\\' OR barcode LIKE ? ESCAPE '\\')''' + stock_filter + '''
+        ORDER BY name_key
+        LIMIT ?
+    ''', (branch_id, _like_pattern(turkish_sort_key(query)), _like_pattern(query), limit), compact)
+
+def add_product(branch_id, name, barcode, quantity, min_stock=10, unit_price=0):
+    """Yeni ürün ekler; ürün id'si, barkod şubede kayıtlıysa DUPLICATE_BARCODE, hata olursa None döner"""
+    name_key = turkish_sort_key(name)
     try:
-        cursor.execute('''
-            INSERT INTO products (branch_id, name, barcode, quantity, min_stock, unit_price, created_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (branch_id, name, barcode, quantity, min_stock, unit_price, 
-              datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        conn.commit()
-        return cursor.lastrowid
+        with transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO products (branch_id, name, name_key, barcode, quantity, min_stock, unit_price, created_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (branch_id, name, name_key, barcode, quantity, min_stock, unit_price, 
+                  datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            product_id = cursor.lastrowid
+            _sync_product_search(cursor, product_id, new=(name_key, barcode))
+            return product_id
+    except sqlite3.IntegrityError:
+        print(f"❌ '{barcode}' barkodu bu şubede zaten kayıtlı!")
+        return DUPLICATE_BARCODE
     except Exception as e:
         print(f"Ürün ekleme hatası: {e}")
         return None
-    finally:
-        conn.close()
+
+# (DB_NAME, şube, barkod) -> (ürün id, ad); bulunamayan barkodlar önbelleğe alınmaz
+_barcode_cache = OrderedDict()
+_barcode_cache_lock = threading.Lock()
+
+def _lookup_barcode(branch_id, barcode):
+    """Barkodu LRU önbellek üzerinden (ürün id, ad) çiftine çözer, yoksa None"""
+    key = (DB_NAME, branch_id, barcode)
+    with _barcode_cache_lock:
+        hit = _barcode_cache.get(key)
+        if hit is not None:
+            _barcode_cache.move_to_end(key)
+            return hit
+    
+    # barcode <> '': kısmi tekil indeks (idx_products_branch_barcode) ancak bu koşulla seçilebilir
+    row = fetch_one(
+        "SELECT id, name FROM products WHERE branch_id = ? AND barcode = ? AND barcode <> '' LIMIT 1",
+        (branch_id, barcode)
+    )
+    if row is None:
+        return None
+    
+    hit = (row['id'], row['name'])
+    with _barcode_cache_lock:
+        _barcode_cache[key] = hit
+        if len(_barcode_cache) > BARCODE_CACHE_SIZE:
+            _barcode_cache.popitem(last=False)
+    return hit
+
+def _invalidate_barcode_cache(product_id):
+    """Ürünün önbellekteki barkod kayıtlarını siler"""
+    with _barcode_cache_lock:
+        for key in [key for key, hit in _barcode_cache.items() if hit[0] == product_id]:
+            del _barcode_cache[key]
+
+def _evict_barcode(branch_id, barcode):
+    """Tek barkodun önbellek kaydını siler (ürün başka bağlantıdan değiştirilmiş olabilir)"""
+    with _barcode_cache_lock:
+        _barcode_cache.pop((DB_NAME, branch_id, barcode), None)
+
+# apply_barcode_scan: önbellekteki ürün artık bu barkoda/şubeye ait değil
+_STALE_BARCODE = object()
+
+def get_product_by_barcode(branch_id, barcode):
+    """Barkoda göre ürünü getirir (miktar her zaman güncel okunur), yoksa None.
+
+    Önbellekteki ürün id'si barkod ve şubeyle birlikte doğrulanır; ürün silinmiş ya da
+    barkodu değişmişse kayıt atılır ve barkod veritabanından yeniden çözülür.
+    """
+    barcode = (barcode or "").strip()
+    if not barcode:
+        return None
+    for _ in range(2):
+        hit = _lookup_barcode(branch_id, barcode)
+        if hit is None:
+            return None
+        product = fetch_one(
+            "SELECT * FROM products WHERE id = ? AND barcode = ? AND branch_id = ?",
+            (hit[0], barcode, branch_id)
+        )
+        if product is not None:
+            return product
+        _evict_barcode(branch_id, barcode)
+    return None
+
+def apply_barcode_scan(branch_id, barcode, move_type="IN", quantity=1):
+    """Okutulan barkod için stok hareketi uygular (barkod okuyucu modu).
+
+    Başarılıysa {'product_id', 'name', 'quantity'} döner; barkod bulunamazsa
+    ya da stok yetersizse None. Önbellekteki ürün, hareketle aynı işlemde barkod
+    ve şubeyle doğrulanır; eşleşmezse kayıt atılıp barkod yeniden çözülür.
+    """
+    barcode = (barcode or "").strip()
+    if not barcode:
+        return None
+    
+    def scan(product_id):
+        with transaction(immediate=True) as cursor:
+            row = cursor.execute(
+                "SELECT name FROM products WHERE id = ? AND barcode = ? AND branch_id = ?",
+                (product_id, barcode, branch_id)
+            ).fetchone()
+            if row is None:
+                return _STALE_BARCODE
+            new_qty = _apply_stock_move(cursor, product_id, move_type, quantity, note=f"Barkod: {barcode}")
+            return None if new_qty is None else {'product_id': product_id, 'name': row['name'], 'quantity': new_qty}
+    
+    for _ in range(2):
+        hit = _lookup_barcode(branch_id, barcode)
+        if hit is None:
+            return None
+        try:
+            result = run_with_busy_retry(scan, hit[0])
+        except Exception as e:
+            print(f"Stok güncelleme hatası: {e}")
+            return None
+        if result is not _STALE_BARCODE:
+            return result
+        _evict_barcode(branch_id, barcode)
+    return None
+
+def _apply_stock_move(cursor, product_id, move_type, quantity, note="", date=None):
+    """Tek stok hareketini korumalı UPDATE ile uygular ve hareketi kaydeder.
+
+    Çıkışta 'quantity >= ?' koşulu stoğun eksiye düşmesini engeller. Ürün yoksa
+    veya stok yetersizse None döner.
+    """
+    if move_type == "IN":
+        query = "UPDATE products SET quantity = quantity + ? WHERE id = ?"
+        params = (quantity, product_id)
+    else:
+        query = "UPDATE products SET quantity = quantity - ? WHERE id = ? AND quantity >= ?"
+        params = (quantity, product_id, quantity)
+    
+    if HAS_RETURNING:
+        rows = cursor.execute(query + " RETURNING quantity", params).fetchall()
+        if not rows:
+            return None
+        new_qty = rows[0][0]
+    else:
+        cursor.execute(query, params)
+        if cursor.rowcount == 0:
+            return None
+        cursor.execute("SELECT quantity FROM products WHERE id = ?", (product_id,))
+        new_qty = cursor.fetchone()[0]
+    
+    old_qty = new_qty - quantity if move_type == "IN" else new_qty + quantity
+    
+    # Hareket kaydet
+    cursor.execute('''
+        INSERT INTO stock_movements (product_id, branch_id, type, quantity, old_quantity, new_quantity, note, date)
+        VALUES (?, (SELECT branch_id FROM products WHERE id = ?), ?, ?, ?, ?, ?, ?)
+    ''', (product_id, product_id, move_type, quantity, old_qty, new_qty, note,
+          date or datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    
+    return new_qty
 
 def update_product_quantity(product_id, move_type, quantity, note=""):
-    """Stok miktarını günceller ve hareket kaydeder"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """Stok miktarını tek korumalı UPDATE ile günceller ve hareket kaydeder"""
+    def move():
+        with transaction(immediate=True) as cursor:
+            return _apply_stock_move(cursor, product_id, move_type, quantity, note)
     
     try:
-        # Mevcut miktarı al
-        cursor.execute("SELECT quantity FROM products WHERE id = ?", (product_id,))
-        current = cursor.fetchone()
-        
-        if not current:
-            return None
-        
-        old_qty = current['quantity']
+        return run_with_busy_retry(move)
+    except Exception as e:
+        print(f"Stok güncelleme hatası: {e}")
+        return None
+
+def validate_stock_movements(branch_id, lines, cursor=None):
+    """Toplu stok hareketlerini kontrol eder, hata mesajlarının listesini döner.
+
+    lines: [(product_id, 'IN' / 'OUT', miktar, not), ...]
+    """
+    errors = []
+    if not lines:
+        return ["Hareket listesi boş"]
+    
+    product_ids = sorted({line[0] for line in lines})
+    placeholders = ",".join("?" * len(product_ids))
+    query = f"SELECT id, name, quantity FROM products WHERE branch_id = ? AND id IN ({placeholders})"
+    if cursor is None:
+        rows = fetch_all(query, [branch_id] + product_ids)
+    else:
+        rows = [dict(row) for row in cursor.execute(query, [branch_id] + product_ids).fetchall()]
+    products = {row['id']: row for row in rows}
+    
+    running = {pid: product['quantity'] for pid, product in products.items()}
+    for i, (product_id, move_type, quantity, _note) in enumerate(lines, 1):
+        if product_id not in products:
+            errors.append(f"{i}. satır: ürün bulunamadı (ID {product_id})")
+            continue
+        if move_type not in ("IN", "OUT"):
+            errors.append(f"{i}. satır: geçersiz hareket türü '{move_type}'")
+            continue
+        if not isinstance(quantity, int) or quantity <= 0:
+            errors.append(f"{i}. satır: miktar pozitif tam sayı olmalı")
+            continue
         
-        # Yeni miktarı hesapla
-        if move_type == "IN":
-            new_qty = old_qty + quantity
-        else:
-            new_qty = old_qty - quantity
-            if new_qty < 0:
+        running[product_id] += quantity if move_type == "IN" else -quantity
+        if running[product_id] < 0:
+            errors.append(f"{i}. satır: '{products[product_id]['name']}' için stok yetersiz")
+    
+    return errors
+
+def apply_stock_movements(branch_id, lines):
+    """Toplu stok hareketlerini tek işlemde uygular (ya hepsi ya hiçbiri).
+
+    lines: [(product_id, 'IN' / 'OUT', miktar, not), ...]
+    Başarılıysa {product_id: yeni_miktar}, aksi halde None döner.
+    """
+    def apply():
+        with transaction(immediate=True) as cursor:
+            # Yazma kilidi alındıktan sonra doğrula; arada stok değişemez
+            errors = validate_stock_movements(branch_id, lines, cursor)
+            if errors:
+                print("Toplu stok hatası: " + "; ".join(errors))
                 return None
-        
-        # Ürünü güncelle
-        cursor.execute(
-            "UPDATE products SET quantity = ? WHERE id = ?",
-            (new_qty, product_id)
-        )
-        
-        # Hareket kaydet
-        cursor.execute('''
-            INSERT INTO stock_movements (product_id, type, quantity, old_quantity, new_quantity, note, date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (product_id, move_type, quantity, old_qty, new_qty, note,
-              datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        
-        conn.commit()
-        return new_qty
-        
+            
+            product_ids = sorted({line[0] for line in lines})
+            placeholders = ",".join("?" * len(product_ids))
+            cursor.execute(
+                f"SELECT id, quantity FROM products WHERE id IN ({placeholders})",
+                product_ids
+            )
+            quantities = {row['id']: row['quantity'] for row in cursor.fetchall()}
+            
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            movements = []
+            for product_id, move_type, quantity, note in lines:
+                old_qty = quantities[product_id]
+                new_qty = old_qty + quantity if move_type == "IN" else old_qty - quantity
+                quantities[product_id] = new_qty
+                movements.append((product_id, branch_id, move_type, quantity, old_qty, new_qty, note or "", now))
+            
+            cursor.executemany(
+                "UPDATE products SET quantity = ? WHERE id = ?",
+                [(qty, pid) for pid, qty in quantities.items()]
+            )
+            cursor.executemany('''
+                INSERT INTO stock_movements (product_id, branch_id, type, quantity, old_quantity, new_quantity, note, date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', movements)
+            
+            return quantities
+    
+    try:
+        return run_with_busy_retry(apply)
     except Exception as e:
-        print(f"Stok güncelleme hatası: {e}")
+        print(f"Toplu stok hatası: {e}")
         return None
-    finally:
-        conn.close()
 
 def update_product_info(product_id, name, barcode, min_stock, unit_price):
-    """Ürün bilgilerini günceller (stok hariç)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """Ürün bilgilerini günceller, stok hariç (eski ad/barkod okunduğundan BEGIN IMMEDIATE içinde).
+
+    Başarılıysa True, barkod şubede başka üründe kayıtlıysa DUPLICATE_BARCODE, hata olursa False döner.
+    """
+    name_key = turkish_sort_key(name)
+    def update():
+        with transaction(immediate=True) as cursor:
+            old = cursor.execute(
+                "SELECT name_key, barcode FROM products WHERE id = ?", (product_id,)
+            ).fetchone()
+            cursor.execute('''
+                UPDATE products 
+                SET name = ?, name_key = ?, barcode = ?, min_stock = ?, unit_price = ?
+                WHERE id = ?
+            ''', (name, name_key, barcode if barcode else None, min_stock, unit_price, product_id))
+            if old:
+                _sync_product_search(cursor, product_id, old=tuple(old), new=(name_key, barcode if barcode else None))
     
     try:
-        cursor.execute('''
-            UPDATE products 
-            SET name = ?, barcode = ?, min_stock = ?, unit_price = ?
-            WHERE id = ?
-        ''', (name, barcode if barcode else None, min_stock, unit_price, product_id))
-        conn.commit()
+        run_with_busy_retry(update)
+        _invalidate_barcode_cache(product_id)
         return True
         
+    except sqlite3.IntegrityError:
+        print(f"❌ '{barcode}' barkodu bu şubede zaten kayıtlı!")
+        return DUPLICATE_BARCODE
     except Exception as e:
         print(f"Ürün güncelleme hatası: {e}")
         return False
-    finally:
-        conn.close()
 
 def delete_product(product_id):
-    """Ürünü siler"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
+    """Ürünü siler (eski ad/barkod okunduğundan BEGIN IMMEDIATE içinde)"""
+    def delete():
+        with transaction(immediate=True) as cursor:
+            old = cursor.execute(
+                "SELECT name_key, barcode FROM products WHERE id = ?", (product_id,)
+            ).fetchone()
+            cursor.execute("DELETE FROM stock_movements WHERE product_id = ?", (product_id,))
+            cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
+            if old:
+                _sync_product_search(cursor, product_id, old=tuple(old))
+    
     try:
-        cursor.execute("DELETE FROM stock_movements WHERE product_id = ?", (product_id,))
-        cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
-        conn.commit()
+        run_with_busy_retry(delete)
+        _invalidate_barcode_cache(product_id)
         return True
     except Exception as e:
         print(f"Ürün silme hatası: {e}")
         return False
-    finally:
-        conn.close()
 
 # === TOPTANCI (SUPPLIER) OPERASYONLARI ===
-def get_all_suppliers(branch_id):
-    """Tüm toptancıları getirir"""
+def get_all_suppliers(branch_id, prefix=None):
+    """Tüm toptancıları Türkçe ad sırasıyla getirir (prefix: ad öneki, büyük/küçük harf duyarsız)"""
+    if prefix:
+        return fetch_all(
+            "SELECT * FROM suppliers WHERE branch_id = ? AND name_key >= ? AND name_key < ? ORDER BY name_key",
+            (branch_id, *_prefix_range(prefix))
+        )
     return fetch_all(
-        "SELECT * FROM suppliers WHERE branch_id = ? ORDER BY name",
+        "SELECT * FROM suppliers WHERE branch_id = ? ORDER BY name_key",
         (branch_id,)
     )
 
+# get_supplier_overview için izin verilen sıralama ifadeleri
+SUPPLIER_SORT_COLUMNS = {
+    "id": "id",
+    "name": "name_key",
+    "type": "supplier_type COLLATE TURKISH",
+    "phone": "COALESCE(phone, '')",
+    "balance": "balance",
+}
+
+def get_supplier_overview(branch_id, sort="name", direction="ASC", search=""):
+    """Toptancıları bakiye, aktif/gecikmiş sayaçları ve özet sayılarıyla tek sorguda getirir
+
+    sort: SUPPLIER_SORT_COLUMNS anahtarlarından biri, direction: 'ASC' / 'DESC'
+    Özet sayaçlar şube toplamıdır; aramaya uyan satır sayısı match_count'tadır.
+    """
+    order_by = SUPPLIER_SORT_COLUMNS.get(sort, SUPPLIER_SORT_COLUMNS["name"])
+    direction = "DESC" if str(direction).upper() == "DESC" else "ASC"
+    
+    query = '''
+        SELECT 
+            id, name, supplier_type, phone, email,
+            balance, active_count, overdue_count
+        FROM suppliers
+        WHERE branch_id = ?
+    '''
+    params = [branch_id]
+    
+    if search:
+        # Ad araması name_key üzerinde: Türkçe büyük/küçük harf duyarsız
+        query += " AND (name_key LIKE ? ESCAPE '\\' OR supplier_type LIKE ? ESCAPE '\\' OR phone LIKE ? ESCAPE '\\')"
+        pattern = _like_pattern(search)
+        params.extend([_like_pattern(turkish_sort_key(search)), pattern, pattern])
+    
+    query += f" ORDER BY {order_by} {direction}, id {direction}"
+    
+    suppliers = fetch_all(query, params)
+    
+    # Özet sayaçlar aramadan bağımsız olarak şubenin tamamını gösterir
+    if search:
+        totals = fetch_one('''
+            SELECT COUNT(*) AS supplier_count,
+                   COALESCE(SUM(active_count), 0) AS active_count,
+                   COALESCE(SUM(overdue_count), 0) AS overdue_count
+            FROM suppliers
+            WHERE branch_id = ?
+        ''', (branch_id,))
+    else:
+        # Arama yoksa sayaçlar satırlarda hazır; ikinci sorguya gerek yok
+        totals = {
+            'supplier_count': len(suppliers),
+            'active_count': sum(s['active_count'] for s in suppliers),
+            'overdue_count': sum(s['overdue_count'] for s in suppliers),
+        }
+    
+    return {
+        'suppliers': suppliers,
+        'match_count': len(suppliers),
+        'supplier_count': totals['supplier_count'],
+        'active_count': totals['active_count'],
+        'overdue_count': totals['overdue_count'],
+    }
+
 def add_supplier(branch_id, name, supplier_type, phone="", email=""):
     """Yeni toptancı ekler - supplier_type artık serbest metin"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
-            INSERT INTO suppliers (branch_id, name, supplier_type, phone, email, created_date)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (branch_id, name, supplier_type.strip(), phone, email,
-              datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        conn.commit()
-        return cursor.lastrowid
+        with transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO suppliers (branch_id, name, name_key, supplier_type, phone, email, created_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (branch_id, name, turkish_sort_key(name), supplier_type.strip(), phone, email,
+                  datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            return cursor.lastrowid
     except Exception as e:
         print(f"Toptancı ekleme hatası: {e}")
         return None
-    finally:
-        conn.close()
 
 def update_supplier(supplier_id, name, supplier_type, phone, email):
     """Toptancı bilgilerini günceller - supplier_type serbest metin"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
-            UPDATE suppliers 
-            SET name = ?, supplier_type = ?, phone = ?, email = ?
-            WHERE id = ?
-        ''', (name, supplier_type.strip(), phone, email, supplier_id))
-        conn.commit()
+        with transaction() as cursor:
+            cursor.execute('''
+                UPDATE suppliers 
+                SET name = ?, name_key = ?, supplier_type = ?, phone = ?, email = ?
+                WHERE id = ?
+            ''', (name, turkish_sort_key(name), supplier_type.strip(), phone, email, supplier_id))
         return True
     except Exception as e:
         print(f"Toptancı güncelleme hatası: {e}")
         return False
-    finally:
-        conn.close()
 
 def delete_supplier(supplier_id):
-    """Toptancıyı siler (bakiyeleri de)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    """Toptancıyı siler (bakiyeleri de, suppliers.balance satırla birlikte gider)"""
     try:
-        cursor.execute("DELETE FROM supplier_balances WHERE supplier_id = ?", (supplier_id,))
-        cursor.execute("DELETE FROM suppliers WHERE id = ?", (supplier_id,))
-        conn.commit()
+        with transaction() as cursor:
+            cursor.execute("DELETE FROM supplier_balances WHERE supplier_id = ?", (supplier_id,))
+            cursor.execute("DELETE FROM suppliers WHERE id = ?", (supplier_id,))
         return True
     except Exception as e:
         print(f"Toptancı silme hatası: {e}")
         return False
-    finally:
-        conn.close()
 
 # === AKILLI BAKİYE SİSTEMİ ===
 def add_smart_balance_transaction(supplier_id, transaction_type, amount, due_date=None, description="", transaction_date=None):
-    """Akıllı bakiye sistemi - otomatik borç/alacak dengeler"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """Akıllı bakiye sistemi - otomatik borç/alacak dengeler.
+
+    Bakiye okuma ve yazma tek bağlantıda, tek BEGIN IMMEDIATE işlemi içinde yapılır;
+    eşzamanlı kayıtlar eski bakiyeyle hesap yapamaz. Başarılıysa sonuç sözlüğü döner:
+    previous_balance, new_balance (saklanan yeni bakiye), settled_amount (mevcut borç/alacaktan kapatılan),
+    carried_amount (yeni bakiye olarak eklenen), rows_written, balance_id.
+    """
+    def post():
+        with transaction(immediate=True) as cursor:
+            return _post_smart_balance(
+                cursor, supplier_id, transaction_type, amount, due_date, description, transaction_date
+            )
     
     try:
-        # Mevcut toplam bakiyeyi al
-        current_balance = get_supplier_total_balance(supplier_id)
-        
-        if transaction_date is None:
-            transaction_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # İŞLEM TÜRÜNE GÖRE AKILLI HESAPLAMA
-        if transaction_type == "ODEME":
-            # ÖDEME: Borçtan düş, fazla varsa alacak oluştur
-            if current_balance < 0:  # Borcumuz var
-                if amount <= abs(current_balance):  # Borçtan düş
-                    new_balance = current_balance + amount
-                    description = f"Ödeme: ₺{amount:.2f} borçtan düşüldü"
-                else:  # Fazla ödeme - alacak oluşur
-                    excess = amount - abs(current_balance)
-                    new_balance = excess  # Artık alacağımız var
-                    description = f"Ödeme: ₺{amount:.2f} (₺{abs(current_balance):.2f} borç kapatıldı, ₺{excess:.2f} alacak)"
-            else:  # Alacağımız var ya da sıfır
-                new_balance = current_balance + amount  # Alacağımız artar
-                description = f"Ödeme: ₺{amount:.2f} alacak eklendi"
-                
-            # Ödeme işlemini kaydet
-            cursor.execute('''
-                INSERT INTO supplier_balances (supplier_id, type, amount, due_date, status, description, date)
-                VALUES (?, 'ALACAK', ?, ?, 'ODENDI', ?, ?)
-            ''', (supplier_id, amount, due_date, description, transaction_date))
-            
-        elif transaction_type == "ALIS":
-            # ALIŞ: Alacağımızdan düş, fazla varsa borç oluştur
-            if current_balance > 0:  # Alacağımız var
-                if amount <= current_balance:  # Alacağımızdan düş
-                    new_balance = current_balance - amount
-                    description = f"Alış: ₺{amount:.2f} alacağımızdan düşüldü"
-                else:  # Fazla alış - borç oluşur
-                    excess = amount - current_balance
-                    new_balance = -excess  # Artık borcumuz var
-                    description = f"Alış: ₺{amount:.2f} (₺{current_balance:.2f} alacağımız kapatıldı, ₺{excess:.2f} borç)"
-            else:  # Borcumuz var ya da sıfır
-                new_balance = current_balance - amount  # Borcumuz artar
-                description = f"Alış: ₺{amount:.2f} borç eklendi"
-                
-            # Alış işlemini kaydet
-            cursor.execute('''
-                INSERT INTO supplier_balances (supplier_id, type, amount, due_date, status, description, date)
-                VALUES (?, 'BORC', ?, ?, 'AKTIF', ?, ?)
-            ''', (supplier_id, amount, due_date, description, transaction_date))
-            
-        elif transaction_type == "BORC":
-            # BORÇ: Direkt borç ekle
-            new_balance = current_balance - amount
-            cursor.execute('''
-                INSERT INTO supplier_balances (supplier_id, type, amount, due_date, status, description, date)
-                VALUES (?, 'BORC', ?, ?, 'AKTIF', ?, ?)
-            ''', (supplier_id, amount, due_date, description, transaction_date))
-            
-        elif transaction_type == "ALACAK":
-            # ALACAK: Direkt alacak ekle
-            new_balance = current_balance + amount
-            cursor.execute('''
-                INSERT INTO supplier_balances (supplier_id, type, amount, due_date, status, description, date)
-                VALUES (?, 'ALACAK', ?, ?, 'AKTIF', ?, ?)
-            ''', (supplier_id, amount, due_date, description, transaction_date))
-        
-        conn.commit()
-        return new_balance
-        
+        return run_with_busy_retry(post)
     except Exception as e:
         print(f"Akıllı bakiye hatası: {e}")
         return None
-    finally:
-        conn.close()
 
-def get_supplier_balances(branch_id):
-    """Toptancı bakiyelerini getirir (birleştirilmiş)"""
-    return fetch_all('''
+def _post_smart_balance(cursor, supplier_id, transaction_type, amount, due_date, description, transaction_date):
+    """add_smart_balance_transaction'ın işlem içindeki asıl hesaplaması"""
+    # Mevcut toplam bakiyeyi aynı işlem içinde al
+    cursor.execute("SELECT balance FROM suppliers WHERE id = ?", (supplier_id,))
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Toptancı bulunamadı: {supplier_id}")
+    current_balance = row['balance'] or 0
+    
+    if transaction_date is None:
+        transaction_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    settled = 0
+    
+    # İŞLEM TÜRÜNE GÖRE AKILLI HESAPLAMA
+    if transaction_type == "ODEME":
+        # ÖDEME: Borçtan düş, fazla varsa alacak oluştur
+        if current_balance < 0:  # Borcumuz var
+            settled = min(amount, abs(current_balance))
+            if amount <= abs(current_balance):  # Borçtan düş
+                description = f"Ödeme: ₺{amount:.2f} borçtan düşüldü"
+            else:  # Fazla ödeme - alacak oluşur
+                description = f"Ödeme: ₺{amount:.2f} (₺{abs(current_balance):.2f} borç kapatıldı, ₺{amount - settled:.2f} alacak)"
+        else:  # Alacağımız var ya da sıfır
+            description = f"Ödeme: ₺{amount:.2f} alacak eklendi"
+        row_values = ('ALACAK', 'ODENDI')
+    
+    elif transaction_type == "ALIS":
+        # ALIŞ: Alacağımızdan düş, fazla varsa borç oluştur
+        if current_balance > 0:  # Alacağımız var
+            settled = min(amount, current_balance)
+            if amount <= current_balance:  # Alacağımızdan düş
+                description = f"Alış: ₺{amount:.2f} alacağımızdan düşüldü"
+            else:  # Fazla alış - borç oluşur
+                description = f"Alış: ₺{amount:.2f} (₺{current_balance:.2f} alacağımız kapatıldı, ₺{amount - settled:.2f} borç)"
+        else:  # Borcumuz var ya da sıfır
+            description = f"Alış: ₺{amount:.2f} borç eklendi"
+        row_values = ('BORC', 'AKTIF')
+    
+    elif transaction_type == "BORC":
+        # BORÇ: Direkt borç ekle
+        row_values = ('BORC', 'AKTIF')
+    
+    elif transaction_type == "ALACAK":
+        # ALACAK: Direkt alacak ekle
+        row_values = ('ALACAK', 'AKTIF')
+    
+    else:
+        raise ValueError(f"Geçersiz işlem türü: {transaction_type}")
+    
+    balance_type, status = row_values
+    cursor.execute('''
+        INSERT INTO supplier_balances (supplier_id, type, amount, due_date, status, description, date)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (supplier_id, balance_type, amount, due_date, status, description, transaction_date))
+    balance_id = cursor.lastrowid
+    _adjust_supplier_totals(cursor, supplier_id, new_row=(balance_type, amount, status))
+    
+    # Dönen bakiye suppliers.balance'ta saklanan değerdir; ODEME satırı ODENDI
+    # durumunda yazıldığı için bakiyeyi değiştirmez
+    new_balance = current_balance + _balance_row_totals(balance_type, amount, status)[0]
+    
+    return {
+        'previous_balance': current_balance,
+        'new_balance': new_balance,
+        'settled_amount': settled,
+        'carried_amount': amount - settled,
+        'rows_written': 1,
+        'balance_id': balance_id,
+    }
+
+def _balance_row_totals(balance_type, amount, status):
+    """Bir bakiye satırının toptancı özetine katkısı: (bakiye, aktif sayısı, gecikmiş sayısı)"""
+    effect = 0
+    if status == 'AKTIF':
+        effect = amount if balance_type == 'ALACAK' else -amount
+    return effect, int(status == 'AKTIF'), int(status == 'GECIKMIS')
+
+def _adjust_supplier_totals(cursor, supplier_id, old_row=None, new_row=None):
+    """suppliers özet sütunlarını (balance, active_count, overdue_count) aynı işlem içinde günceller
+
+    old_row / new_row: bakiye satırının önceki ve yeni hali, (type, amount, status)
+    """
+    old = _balance_row_totals(*old_row) if old_row else (0, 0, 0)
+    new = _balance_row_totals(*new_row) if new_row else (0, 0, 0)
+    deltas = [n - o for n, o in zip(new, old)]
+    if any(deltas):
+        cursor.execute('''
+            UPDATE suppliers
+            SET balance = balance + ?, active_count = active_count + ?, overdue_count = overdue_count + ?
+            WHERE id = ?
+        ''', (*deltas, supplier_id))
+
+def _rebuild_supplier_balances(cursor, supplier_id=None):
+    """suppliers özet sütunlarını supplier_balances tablosundan yeniden hesaplar"""
+    query = '''
+        UPDATE suppliers SET
+            balance = COALESCE((
+                SELECT SUM(CASE WHEN sb.type = 'ALACAK' THEN sb.amount ELSE -sb.amount END)
+                FROM supplier_balances sb
+                WHERE sb.supplier_id = suppliers.id AND sb.status = 'AKTIF'
+            ), 0),
+            active_count = (
+                SELECT COUNT(*) FROM supplier_balances sb
+                WHERE sb.supplier_id = suppliers.id AND sb.status = 'AKTIF'
+            ),
+            overdue_count = (
+                SELECT COUNT(*) FROM supplier_balances sb
+                WHERE sb.supplier_id = suppliers.id AND sb.status = 'GECIKMIS'
+            )
+    '''
+    if supplier_id is None:
+        cursor.execute(query)
+    else:
+        cursor.execute(query + " WHERE id = ?", (supplier_id,))
+
+def rebuild_supplier_balances():
+    """Tüm toptancı bakiye ve sayaçlarını ham kayıtlardan yeniden hesaplar"""
+    with transaction() as cursor:
+        _rebuild_supplier_balances(cursor)
+
+SUPPLIER_BALANCES_QUERY = '''
         SELECT 
             sb.id,
             sb.supplier_id,
@@ -413,18 +1310,32 @@ def get_supplier_balances(branch_id):
             WHEN sb.status = 'GECIKMIS' OR sb.due_date < date('now') THEN 2
             ELSE 3
         END, sb.due_date ASC
-    ''', (branch_id,))
+    '''
+
+def get_supplier_balances(branch_id, compact=False):
+    """Toptancı bakiyelerini getirir (birleştirilmiş)"""
+    return fetch_all(SUPPLIER_BALANCES_QUERY, (branch_id,), compact)
+
+def iter_supplier_balances(branch_id, batch_size=500):
+    """get_supplier_balances'ın akış hali (CompactRows parçaları)"""
+    return fetch_iter(SUPPLIER_BALANCES_QUERY, (branch_id,), batch_size, compact=True)
+
+def iter_suppliers(branch_id, batch_size=500):
+    """Şubenin toptancılarını akış halinde getirir (CompactRows parçaları)"""
+    return fetch_iter(
+        "SELECT * FROM suppliers WHERE branch_id = ? ORDER BY name_key",
+        (branch_id,), batch_size, compact=True
+    )
+
+def count_suppliers(branch_id):
+    """Şubedeki toptancı sayısı"""
+    return fetch_one("SELECT COUNT(*) as total FROM suppliers WHERE branch_id = ?", (branch_id,))['total']
 
 def get_supplier_total_balance(supplier_id):
-    """Toptancının toplam bakiyesini hesaplar"""
-    result = fetch_one('''
-        SELECT 
-            SUM(CASE WHEN type = 'ALACAK' THEN amount ELSE -amount END) as total
-        FROM supplier_balances
-        WHERE supplier_id = ? AND status = 'AKTIF'
-    ''', (supplier_id,))
+    """Toptancının toplam bakiyesini getirir (suppliers.balance'ta tutulur)"""
+    result = fetch_one("SELECT balance FROM suppliers WHERE id = ?", (supplier_id,))
     
-    return result['total'] if result and result['total'] else 0
+    return result['balance'] if result and result['balance'] else 0
 
 def get_due_supplier_balances(branch_id, days=7):
     """Yaklaşan ödemeleri getirir – NULL vade tarihleri hariç"""
@@ -468,67 +1379,142 @@ def get_supplier_transaction_history(supplier_id):
     ''', (supplier_id,))
 
 def update_balance_status(balance_id, new_status):
-    """Bakiye durumunu günceller"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """Bakiye durumunu günceller (eski durum okunduğundan BEGIN IMMEDIATE içinde)"""
+    def update():
+        with transaction(immediate=True) as cursor:
+            cursor.execute(
+                "SELECT supplier_id, type, amount, status FROM supplier_balances WHERE id = ?",
+                (balance_id,)
+            )
+            row = cursor.fetchone()
+            cursor.execute(
+                "UPDATE supplier_balances SET status = ? WHERE id = ?",
+                (new_status, balance_id)
+            )
+            if row:
+                _adjust_supplier_totals(
+                    cursor, row['supplier_id'],
+                    old_row=(row['type'], row['amount'], row['status']),
+                    new_row=(row['type'], row['amount'], new_status)
+                )
     
     try:
-        cursor.execute(
-            "UPDATE supplier_balances SET status = ? WHERE id = ?",
-            (new_status, balance_id)
-        )
-        conn.commit()
+        run_with_busy_retry(update)
         return True
     except Exception as e:
         print(f"Durum güncelleme hatası: {e}")
         return False
-    finally:
-        conn.close()
 
 # === YARDIMCI FONKSIYONLAR ===
 def execute_query(query, params=()):
     """Genel sorgu çalıştırıcı"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute(query, params)
 
-def fetch_all(query, params=()):
-    """Tüm satırları getirir"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    results = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return results
+class CompactRows(list):
+    """fetch_all(compact=True) sonucu: satırlar düz tuple, sütun indeksleri .columns içinde.
 
-def fetch_one(query, params=()):
-    """Tek satır getirir"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    result = cursor.fetchone()
-    conn.close()
-    return dict(result) if result else None
+    Örnek: c = rows.columns; for row in rows: row[c['date']]
+    """
+    __slots__ = ("columns",)
+
+def fetch_all(query, params=(), compact=False):
+    """Tüm satırları getirir.
+
+    compact=True ise satır başına dict üretilmez; büyük rapor/liste sorguları için
+    CompactRows (tuple listesi + columns) döner.
+    """
+    cursor = get_db_connection().cursor()
+    try:
+        if compact:
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            rows = CompactRows(cursor.fetchall())
+            rows.columns = {column[0]: i for i, column in enumerate(cursor.description)}
+            return rows
+        cursor.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def fetch_iter(query, params=(), batch_size=500, compact=False):
+    """Sonuçları ayrı okuma bağlantısında fetchmany ile parça parça üretir.
 
-def get_low_stock_products(branch_id, threshold=None):
+    Her adımda en fazla batch_size satırlık bir liste verir; bellek kullanımı toplam
+    satır sayısından bağımsızdır. compact=True ise parçalar CompactRows olur.
+    """
+    cursor = get_read_connection().cursor()
+    try:
+        if compact:
+            cursor.row_factory = None
+        cursor.execute(query, params)
+        columns = {column[0]: i for i, column in enumerate(cursor.description)}
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if compact:
+                batch = CompactRows(rows)
+                batch.columns = columns
+            else:
+                batch = [dict(row) for row in rows]
+            yield batch
+    finally:
+        cursor.close()
+
+def fetch_one(query, params=(), compact=False):
+    """Tek satır getirir (compact=True ise dict yerine sqlite3.Row)"""
+    cursor = get_db_connection().execute(query, params)
+    try:
+        result = cursor.fetchone()
+    finally:
+        cursor.close()
+    if result is None or compact:
+        return result
+    return dict(result)
+
+def get_low_stock_products(branch_id, threshold=None, compact=False):
     """Stoğu azalan ürünleri getirir"""
     if threshold is None:
         return fetch_all('''
             SELECT * FROM products 
             WHERE branch_id = ? AND quantity <= min_stock
             ORDER BY quantity ASC
-        ''', (branch_id,))
+        ''', (branch_id,), compact)
     else:
         return fetch_all('''
             SELECT * FROM products 
             WHERE branch_id = ? AND quantity <= ?
             ORDER BY quantity ASC
-        ''', (branch_id, threshold))
+        ''', (branch_id, threshold), compact)
 
-def get_stock_movements_report(branch_id, product_id=None, start_date=None, end_date=None):
-    """Stok hareketlerini filtreli getirir"""
+def _stock_movements_filter(branch_id, product_id=None, start_date=None, end_date=None):
+    """Stok hareket raporunun WHERE koşulunu ve parametrelerini hazırlar"""
+    where = " WHERE sm.branch_id = ?"
+    params = [branch_id]
+    
+    if product_id:
+        where += " AND sm.product_id = ?"
+        params.append(product_id)
+    
+    if start_date:
+        where += " AND sm.date >= ?"
+        params.append(start_date)
+    
+    if end_date:
+        where += " AND sm.date <= ?"
+        params.append(end_date + " 23:59:59")
+    
+    return where, params
+
+def _stock_movements_query(branch_id, product_id=None, start_date=None, end_date=None, after=None, limit=None):
+    """Stok hareket raporu sorgusunu ve parametrelerini hazırlar (after: (tarih, id) keyset sınırı)"""
+    where, params = _stock_movements_filter(branch_id, product_id, start_date, end_date)
+    
+    if after:
+        where += " AND (sm.date, sm.id) < (?, ?)"
+        params.extend(after)
+    
     query = """
         SELECT 
             sm.id,
@@ -543,25 +1529,67 @@ def get_stock_movements_report(branch_id, product_id=None, start_date=None, end_
             sm.date
         FROM stock_movements sm
         JOIN products p ON sm.product_id = p.id
-        WHERE p.branch_id = ?
-    """
-    params = [branch_id]
-    
-    if product_id:
-        query += " AND sm.product_id = ?"
-        params.append(product_id)
+    """ + where + " ORDER BY sm.date DESC, sm.id DESC"
     
-    if start_date:
-        query += " AND sm.date >= ?"
-        params.append(start_date)
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
     
-    if end_date:
-        query += " AND sm.date <= ?"
-        params.append(end_date + " 23:59:59")
-    
-    query += " ORDER BY sm.date DESC"
+    return query, params
+
+def _keyset_page(rows, limit, compact):
+    """limit+1 satır okunmuş sonucu sayfaya ve devam anahtarına ayırır"""
+    next_token = None
+    if len(rows) > limit:
+        del rows[limit:]
+        last = rows[-1]
+        if compact:
+            next_token = (last[rows.columns['date']], last[rows.columns['id']])
+        else:
+            next_token = (last['date'], last['id'])
+    return {'rows': rows, 'next': next_token}
+
+def get_stock_movements_report(branch_id, product_id=None, start_date=None, end_date=None, compact=False):
+    """Stok hareketlerini filtreli getirir"""
+    query, params = _stock_movements_query(branch_id, product_id, start_date, end_date)
+    return fetch_all(query, params, compact)
+
+def iter_stock_movements_report(branch_id, product_id=None, start_date=None, end_date=None, batch_size=500):
+    """get_stock_movements_report'un akış hali (CompactRows parçaları)"""
+    query, params = _stock_movements_query(branch_id, product_id, start_date, end_date)
+    return fetch_iter(query, params, batch_size, compact=True)
+
+def get_stock_movements_page(branch_id, product_id=None, start_date=None, end_date=None,
+                             after_date=None, after_id=None, limit=PAGE_SIZE, compact=True):
+    """Stok hareketlerinin bir sayfasını keyset yöntemiyle getirir.
+
+    {'rows': satırlar, 'next': (after_date, after_id) ya da None} döner; 'next' bir
+    sonraki çağrıya verilir. OFFSET kullanılmadığından her sayfa sabit sürede gelir.
+    """
+    after = (after_date, after_id) if after_date is not None else None
+    query, params = _stock_movements_query(branch_id, product_id, start_date, end_date, after, limit + 1)
+    return _keyset_page(fetch_all(query, params, compact), limit, compact)
+
+def get_stock_movements_summary(branch_id, product_id=None, start_date=None, end_date=None, top=5):
+    """Stok hareket raporunun toplamlarını ve en çok hareket gören ürünleri getirir"""
+    where, params = _stock_movements_filter(branch_id, product_id, start_date, end_date)
+    rows = fetch_all('''
+        SELECT 
+            p.name as product_name,
+            COUNT(*) as movement_count,
+            SUM(CASE WHEN sm.type = 'IN' THEN sm.quantity ELSE 0 END) as total_in,
+            SUM(CASE WHEN sm.type = 'OUT' THEN sm.quantity ELSE 0 END) as total_out
+        FROM stock_movements sm
+        JOIN products p ON sm.product_id = p.id
+    ''' + where + " GROUP BY p.name", params)
     
-    return fetch_all(query, params)
+    top_products = sorted(rows, key=lambda row: row['movement_count'], reverse=True)[:top]
+    return {
+        'total_movements': sum(row['movement_count'] for row in rows),
+        'total_in': sum(row['total_in'] for row in rows),
+        'total_out': sum(row['total_out'] for row in rows),
+        'top_products': [(row['product_name'], row['movement_count']) for row in top_products]
+    }
 
 # === UYARI SISTEMI ===
 def get_due_payments(branch_id, days=7):
@@ -578,88 +1606,299 @@ def get_due_payments(branch_id, days=7):
         ORDER BY sb.due_date ASC
     ''', (branch_id, target_date))
 
-if __name__ == "__main__":
-    initialize_database()
 # === GELIR/GIDER (FINANCE) OPERASYONLARI ===
 
+def _normalize_datetime(value):
+    """'YYYY-MM-DD' değerini 'YYYY-MM-DD 00:00:00' biçimine tamamlar"""
+    if value and len(value) == 10:
+        return f"{value} 00:00:00"
+    return value
+
+def _day_after(date):
+    """'YYYY-MM-DD' gününün ertesi günü (yarı açık aralığın üst sınırı)"""
+    return (datetime.strptime(date[:10], "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+def _adjust_daily_rollup(cursor, old_row=None, new_row=None):
+    """transaction_daily_rollup tablosunu aynı işlem içinde günceller
+
+    old_row / new_row: işlemin önceki ve yeni hali,
+    (branch_id, date, type, payment_method, category, amount)
+    """
+    if old_row:
+        branch_id, date, trans_type, payment_method, category, amount = old_row
+        key = (branch_id, date[:10], trans_type, payment_method or "", category or "")
+        cursor.execute('''
+            UPDATE transaction_daily_rollup SET amount = amount - ?, count = count - 1
+            WHERE branch_id = ? AND day = ? AND type = ? AND payment_method = ? AND category = ?
+        ''', (amount, *key))
+        cursor.execute('''
+            DELETE FROM transaction_daily_rollup
+            WHERE branch_id = ? AND day = ? AND type = ? AND payment_method = ? AND category = ?
+            AND count <= 0
+        ''', key)
+    
+    if new_row:
+        branch_id, date, trans_type, payment_method, category, amount = new_row
+        key = (branch_id, date[:10], trans_type, payment_method or "", category or "")
+        cursor.execute('''
+            UPDATE transaction_daily_rollup SET amount = amount + ?, count = count + 1
+            WHERE branch_id = ? AND day = ? AND type = ? AND payment_method = ? AND category = ?
+        ''', (amount, *key))
+        if cursor.rowcount == 0:
+            cursor.execute('''
+                INSERT INTO transaction_daily_rollup
+                    (branch_id, day, type, payment_method, category, amount, count)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+            ''', (*key, amount))
+
+def _rebuild_transaction_rollup(cursor, branch_id=None):
+    """transaction_daily_rollup tablosunu transactions tablosundan yeniden hesaplar"""
+    where = "" if branch_id is None else " WHERE branch_id = ?"
+    params = () if branch_id is None else (branch_id,)
+    cursor.execute("DELETE FROM transaction_daily_rollup" + where, params)
+    cursor.execute('''
+        INSERT INTO transaction_daily_rollup
+            (branch_id, day, type, payment_method, category, amount, count)
+        SELECT branch_id, substr(date, 1, 10), type,
+               COALESCE(payment_method, ''), COALESCE(category, ''),
+               SUM(amount), COUNT(*)
+        FROM transactions
+    ''' + where + " GROUP BY 1, 2, 3, 4, 5", params)
+
+def rebuild_transaction_rollup(branch_id=None):
+    """Günlük gelir/gider toplamlarını ham işlemlerden yeniden hesaplar"""
+    with transaction() as cursor:
+        _rebuild_transaction_rollup(cursor, branch_id)
+
+# transaction_stats sütunları (get_transaction_stats sonucu ile aynı sırada)
+TRANSACTION_STATS_COLUMNS = (
+    "total_count", "income_count", "expense_count", "cash_total", "credit_total", "bank_total"
+)
+
+# Ham tablodan aynı sayaçları hesaplayan ifadeler (rebuild / verify)
+_TRANSACTION_STATS_SELECT = '''
+    SELECT 
+        branch_id,
+        COUNT(*) as total_count,
+        SUM(CASE WHEN type = 'GELIR' THEN 1 ELSE 0 END) as income_count,
+        SUM(CASE WHEN type = 'GIDER' THEN 1 ELSE 0 END) as expense_count,
+        SUM(CASE WHEN payment_method = 'NAKIT' THEN amount ELSE 0 END) as cash_total,
+        SUM(CASE WHEN payment_method = 'KREDI' THEN amount ELSE 0 END) as credit_total,
+        SUM(CASE WHEN payment_method = 'BANKA' THEN amount ELSE 0 END) as bank_total
+    FROM transactions
+'''
+
+def _transaction_stats_values(trans_type, payment_method, amount):
+    """Bir işlemin şube sayaçlarına katkısı (TRANSACTION_STATS_COLUMNS sırasıyla)"""
+    return (
+        1,
+        int(trans_type == 'GELIR'),
+        int(trans_type == 'GIDER'),
+        amount if payment_method == 'NAKIT' else 0,
+        amount if payment_method == 'KREDI' else 0,
+        amount if payment_method == 'BANKA' else 0,
+    )
+
+def _adjust_transaction_stats(cursor, old_row=None, new_row=None):
+    """transaction_stats sayaçlarını aynı işlem içinde günceller (satır biçimi _adjust_daily_rollup ile aynı)"""
+    deltas = {}
+    for row, sign in ((old_row, -1), (new_row, 1)):
+        if not row:
+            continue
+        branch_id, _date, trans_type, payment_method, _category, amount = row
+        values = _transaction_stats_values(trans_type, payment_method, amount)
+        current = deltas.setdefault(branch_id, [0] * len(values))
+        for i, value in enumerate(values):
+            current[i] += sign * value
+    
+    assignments = ", ".join(f"{column} = {column} + ?" for column in TRANSACTION_STATS_COLUMNS)
+    for branch_id, delta in deltas.items():
+        if not any(delta):
+            continue
+        cursor.execute(
+            f"UPDATE transaction_stats SET {assignments} WHERE branch_id = ?",
+            (*delta, branch_id)
+        )
+        if cursor.rowcount == 0:
+            cursor.execute(
+                f"INSERT INTO transaction_stats (branch_id, {', '.join(TRANSACTION_STATS_COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (branch_id, *delta)
+            )
+
+def _rebuild_transaction_stats(cursor, branch_id=None):
+    """transaction_stats sayaçlarını transactions tablosundan yeniden hesaplar"""
+    where = "" if branch_id is None else " WHERE branch_id = ?"
+    params = () if branch_id is None else (branch_id,)
+    cursor.execute("DELETE FROM transaction_stats" + where, params)
+    cursor.execute(
+        f"INSERT INTO transaction_stats (branch_id, {', '.join(TRANSACTION_STATS_COLUMNS)}) "
+        + _TRANSACTION_STATS_SELECT + where + " GROUP BY branch_id",
+        params
+    )
+
+def verify_transaction_stats(repair=False):
+    """Şube sayaçlarını ham transactions tablosuyla karşılaştırır.
+
+    Uyuşmayan şube id'lerinin listesini döner; repair=True ise onları yeniden hesaplar.
+    """
+    raw = {row['branch_id']: row for row in fetch_all(_TRANSACTION_STATS_SELECT + " GROUP BY branch_id")}
+    stored = {row['branch_id']: row for row in fetch_all("SELECT * FROM transaction_stats")}
+    
+    mismatched = []
+    for branch_id in sorted(set(raw) | set(stored)):
+        expected = raw.get(branch_id, {})
+        actual = stored.get(branch_id, {})
+        for column in TRANSACTION_STATS_COLUMNS:
+            if abs((expected.get(column) or 0) - (actual.get(column) or 0)) > 1e-6:
+                mismatched.append(branch_id)
+                break
+    
+    if repair and mismatched:
+        with transaction() as cursor:
+            for branch_id in mismatched:
+                _rebuild_transaction_stats(cursor, branch_id)
+    return mismatched
+
+def _adjust_finance_aggregates(cursor, old_row=None, new_row=None):
+    """Bir gelir/gider yazımının günlük toplamlara ve şube sayaçlarına etkisini uygular"""
+    _adjust_daily_rollup(cursor, old_row, new_row)
+    _adjust_transaction_stats(cursor, old_row, new_row)
+
 def add_transaction(branch_id, trans_type, amount, payment_method, date=None, description="", category=""):
     """Yeni gelir/gider kaydı ekle"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        date = _normalize_datetime(date)
         
-        cursor.execute('''
-            INSERT INTO transactions (branch_id, type, amount, payment_method, date, description, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (branch_id, trans_type, amount, payment_method, date, description, category))
-        
-        conn.commit()
-        return cursor.lastrowid
+        with transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO transactions (branch_id, type, amount, payment_method, date, description, category)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (branch_id, trans_type, amount, payment_method, date, description, category))
+            trans_id = cursor.lastrowid
+            _adjust_finance_aggregates(cursor, new_row=(branch_id, date, trans_type, payment_method, category, amount))
+            return trans_id
     except Exception as e:
         print(f"Gelir/Gider ekleme hatası: {e}")
         return None
-    finally:
-        conn.close()
 
-def get_transactions(branch_id, start_date=None, end_date=None, trans_type=None, payment_method=None):
-    """Tarih aralığına ve filtrelere göre işlemleri getir"""
-    query = """
-        SELECT * FROM transactions 
-        WHERE branch_id = ?
-    """
+def _transactions_filter(branch_id, start_date=None, end_date=None, trans_type=None, payment_method=None,
+                         search=None):
+    """İşlem listesinin WHERE koşulunu ve parametrelerini hazırlar"""
+    where = " WHERE branch_id = ?"
     params = [branch_id]
     
     if start_date:
-        query += " AND DATE(date) >= ?"
+        where += " AND date >= ?"
         params.append(start_date)
     if end_date:
-        query += " AND DATE(date) <= ?"
-        params.append(end_date)
+        where += " AND date < ?"
+        params.append(_day_after(end_date))
     if trans_type:
-        query += " AND type = ?"
+        where += " AND type = ?"
         params.append(trans_type)
     if payment_method:
-        query += " AND payment_method = ?"
+        where += " AND payment_method = ?"
         params.append(payment_method)
+    if search:
+        # % ve _ arama metninde joker değil, düz karakter olarak aranır
+        where += " AND (description LIKE ? ESCAPE '\\' OR CAST(amount AS TEXT) LIKE ? ESCAPE '\\')"
+        params.extend([_like_pattern(search)] * 2)
     
-    query += " ORDER BY date DESC"
+    return where, params
+
+def _transactions_query(branch_id, start_date=None, end_date=None, trans_type=None, payment_method=None,
+                        search=None, after=None, limit=None):
+    """İşlem listesi sorgusunu ve parametrelerini hazırlar (after: (tarih, id) keyset sınırı)"""
+    where, params = _transactions_filter(branch_id, start_date, end_date, trans_type, payment_method, search)
+    
+    if after:
+        where += " AND (date, id) < (?, ?)"
+        params.extend(after)
+    
+    query = "SELECT * FROM transactions" + where + " ORDER BY date DESC, id DESC"
+    
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
     
-    return fetch_all(query, params)
+    return query, params
 
-def get_daily_total(branch_id, date=None):
-    """Belirli tarihin gelir/gider toplamını getir"""
-    if date is None:
-        date = datetime.now().strftime("%Y-%m-%d")
+def get_transactions(branch_id, start_date=None, end_date=None, trans_type=None, payment_method=None, compact=False):
+    """Tarih aralığına ve filtrelere göre işlemleri getir"""
+    query, params = _transactions_query(branch_id, start_date, end_date, trans_type, payment_method)
+    return fetch_all(query, params, compact)
+
+def iter_transactions(branch_id, start_date=None, end_date=None, trans_type=None, payment_method=None,
+                      batch_size=500):
+    """get_transactions'ın akış hali (CompactRows parçaları)"""
+    query, params = _transactions_query(branch_id, start_date, end_date, trans_type, payment_method)
+    return fetch_iter(query, params, batch_size, compact=True)
+
+def get_transactions_page(branch_id, start_date=None, end_date=None, trans_type=None, payment_method=None,
+                          search=None, after_date=None, after_id=None, limit=PAGE_SIZE, compact=True):
+    """İşlemlerin bir sayfasını keyset yöntemiyle getirir.
+
+    {'rows': satırlar, 'next': (after_date, after_id) ya da None} döner; 'next' bir
+    sonraki çağrıya verilir. Sıralama (branch_id, date) indeksinden (rowid = id) okunur.
+    """
+    after = (after_date, after_id) if after_date is not None else None
+    query, params = _transactions_query(branch_id, start_date, end_date, trans_type, payment_method,
+                                        search, after, limit + 1)
+    return _keyset_page(fetch_all(query, params, compact), limit, compact)
+
+def get_transactions_summary(branch_id, start_date=None, end_date=None, trans_type=None, payment_method=None,
+                             search=None):
+    """Filtrelenmiş işlem listesinin toplamlarını getir"""
+    if not search:
+        return _rollup_summary(branch_id, start_date, end_date, trans_type, payment_method)
     
+    where, params = _transactions_filter(branch_id, start_date, end_date, trans_type, payment_method, search)
     result = fetch_one('''
         SELECT 
             SUM(CASE WHEN type = 'GELIR' THEN amount ELSE 0 END) as total_income,
             SUM(CASE WHEN type = 'GIDER' THEN amount ELSE 0 END) as total_expense,
-            SUM(CASE WHEN type = 'GELIR' THEN amount ELSE -amount END) as net_profit
-        FROM transactions 
-        WHERE branch_id = ? AND DATE(date) = ?
-    ''', (branch_id, date))
+            SUM(CASE WHEN type = 'GELIR' THEN amount ELSE -amount END) as net_profit,
+            COUNT(*) as transaction_count
+        FROM transactions
+    ''' + where, params)
     
     return {
         'income': result['total_income'] or 0,
         'expense': result['total_expense'] or 0,
-        'net': result['net_profit'] or 0
+        'net': result['net_profit'] or 0,
+        'count': result['transaction_count'] or 0
     }
 
-def get_period_summary(branch_id, start_date, end_date):
-    """Belirli tarih aralığının özetini getir"""
-    result = fetch_one('''
+def _rollup_summary(branch_id, start_day=None, end_day=None, trans_type=None, payment_method=None):
+    """Günlük toplam tablosundan gelir/gider özeti (gün sayısıyla orantılı)"""
+    query = '''
         SELECT 
             SUM(CASE WHEN type = 'GELIR' THEN amount ELSE 0 END) as total_income,
             SUM(CASE WHEN type = 'GIDER' THEN amount ELSE 0 END) as total_expense,
             SUM(CASE WHEN type = 'GELIR' THEN amount ELSE -amount END) as net_profit,
-            COUNT(*) as transaction_count
-        FROM transactions 
-        WHERE branch_id = ? AND DATE(date) BETWEEN ? AND ?
-    ''', (branch_id, start_date, end_date))
+            SUM(count) as transaction_count
+        FROM transaction_daily_rollup
+        WHERE branch_id = ?
+    '''
+    params = [branch_id]
+    
+    if start_day:
+        query += " AND day >= ?"
+        params.append(start_day[:10])
+    if end_day:
+        query += " AND day <= ?"
+        params.append(end_day[:10])
+    if trans_type:
+        query += " AND type = ?"
+        params.append(trans_type)
+    if payment_method:
+        query += " AND payment_method = ?"
+        params.append(payment_method)
+    
+    result = fetch_one(query, params)
     
     return {
         'income': result['total_income'] or 0,
@@ -668,52 +1907,206 @@ def get_period_summary(branch_id, start_date, end_date):
         'count': result['transaction_count'] or 0
     }
 
+def get_daily_total(branch_id, date=None):
+    """Belirli tarihin gelir/gider toplamını getir"""
+    if date is None:
+        date = datetime.now().strftime("%Y-%m-%d")
+    
+    summary = _rollup_summary(branch_id, date, date)
+    del summary['count']
+    return summary
+
+def get_period_summary(branch_id, start_date, end_date):
+    """Belirli tarih aralığının özetini getir"""
+    return _rollup_summary(branch_id, start_date, end_date)
+
 def update_transaction(trans_id, trans_type, amount, payment_method, date, description="", category=""):
-    """İşlem kaydını güncelle"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """İşlem kaydını güncelle (eski satır okunduğundan BEGIN IMMEDIATE içinde)"""
+    def update():
+        with transaction(immediate=True) as cursor:
+            old = cursor.execute(
+                "SELECT branch_id, date, type, payment_method, category, amount FROM transactions WHERE id = ?",
+                (trans_id,)
+            ).fetchone()
+            cursor.execute('''
+                UPDATE transactions 
+                SET type = ?, amount = ?, payment_method = ?, date = ?, description = ?, category = ?
+                WHERE id = ?
+            ''', (trans_type, amount, payment_method, date, description, category, trans_id))
+            if old:
+                _adjust_finance_aggregates(cursor, old_row=tuple(old), new_row=(
+                    old['branch_id'], date, trans_type, payment_method, category, amount
+                ))
     
     try:
-        cursor.execute('''
-            UPDATE transactions 
-            SET type = ?, amount = ?, payment_method = ?, date = ?, description = ?, category = ?
-            WHERE id = ?
-        ''', (trans_type, amount, payment_method, date, description, category, trans_id))
-        conn.commit()
+        date = _normalize_datetime(date)
+        run_with_busy_retry(update)
         return True
     except Exception as e:
         print(f"Güncelleme hatası: {e}")
         return False
-    finally:
-        conn.close()
 
 def delete_transaction(trans_id):
-    """İşlem kaydını sil"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """İşlem kaydını sil (eski satır okunduğundan BEGIN IMMEDIATE içinde)"""
+    def delete():
+        with transaction(immediate=True) as cursor:
+            old = cursor.execute(
+                "SELECT branch_id, date, type, payment_method, category, amount FROM transactions WHERE id = ?",
+                (trans_id,)
+            ).fetchone()
+            cursor.execute("DELETE FROM transactions WHERE id = ?", (trans_id,))
+            if old:
+                _adjust_finance_aggregates(cursor, old_row=tuple(old))
     
     try:
-        cursor.execute("DELETE FROM transactions WHERE id = ?", (trans_id,))
-        conn.commit()
+        run_with_busy_retry(delete)
         return True
     except Exception as e:
         print(f"Silme hatası: {e}")
         return False
-    finally:
-        conn.close()
 
 def get_transaction_stats(branch_id):
-    """Genel istatistikler"""
-    stats = fetch_one('''
-        SELECT 
-            COUNT(*) as total_count,
-            SUM(CASE WHEN type = 'GELIR' THEN 1 ELSE 0 END) as income_count,
-            SUM(CASE WHEN type = 'GIDER' THEN 1 ELSE 0 END) as expense_count,
-            SUM(CASE WHEN payment_method = 'NAKIT' THEN amount ELSE 0 END) as cash_total,
-            SUM(CASE WHEN payment_method = 'KREDI' THEN amount ELSE 0 END) as credit_total,
-            SUM(CASE WHEN payment_method = 'BANKA' THEN amount ELSE 0 END) as bank_total
-        FROM transactions 
-        WHERE branch_id = ?
-    ''', (branch_id,))
+    """Genel istatistikler (şube sayaçlarından, tek satır okuma)"""
+    stats = fetch_one(
+        f"SELECT {', '.join(TRANSACTION_STATS_COLUMNS)} FROM transaction_stats WHERE branch_id = ?",
+        (branch_id,)
+    )
     
-    return stats
+    return stats or dict.fromkeys(TRANSACTION_STATS_COLUMNS, 0)
+
+# === TEK YAZICI KUYRUĞU (GROUP COMMIT) ===
+_STOP = object()
+
+class WriteQueue:
+    """Yazma isteklerini tek bir thread'de toplu commit ile uygulayan isteğe bağlı servis.
+
+    Yoğun saatlerde her add_transaction / update_product_quantity çağrısının ayrı
+    commit'i yerine istekler kuyrukta toplanır; ilk istekten sonra en fazla
+    GROUP_COMMIT_INTERVAL_MS beklenir ya da GROUP_COMMIT_MAX_OPS istek birikince
+    hepsi tek işlemde (BEGIN IMMEDIATE ... COMMIT) uygulanır.
+
+        writer = WriteQueue().start()
+        future = writer.submit(add_transaction, 1, "GELIR", 100.0, "NAKIT")
+        trans_id = future.result()   # commit edildikten sonra döner
+        writer.stop()
+
+    Sıra: istekler submit sırasıyla, tek bağlantıda art arda uygulanır; bir
+    istek kendinden önce gönderilenlerin etkisini görür.
+
+    Dayanıklılık: Future yalnızca isteğin içinde bulunduğu toplu işlem commit
+    edildikten sonra sonuçlanır. Commit'ten önce çökme olursa o toplu işlemin
+    tamamı kaybolur (yarım kalan istek olmaz); sonucu dönmüş bir istek, doğrudan
+    çağrıyla aynı PRAGMA synchronous güvencesine sahiptir. Diğer bağlantılar
+    toplu işlemi commit anında bütün olarak görür.
+
+    Hata yalıtımı: her istek kendi SAVEPOINT'inde çalışır; hata veren istek
+    yalnızca kendi değişikliklerini geri alır, aynı toplu işlemdeki diğerleri
+    etkilenmez. Commit başarısız olursa toplu işlemdeki tüm Future'lar hatayla
+    sonuçlanır.
+
+    Not: submit edilen fonksiyon yazıcı thread'inde çalışır; içinden
+    future.result() ile kuyruğu beklememelidir.
+    """
+
+    def __init__(self, interval_ms=None, max_ops=None):
+        self.interval = (GROUP_COMMIT_INTERVAL_MS if interval_ms is None else interval_ms) / 1000
+        self.max_ops = max_ops or GROUP_COMMIT_MAX_OPS
+        self._queue = queue.Queue()
+        self._thread = None
+        self.batches = 0  # uygulanan toplu işlem sayısı
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="db-write-queue", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, func, *args, **kwargs):
+        """Yazma fonksiyonunu kuyruğa ekler; sonucu taşıyan Future döner"""
+        from concurrent.futures import Future  # açılışta logging vb. yüklenmesin
+        if self._thread is None:
+            raise RuntimeError("WriteQueue başlatılmadı")
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def flush(self):
+        """O ana kadar gönderilen tüm isteklerin commit edilmesini bekler"""
+        self.submit(lambda: None).result()
+
+    def stop(self):
+        """Kuyruktaki istekleri uygular, thread'i durdurur ve bağlantısını kapatır"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_ops:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._apply_batch(batch)
+        close_db_connection()
+
+    def _apply_batch(self, batch):
+        results = []
+        try:
+            with transaction(immediate=True):
+                for future, func, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction():  # istek başına SAVEPOINT
+                            results.append((future, func(*args, **kwargs), None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            print(f"❌ Toplu yazma hatası: {e}")
+            with _barcode_cache_lock:
+                _barcode_cache.clear()  # geri alınan eklemeler önbellekte kalmasın
+            for future, *_ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        for future, value, error in results:
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+
+
+if __name__ == "__main__":
+    initialize_database()
+    if "--rebuild-rollup" in sys.argv:
+        rebuild_transaction_rollup()
+        print("✅ Günlük gelir/gider toplamları yeniden hesaplandı")
+    if "--rebuild-search" in sys.argv:
+        rebuild_product_search()
+        print("✅ Ürün arama indeksi yeniden oluşturuldu")
+    if "--verify-stats" in sys.argv:
+        mismatched = verify_transaction_stats(repair=True)
+        if mismatched:
+            print(f"⚠️ Sayaçlar düzeltildi, şubeler: {mismatched}")
+        else:
+            print("✅ İşlem sayaçları tutarlı")
+    if "--check-plans" in sys.argv:
+        try:
+            check_query_plans()
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print("✅ Sorgu planları indeks kullanıyor")
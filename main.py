@@ -1,16 +1,101 @@
 # main.py
+import time
+
+_STARTED = time.perf_counter()  # açılış süresi ölçümü (--startup-time) için
+
 import tkinter as tk
 from tkinter import ttk
+from collections import OrderedDict
+from importlib import import_module
 import sys
 import os
 
 # Proje dizinini Python path'e ekle
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from database import initialize_database, get_all_branches
-from modules.branch_manager import BranchManagerDialog
-from modules.stock_tab import StockTab
-from modules.ui_helpers import show_toast
+from database import (
+    initialize_database, get_all_branches, checkpoint_database, shutdown_database,
+    CHECKPOINT_INTERVAL_MS
+)
+from modules.ui_helpers import show_toast, shutdown_query_executor
+
+# Sekmeler: (başlık, modül, sınıf, yeniden girişte çağrılacak yenileme metotları).
+# Modül sekme ilk seçildiğinde import edilir ve sınıf o zaman oluşturulur.
+TABS = [
+    ("📦 Stok Takibi", "modules.stock_tab", "StockTab", ("load_products",)),
+    ("🤝 Toptancı Takibi", "modules.supplier_tab", "SupplierTab", ("load_suppliers", "load_balances")),
+    ("💰 Gelir/Gider", "modules.finance_tab", "FinanceTab", ("refresh_all",)),
+]
+
+# İlk pencerenin çizilmesine kadar izin verilen süre (ms) - python main.py --startup-time
+STARTUP_BUDGET_MS = 800
+
+# Arayüzü bellekte tutulan en fazla şube sayısı (şubeler arası geçişte yeniden kurulmaz)
+BRANCH_CACHE_SIZE = 3
+
+class BranchView:
+    """Bir şubenin üst barı ve sekmeleri; sekmeler ilk seçildiklerinde kurulur"""
+    
+    def __init__(self, app, branch):
+        self.branch = branch
+        self.frame = ttk.Frame(app.main_frame)
+        self.modules = {}  # sekme indeksi -> modül nesnesi
+        
+        # Üst bar
+        top_bar = ttk.Frame(self.frame, style="Topbar.TFrame")
+        top_bar.pack(fill=tk.X)
+        
+        # Şube bilgisi
+        self.branch_label = ttk.Label(top_bar, style="Topbar.TLabel")
+        self.branch_label.pack(side=tk.LEFT, padx=20, pady=14)
+        
+        # Geri dönüş butonu
+        ttk.Button(
+            top_bar,
+            text="Şube Değiştir",
+            command=app.show_branch_selection,
+            style="Danger.TButton"
+        ).pack(side=tk.RIGHT, padx=20, pady=10)
+        
+        # Tab kontrolü
+        self.tab_control = ttk.Notebook(self.frame)
+        self.tab_control.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        self.tab_frames = []
+        for title, *_ in TABS:
+            tab_frame = tk.Frame(self.tab_control)
+            self.tab_control.add(tab_frame, text=title)
+            self.tab_frames.append(tab_frame)
+        
+        self.tab_control.bind("<<NotebookTabChanged>>", lambda e: self.build_current_tab())
+    
+    def show(self, branch):
+        self.branch = branch
+        self.branch_label.config(text=f"🏪 Aktif Şube: {branch['name']}")
+        self.frame.pack(fill=tk.BOTH, expand=True)
+        self.build_current_tab()
+    
+    def build_current_tab(self):
+        """Seçili sekme henüz kurulmadıysa modülünü import edip kurar"""
+        index = self.tab_control.index(self.tab_control.select())
+        if index in self.modules:
+            return
+        _title, module_name, class_name, _refresh = TABS[index]
+        tab_class = getattr(import_module(module_name), class_name)
+        self.modules[index] = tab_class(self.tab_frames[index], self.branch['id'])
+    
+    def refresh(self):
+        """Kurulu sekmeleri yeniler (sorgular arka planda çalışır)"""
+        for index, module in self.modules.items():
+            for method in TABS[index][3]:
+                getattr(module, method)()
+    
+    def destroy(self):
+        for module in self.modules.values():
+            queries = getattr(module, "queries", None)
+            if queries is not None:
+                queries.cancel_all()
+        self.frame.destroy()
 
 class BusinessManagerApp:
     def __init__(self, root):
@@ -22,9 +107,13 @@ class BusinessManagerApp:
         
         # Veritabanını başlat
         initialize_database()
+        self.root.after(CHECKPOINT_INTERVAL_MS, self.periodic_checkpoint)
         
-        # Aktif şube
+        # Aktif şube ve kurulmuş şube arayüzleri (en son kullanılan sonda)
         self.current_branch = None
+        self.branch_views = OrderedDict()
+        self.current_view = None
+        self.selection_frame = None
         
         # Ana çerçeve
         self.main_frame = ttk.Frame(self.root)
@@ -33,13 +122,23 @@ class BusinessManagerApp:
         # Şube seçim ekranını göster
         self.show_branch_selection()
     
+    def periodic_checkpoint(self):
+        """WAL dosyasının büyümesini engellemek için düzenli checkpoint"""
+        checkpoint_database()
+        self.root.after(CHECKPOINT_INTERVAL_MS, self.periodic_checkpoint)
+    
     def show_branch_selection(self):
-        """Şube seçim ekranını gösterir"""
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+        """Şube seçim ekranını gösterir (şube arayüzleri silinmez, gizlenir)"""
+        if self.current_view is not None:
+            self.current_view.frame.pack_forget()
+            self.current_view = None
+        if self.selection_frame is not None:
+            self.selection_frame.destroy()
+        self.selection_frame = ttk.Frame(self.main_frame)
+        self.selection_frame.pack(fill=tk.BOTH, expand=True)
         
         # Başlık
-        hero_frame = ttk.Frame(self.main_frame)
+        hero_frame = ttk.Frame(self.selection_frame)
         hero_frame.pack(fill=tk.X, padx=40, pady=(30, 20))
         ttk.Label(
             hero_frame,
@@ -53,7 +152,7 @@ class BusinessManagerApp:
         ).pack(anchor="w", pady=(8, 0))
         
         # Şube seçim butonu
-        action_frame = ttk.Frame(self.main_frame)
+        action_frame = ttk.Frame(self.selection_frame)
         action_frame.pack(fill=tk.X, padx=40, pady=(0, 20))
         ttk.Button(
             action_frame,
@@ -66,13 +165,13 @@ class BusinessManagerApp:
         branches = get_all_branches()
         if branches:
             ttk.Label(
-                self.main_frame,
+                self.selection_frame,
                 text="Mevcut Şubeler",
                 style="Section.TLabel"
             ).pack(anchor="w", padx=40, pady=(10, 10))
             
             for branch in branches:
-                branch_frame = ttk.Frame(self.main_frame, style="Card.TFrame")
+                branch_frame = ttk.Frame(self.selection_frame, style="Card.TFrame")
                 branch_frame.pack(fill=tk.X, padx=40, pady=6)
                 
                 ttk.Label(
@@ -90,6 +189,7 @@ class BusinessManagerApp:
     
     def select_branch(self):
         """Şube seçim/yaratma penceresini açar"""
+        from modules.branch_manager import BranchManagerDialog  # yalnızca açıldığında yüklenir
         dialog = BranchManagerDialog(self.root, self.set_branch)
     
     def set_branch(self, branch_data):
@@ -99,49 +199,28 @@ class BusinessManagerApp:
         self.load_main_interface()
     
     def load_main_interface(self):
-        """Ana tab arayüzünü yükler"""
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-        
-        # Üst bar
-        top_bar = ttk.Frame(self.main_frame, style="Topbar.TFrame")
-        top_bar.pack(fill=tk.X)
-        
-        # Şube bilgisi
-        branch_label = ttk.Label(
-            top_bar,
-            text=f"🏪 Aktif Şube: {self.current_branch['name']}",
-            style="Topbar.TLabel"
-        )
-        branch_label.pack(side=tk.LEFT, padx=20, pady=14)
-        
-        # Geri dönüş butonu
-        ttk.Button(
-            top_bar,
-            text="Şube Değiştir",
-            command=self.show_branch_selection,
-            style="Danger.TButton"
-        ).pack(side=tk.RIGHT, padx=20, pady=10)
+        """Şubenin arayüzünü gösterir: önbellekteyse yeniler, değilse yalnızca görünen sekmeyi kurar"""
+        if self.selection_frame is not None:
+            self.selection_frame.destroy()
+            self.selection_frame = None
+        if self.current_view is not None:
+            self.current_view.frame.pack_forget()
         
-        # Tab kontrolü
-        self.tab_control = ttk.Notebook(self.main_frame)
-        self.tab_control.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Tab'ları oluştur
-        self.stock_tab = tk.Frame(self.tab_control)
-        self.supplier_tab = tk.Frame(self.tab_control)
-        self.finance_tab = tk.Frame(self.tab_control)
+        branch_id = self.current_branch['id']
+        view = self.branch_views.get(branch_id)
+        if view is None:
+            view = BranchView(self, self.current_branch)
+            self.branch_views[branch_id] = view
+            while len(self.branch_views) > BRANCH_CACHE_SIZE:
+                _, oldest = self.branch_views.popitem(last=False)
+                oldest.destroy()
+        else:
+            self.branch_views.move_to_end(branch_id)
+            view.refresh()
         
-        self.tab_control.add(self.stock_tab, text="📦 Stok Takibi")
-        self.tab_control.add(self.supplier_tab, text="🤝 Toptancı Takibi")
-        self.tab_control.add(self.finance_tab, text="💰 Gelir/Gider")
-        
-        # Modülleri yükle
-        self.stock_module = StockTab(self.stock_tab, self.current_branch['id'])
-        from modules.supplier_tab import SupplierTab
-        self.supplier_module = SupplierTab(self.supplier_tab, self.current_branch['id'])
-        from modules.finance_tab import FinanceTab
-        self.finance_module = FinanceTab(self.finance_tab, self.current_branch['id'])
+        self.current_view = view
+        self.tab_control = view.tab_control
+        view.show(self.current_branch)
 
     def setup_styles(self):
         style = ttk.Style(self.root)
@@ -181,10 +260,30 @@ class BusinessManagerApp:
         style.map("Treeview.Heading", background=[("active", "#cbd5f5")])
         
 
+def report_startup_time(root):
+    """İlk pencere çizilene kadar geçen süreyi bütçeyle karşılaştırır.
+
+    Import dökümü için: python -X importtime main.py --startup-time
+    """
+    root.update()
+    elapsed_ms = (time.perf_counter() - _STARTED) * 1000
+    if elapsed_ms <= STARTUP_BUDGET_MS:
+        print(f"✅ Açılış: {elapsed_ms:.0f} ms (bütçe {STARTUP_BUDGET_MS} ms)")
+    else:
+        print(f"⚠️ Açılış bütçeyi aştı: {elapsed_ms:.0f} ms (bütçe {STARTUP_BUDGET_MS} ms)")
+    return elapsed_ms <= STARTUP_BUDGET_MS
+
 def main():
     root = tk.Tk()
     app = BusinessManagerApp(root)
+    if "--startup-time" in sys.argv:
+        within_budget = report_startup_time(root)
+        root.destroy()
+        shutdown_database()
+        sys.exit(0 if within_budget else 1)
     root.mainloop()
+    shutdown_query_executor()
+    shutdown_database()
 
 if __name__ == "__main__":
     main()
@@ -2,23 +2,33 @@
 import tkinter as tk
 from tkinter import ttk, filedialog
 from datetime import datetime, timedelta
+from itertools import chain
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import (
-    add_transaction, get_transactions, get_daily_total, get_period_summary,
+    add_transaction, iter_transactions, get_transactions_page, get_transactions_summary,
+    get_daily_total, get_period_summary,
     update_transaction, delete_transaction, get_transaction_stats, fetch_one
 )
-from modules.ui_helpers import show_info, show_warning, show_error, ask_confirm, show_toast
+from modules.ui_helpers import (
+    show_info, show_warning, show_error, ask_confirm, show_toast, QueryRunner, make_busy_label,
+    VirtualTree
+)
 
 class FinanceTab:
     def __init__(self, parent, branch_id):
         self.parent = parent
         self.branch_id = branch_id
         
+        # Keyset sayfalama durumu: aktif filtreler ve sonraki sayfanın anahtarı
+        self.list_filters = {}
+        self.next_token = None
+        
         self.create_widgets()
+        self.queries = QueryRunner(self.parent, on_busy=self.on_busy)
         self.load_transactions()
         self.update_summary()
     
@@ -136,7 +146,12 @@ class FinanceTab:
         ttk.Button(control_frame, text="🔍 Uygula", command=self.apply_filters).pack(side=tk.LEFT, padx=5)
         
         # Treeview
-        self.tree = ttk.Treeview(list_frame, columns=("ID", "Date", "Type", "Amount", "Payment", "Description"), 
+        tree_frame = ttk.Frame(list_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        y_scroll = tk.Scrollbar(tree_frame)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tree = ttk.Treeview(tree_frame, columns=("ID", "Date", "Type", "Amount", "Payment", "Description"), 
                                 show="headings", height=15)
         
         # Başlıklar
@@ -148,6 +163,8 @@ class FinanceTab:
             self.tree.column(col, width=width, anchor="center" if col != "Description" else "w")
         
         self.tree.pack(fill=tk.BOTH, expand=True)
+        # Büyük listelerde yalnızca görünen satırlar Treeview'de tutulur
+        self.rows = VirtualTree(self.tree, y_scroll, on_scroll=self.on_tree_scroll)
 
         self.empty_label = ttk.Label(list_frame, text="Henüz işlem yok. İlk işlemi ekleyin.", style="Empty.TLabel")
         self.empty_label.place(relx=0.5, rely=0.6, anchor="center")
@@ -169,6 +186,16 @@ class FinanceTab:
         self.total_label = ttk.Label(bottom_frame, text="Toplam: ₺0.00")
         self.total_label.pack(side=tk.LEFT)
         
+        self.loaded_label = ttk.Label(bottom_frame, text="", foreground="#64748b")
+        self.loaded_label.pack(side=tk.LEFT, padx=10)
+        
+        self.load_more_button = ttk.Button(bottom_frame, text="⬇ Daha Fazla Yükle",
+                                           command=self.load_more, state="disabled")
+        self.load_more_button.pack(side=tk.LEFT, padx=10)
+        
+        self.busy_label, self.on_busy = make_busy_label(bottom_frame)
+        self.busy_label.pack(side=tk.LEFT, padx=10)
+        
         ttk.Button(bottom_frame, text="🔄 Yenile", command=self.refresh_all).pack(side=tk.RIGHT)
     
     def add_transaction(self):
@@ -208,48 +235,77 @@ class FinanceTab:
         self.date_entry.delete(0, tk.END)
         self.date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
     
+    def refresh_all(self):
+        """Listeyi (aktif filtrelerle) ve günlük özeti yeniler"""
+        self.apply_filters()
+        self.update_summary()
+    
     def load_transactions(self, filters=None):
-        """İşlemleri yükle"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
+        """İşlemleri yükle (ilk sayfa; devamı load_more ile)"""
         if filters is None:
             filters = {}
         
-        transactions = get_transactions(self.branch_id, **filters)
-        
-        # Arama filtresi
-        search_term = self.search_var.get().lower()
-        
-        total = 0
-        for trans in transactions:
-            # Arama filtresi
-            description = trans['description'] or ""
-            if search_term and search_term not in description.lower() and search_term not in str(trans['amount']):
-                continue
-            
-            self.tree.insert("", tk.END, values=(
-                trans['id'],
-                trans['date'][:10],  # Sadece tarih kısmı
-                trans['type'],
-                f"₺{trans['amount']:.2f}",
-                trans['payment_method'],
-                trans['description'] or "-"
-            ))
-            
-            # Toplam hesaplama
-            if trans['type'] == 'GELIR':
-                total += trans['amount']
-            else:
-                total -= trans['amount']
+        # Arama filtresi SQL'de uygulanır; sayfalar eksik dolmaz
+        search_term = self.search_var.get().strip()
+        self.list_filters = dict(filters, search=search_term or None)
+        self.next_token = None
+        self.load_more(first_page=True)
         
-        self.total_label.config(text=f"Toplam: ₺{total:.2f}")
+        # Toplam tüm filtre sonucundan hesaplanır, yalnızca yüklenen sayfadan değil
+        self.queries.submit(
+            "total", get_transactions_summary, self.branch_id, **self.list_filters,
+            on_done=self.show_total
+        )
+    
+    def show_total(self, summary):
+        """Filtre sonucunun toplamını gösterir"""
+        self.total_label.config(text=f"Toplam: ₺{summary['net']:.2f}")
 
-        if len(self.tree.get_children()) == 0:
+        if summary['count'] == 0:
             self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
         else:
             self.empty_label.place_forget()
     
+    def load_more(self, first_page=False):
+        """Sonraki işlem sayfasını (keyset) listenin sonuna ekle"""
+        if not first_page and (not self.next_token or self.queries.is_pending("page")):
+            return
+        
+        after_date, after_id = (None, None) if first_page else self.next_token
+        self.queries.submit(
+            "page", get_transactions_page, self.branch_id,
+            after_date=after_date, after_id=after_id, **self.list_filters,
+            on_done=lambda page: self.show_page(page, first_page)
+        )
+    
+    def show_page(self, page, first_page):
+        """Gelen sayfayı listeye ekler (ilk sayfa gösterilenle karşılaştırılarak yerleşir)"""
+        transactions = page['rows']
+        c = transactions.columns
+        
+        rows = [(trans[c['id']], (
+            trans[c['id']],
+            trans[c['date']][:10],  # Sadece tarih kısmı
+            trans[c['type']],
+            f"₺{trans[c['amount']]:.2f}",
+            trans[c['payment_method']],
+            trans[c['description']] or "-"
+        ), ()) for trans in transactions]
+        if first_page:
+            self.rows.set_rows(rows)
+        else:
+            self.rows.append(rows)
+        
+        self.next_token = page['next']
+        self.loaded_label.config(text=f"Gösterilen: {len(self.rows)}")
+        self.load_more_button.config(state="normal" if self.next_token else "disabled")
+    
+    def on_tree_scroll(self, first, last):
+        """Liste sona yaklaşınca sonraki sayfayı yükle (sonsuz kaydırma)"""
+        if self.next_token and float(last) >= 0.98:
+            token = self.next_token
+            self.parent.after_idle(lambda: self.next_token is token and self.load_more())
+    
     def apply_filters(self):
         """Filtreleri uygula"""
         filters = {}
@@ -441,8 +497,10 @@ Kategori: {trans['category'] or 'Yok'}
     
     def update_summary(self):
         """Günlük özet güncelle"""
-        daily = get_daily_total(self.branch_id)
-        
+        self.queries.submit("daily", get_daily_total, self.branch_id, on_done=self.show_daily_summary)
+    
+    def show_daily_summary(self, daily):
+        """Günlük özet etiketlerini doldurur"""
         colors = {'income': '#2e7d32', 'expense': '#c62828', 'net': '#1565c0'}
         
         for key, value in daily.items():
@@ -515,7 +573,6 @@ Kategori: {trans['category'] or 'Yok'}
             return
         
         summary = get_period_summary(self.branch_id, start_date, end_date)
-        transactions = get_transactions(self.branch_id, start_date, end_date)
         
         dialog = tk.Toplevel(self.parent)
         dialog.title(f"📊 {title}")
@@ -562,28 +619,49 @@ Kategori: {trans['category'] or 'Yok'}
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         y_scroll.config(command=tree.yview)
         
-        # Verileri ekle
-        total = 0
-        for trans in transactions:
-            tree.insert("", tk.END, values=(
-                trans['date'][:10],
-                trans['type'],
-                f"₺{trans['amount']:.2f}",
-                trans['payment_method'],
-                trans['description'] or "-"
-            ))
-            total += trans['amount'] if trans['type'] == 'GELIR' else -trans['amount']
+        # Verileri sayfa sayfa ekle (keyset); devamı kaydırınca ya da butonla gelir
+        state = {'next': None}
+        
+        def load_page(first_page=False):
+            if not (first_page or state['next']):
+                return
+            after_date, after_id = (None, None) if first_page else state['next']
+            page = get_transactions_page(self.branch_id, start_date, end_date,
+                                         after_date=after_date, after_id=after_id)
+            c = page['rows'].columns
+            for trans in page['rows']:
+                tree.insert("", tk.END, values=(
+                    trans[c['date']][:10],
+                    trans[c['type']],
+                    f"₺{trans[c['amount']]:.2f}",
+                    trans[c['payment_method']],
+                    trans[c['description']] or "-"
+                ))
+            state['next'] = page['next']
+            more_button.config(state="normal" if state['next'] else "disabled")
+        
+        def on_scroll(first, last):
+            y_scroll.set(first, last)
+            if state['next'] and float(last) >= 0.98:
+                token = state['next']
+                dialog.after_idle(lambda: state['next'] is token and load_page())
+        
+        tree.config(yscrollcommand=on_scroll)
+        more_button = ttk.Button(main_frame, text="⬇ Daha Fazla Yükle", command=load_page)
+        more_button.pack(pady=(0, 5))
+        load_page(first_page=True)
         
         # Alt toplam
-        ttk.Label(main_frame, text=f"💰 Net Toplam: ₺{total:.2f}",
+        ttk.Label(main_frame, text=f"💰 Net Toplam: ₺{summary['net']:.2f}",
                 foreground="#1565c0").pack(pady=10)
         
         ttk.Button(main_frame, text="✅ Tamam", command=dialog.destroy).pack(pady=10)
     
     def export_to_excel(self):
-        """Excel raporu oluştur – HATASIZ"""
+        """Excel raporu oluştur – write-only modda, işlemler parça parça yazılır"""
         try:
             from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
             from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
         except ImportError:
             show_error(self.parent, "Eksik Kütüphane", "pip install openpyxl")
@@ -599,17 +677,28 @@ Kategori: {trans['category'] or 'Yok'}
             filters['start_date'] = self.start_date.get()
             filters['end_date'] = self.end_date.get()
 
-        transactions = get_transactions(self.branch_id, **filters)
+        batches = iter_transactions(self.branch_id, **filters)
+        first_batch = next(batches, None)
 
-        if not transactions:
+        if not first_batch:
             show_info(self.parent, "Bilgi", "Aktarılacak işlem bulunmuyor!")
             return
 
-        wb = Workbook()
+        # Dosya yolu (write-only kitap satırları doğrudan yazar)
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            initialfile=f"gelir_gider_raporu_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        )
+
+        if not file_path:
+            batches.close()
+            return
+
+        wb = Workbook(write_only=True)
 
         # 1. Sayfa: Liste
-        ws = wb.active
-        ws.title = "Gelir_Gider_Raporu"  # 🔥 BURASI DEĞİŞTİ (/) yerine (_)
+        ws = wb.create_sheet("Gelir_Gider_Raporu")  # 🔥 BURASI DEĞİŞTİ (/) yerine (_)
 
         # Stil
         header_font = Font(name="Calibri", size=12, bold=True, color="FFFFFF")
@@ -617,76 +706,75 @@ Kategori: {trans['category'] or 'Yok'}
         normal_font = Font(name="Calibri", size=10)
 
         header_fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+        income_fill = PatternFill(start_color="d4edda", end_color="d4edda", fill_type="solid")
+        expense_fill = PatternFill(start_color="f8d7da", end_color="f8d7da", fill_type="solid")
         thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
                            top=Side(style='thin'), bottom=Side(style='thin'))
 
+        def styled(value, font, fill=None, alignment=Alignment(horizontal="center")):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.font = font
+            cell.border = thin_border
+            cell.alignment = alignment
+            if fill:
+                cell.fill = fill
+            return cell
+
+        # Sütun genişlikleri (write-only modda satırlardan önce verilmeli)
+        headers = ["ID", "Tarih", "Tür", "Tutar", "Ödeme", "Açıklama"]
+        for col in range(1, len(headers) + 1):
+            ws.column_dimensions[chr(64 + col)].width = 20
+
         # Başlık
-        ws['A1'] = "GELİR / GİDER RAPORU"
-        ws['A1'].font = title_font
-        ws.merge_cells('A1:F1')
+        title_cell = WriteOnlyCell(ws, value="GELİR / GİDER RAPORU")
+        title_cell.font = title_font
+        ws.append([title_cell])
+        ws.append([])
 
         # Tarih aralığı bilgisi
         date_range = f"{self.start_date.get()} - {self.end_date.get()}" if filters else "Tüm Zamanlar"
-        ws['A3'] = f"Tarih Aralığı: {date_range}"
-        ws['A4'] = f"Rapor Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        ws.append([f"Tarih Aralığı: {date_range}"])
+        ws.append([f"Rapor Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
+        ws.append([])
 
         # Tablo başlıkları
-        headers = ["ID", "Tarih", "Tür", "Tutar", "Ödeme", "Açıklama"]
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=6, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = thin_border
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        center = Alignment(horizontal="center", vertical="center")
+        ws.append([styled(header, header_font, header_fill, center) for header in headers])
 
-        # Veriler
-        row_idx = 7
-        for trans in transactions:
-            row_data = [
-                trans['id'],
-                trans['date'][:10],
-                trans['type'],
-                f"₺{trans['amount']:.2f}",
-                trans['payment_method'],
-                trans['description'] or "-"
-            ]
+        # Veriler (özet toplamları akış sırasında birikir)
+        total_income = 0
+        total_expense = 0
+        count = 0
+        for batch in chain([first_batch], batches):
+            c = batch.columns
+            for trans in batch:
+                amount = trans[c['amount']]
+                if trans[c['type']] == 'GELIR':
+                    total_income += amount
+                    amount_fill = income_fill
+                else:
+                    total_expense += amount
+                    amount_fill = expense_fill
+                count += 1
 
-            for col_idx, value in enumerate(row_data, 1):
-                cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                cell.font = normal_font
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal="center")
-
-                # Renklendirme
-                if col_idx == 4:  # Tutar
-                    if trans['type'] == 'GELIR':
-                        cell.fill = PatternFill(start_color="d4edda", end_color="d4edda", fill_type="solid")
-                    else:
-                        cell.fill = PatternFill(start_color="f8d7da", end_color="f8d7da", fill_type="solid")
-
-            row_idx += 1
+                ws.append([
+                    styled(trans[c['id']], normal_font),
+                    styled(trans[c['date']][:10], normal_font),
+                    styled(trans[c['type']], normal_font),
+                    styled(f"₺{amount:.2f}", normal_font, amount_fill),
+                    styled(trans[c['payment_method']], normal_font),
+                    styled(trans[c['description']] or "-", normal_font)
+                ])
 
         # 2. Sayfa: Özet
         ws_summary = wb.create_sheet("Özet")
-        ws_summary.append(["Tarih Aralığı", date_range])
-        ws_summary.append(["Toplam Gelir", f"₺{sum(t['amount'] for t in transactions if t['type'] == 'GELIR'):.2f}"])
-        ws_summary.append(["Toplam Gider", f"₺{sum(t['amount'] for t in transactions if t['type'] == 'GIDER'):.2f}"])
-        ws_summary.append(["Net Kâr/Zarar", f"₺{sum(t['amount'] if t['type'] == 'GELIR' else -t['amount'] for t in transactions):.2f}"])
-        ws_summary.append(["İşlem Sayısı", len(transactions)])
-
-        # Otomatik genişlik
-        for col in range(1, len(headers) + 1):
-            ws.column_dimensions[chr(64 + col)].width = 20
         for col in range(1, 3):
             ws_summary.column_dimensions[chr(64 + col)].width = 25
+        ws_summary.append(["Tarih Aralığı", date_range])
+        ws_summary.append(["Toplam Gelir", f"₺{total_income:.2f}"])
+        ws_summary.append(["Toplam Gider", f"₺{total_expense:.2f}"])
+        ws_summary.append(["Net Kâr/Zarar", f"₺{total_income - total_expense:.2f}"])
+        ws_summary.append(["İşlem Sayısı", count])
 
-        # Dosya kaydet
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
-            initialfile=f"gelir_gider_raporu_{datetime.now().strftime('%Y%m%d_%H%M')}"
-        )
-
-        if file_path:
-            wb.save(file_path)
-            show_info(self.parent, "✅ Başarılı", f"Excel dosyası kaydedildi:\n{file_path}")
+        wb.save(file_path)
+        show_info(self.parent, "✅ Başarılı", f"Excel dosyası kaydedildi:\n{file_path}")
@@ -2,19 +2,30 @@
 import tkinter as tk
 from tkinter import ttk, filedialog
 from datetime import datetime, timedelta
+from itertools import chain
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_all_products, get_stock_movements_report
-from modules.ui_helpers import show_info, show_warning, show_error
+from database import (
+    get_all_products, iter_stock_movements_report, get_stock_movements_page,
+    get_stock_movements_summary
+)
+from modules.ui_helpers import (
+    show_info, show_warning, show_error, QueryRunner, make_busy_label, VirtualTree,
+    make_progress_label
+)
 
 class StockReportsDialog:
     def __init__(self, parent, branch_id):
         self.parent = parent
         self.branch_id = branch_id
         
+        # Keyset sayfalama durumu: aktif filtreler ve sonraki sayfanın anahtarı
+        self.report_filters = None
+        self.next_token = None
+        
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("📊 Stok Hareket Raporları")
         self.dialog.geometry("1000x650")
@@ -24,6 +35,7 @@ class StockReportsDialog:
         self.dialog.bind("<Escape>", lambda e: self.dialog.destroy())
         
         self.create_widgets()
+        self.queries = QueryRunner(self.dialog, on_busy=self.on_busy)
         self.load_report()
     
     def create_widgets(self):
@@ -75,13 +87,27 @@ class StockReportsDialog:
         self.total_out_label = ttk.Label(stats_frame, text="Çıkış: 0")
         self.total_out_label.pack(side=tk.LEFT, padx=10)
         
+        self.loaded_label = ttk.Label(stats_frame, text="", foreground="#64748b")
+        self.loaded_label.pack(side=tk.LEFT, padx=10)
+        
+        self.load_more_button = ttk.Button(
+            stats_frame,
+            text="⬇ Daha Fazla Yükle",
+            command=self.load_more,
+            state="disabled"
+        )
+        self.load_more_button.pack(side=tk.LEFT, padx=10)
+        
+        self.busy_label, self.on_busy = make_busy_label(stats_frame)
+        self.busy_label.pack(side=tk.LEFT, padx=10)
+        
         # Orta çerçeve - Rapor tablosu
         list_frame = ttk.Frame(self.dialog)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=16, pady=12)
         
         # Scrollbar'lar
-        y_scroll = tk.Scrollbar(list_frame)
-        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.y_scroll = tk.Scrollbar(list_frame)
+        self.y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
         x_scroll = tk.Scrollbar(list_frame, orient=tk.HORIZONTAL)
         x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
@@ -91,7 +117,6 @@ class StockReportsDialog:
             list_frame,
             columns=("Date", "Product", "Barcode", "Type", "Qty", "OldQty", "NewQty", "Note"),
             show="headings",
-            yscrollcommand=y_scroll.set,
             xscrollcommand=x_scroll.set
         )
         
@@ -116,8 +141,14 @@ class StockReportsDialog:
         self.tree.column("Note", width=200)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Büyük raporlarda yalnızca görünen satırlar Treeview'de tutulur
+        self.rows = VirtualTree(self.tree, self.y_scroll, on_scroll=self.on_tree_scroll,
+                                on_progress=make_progress_label(self.busy_label))
+        
+        # Renklendirme
+        self.tree.tag_configure('in', foreground='#4CAF50')
+        self.tree.tag_configure('out', foreground='#c62828')
         
-        y_scroll.config(command=self.tree.yview)
         x_scroll.config(command=self.tree.xview)
         
         # Alt çerçeve - Özet
@@ -149,7 +180,7 @@ class StockReportsDialog:
         self.combo_values = dict(combo_values)
     
     def load_report(self):
-        """Raporu yükler"""
+        """Raporu arka planda yükler (ilk sayfa ve özet ayrı sorgular)"""
         start_date = self.start_date.get()
         end_date = self.end_date.get()
         
@@ -165,65 +196,90 @@ class StockReportsDialog:
         selected_text = self.product_combo.get()
         product_id = self.combo_values.get(selected_text, 0)
         
-        # Raporu getir
-        movements = get_stock_movements_report(
-            self.branch_id,
-            product_id if product_id > 0 else None,
-            start_date,
-            end_date
+        self.report_filters = {
+            'product_id': product_id if product_id > 0 else None,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+        self.next_token = None
+        self.load_more(first_page=True)
+        
+        # Özet tüm aralığı SQL'de toplar; sayfa sorgusunu beklemeden paralel çalışır
+        filters = self.report_filters
+        self.queries.submit(
+            "summary", get_stock_movements_summary, self.branch_id, **filters,
+            on_done=lambda summary: self.update_summary(summary, filters, selected_text)
         )
+    
+    def load_more(self, first_page=False):
+        """Sonraki sayfayı (keyset) tablonun sonuna ekler"""
+        if self.report_filters is None:
+            return
+        if not first_page and (not self.next_token or self.queries.is_pending("page")):
+            return
         
-        # Treeview'i temizle
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # İstatistik değişkenleri
-        total_in = 0
-        total_out = 0
+        after_date, after_id = (None, None) if first_page else self.next_token
+        self.queries.submit(
+            "page", get_stock_movements_page,
+            self.branch_id,
+            after_date=after_date,
+            after_id=after_id,
+            **self.report_filters,
+            on_done=lambda page: self.show_page(page, first_page)
+        )
+    
+    def show_page(self, page, first_page):
+        """Gelen sayfayı tabloya ekler (ilk sayfa gösterilenle karşılaştırılarak yerleşir)"""
+        movements = page['rows']
+        c = movements.columns
         
-        # Verileri ekle
+        rows = []
         for movement in movements:
-            move_type = movement['type']
-            qty = movement['quantity']
-            
-            if move_type == "IN":
-                total_in += qty
+            if movement[c['type']] == "IN":
                 type_text = "GİRİŞ"
                 tag = 'in'
             else:
-                total_out += qty
                 type_text = "ÇIKIŞ"
                 tag = 'out'
             
-            self.tree.insert("", tk.END, values=(
-                movement['date'],
-                movement['product_name'],
-                movement['barcode'] or "-",
+            rows.append((movement[c['id']], (
+                movement[c['date']],
+                movement[c['product_name']],
+                movement[c['barcode']] or "-",
                 type_text,
-                qty,
-                movement['old_quantity'],
-                movement['new_quantity'],
-                movement['note'] or "-"
-            ), tags=(tag,))
-        
-        # Renklendirme
-        self.tree.tag_configure('in', foreground='#4CAF50')
-        self.tree.tag_configure('out', foreground='#c62828')
+                movement[c['quantity']],
+                movement[c['old_quantity']],
+                movement[c['new_quantity']],
+                movement[c['note']] or "-"
+            ), (tag,)))
+        
+        if first_page:
+            self.rows.set_rows(rows)
+        else:
+            self.rows.append(rows)
+        
+        self.next_token = page['next']
+        self.loaded_label.config(text=f"Gösterilen: {len(self.rows)}")
+        self.load_more_button.config(state="normal" if self.next_token else "disabled")
+    
+    def on_tree_scroll(self, first, last):
+        """Liste sona yaklaşınca sonraki sayfayı yükler (sonsuz kaydırma)"""
+        if self.next_token and float(last) >= 0.98:
+            token = self.next_token
+            self.dialog.after_idle(lambda: self.next_token is token and self.load_more())
+    
+    def update_summary(self, summary, filters, selected_product):
+        """İstatistikleri ve özet metnini günceller"""
+        total_in = summary['total_in']
+        total_out = summary['total_out']
         
-        # İstatistikleri güncelle
-        total_movements = len(movements)
-        self.total_movements_label.config(text=f"Toplam Hareket: {total_movements}")
+        self.total_movements_label.config(text=f"Toplam Hareket: {summary['total_movements']}")
         self.total_in_label.config(text=f"Giriş: {total_in} adet")
         self.total_out_label.config(text=f"Çıkış: {total_out} adet")
         
-        # Özet metni güncelle
-        self.update_summary(movements, total_in, total_out, start_date, end_date, selected_text)
-    
-    def update_summary(self, movements, total_in, total_out, start_date, end_date, selected_product):
-        """Özet metnini günceller"""
         self.summary_text.delete("1.0", tk.END)
         
-        if not movements:
+        if not summary['total_movements']:
             self.summary_text.insert(tk.END, "Seçilen kriterlere uygun hareket bulunamadı.")
             return
         
@@ -232,7 +288,7 @@ class StockReportsDialog:
         self.summary_text.insert(tk.END, f"{'='*50}\n\n")
         
         # Tarih aralığı
-        self.summary_text.insert(tk.END, f"📅 Tarih Aralığı: {start_date} - {end_date}\n\n")
+        self.summary_text.insert(tk.END, f"📅 Tarih Aralığı: {filters['start_date']} - {filters['end_date']}\n\n")
         
         # Ürün bilgisi
         if selected_product != "Tüm Ürünler":
@@ -244,21 +300,15 @@ class StockReportsDialog:
         self.summary_text.insert(tk.END, f"📋 Net Değişim: {total_in - total_out} adet\n\n")
         
         # En çok hareket gören ürünler
-        product_counts = {}
-        for movement in movements:
-            prod_name = movement['product_name']
-            product_counts[prod_name] = product_counts.get(prod_name, 0) + 1
-        
-        if product_counts:
-            self.summary_text.insert(tk.END, f"🔥 En Çok Hareket Gören Ürünler:\n")
-            top_products = sorted(product_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-            for i, (prod, count) in enumerate(top_products, 1):
-                self.summary_text.insert(tk.END, f"   {i}. {prod}: {count} hareket\n")
+        self.summary_text.insert(tk.END, f"🔥 En Çok Hareket Gören Ürünler:\n")
+        for i, (prod, count) in enumerate(summary['top_products'], 1):
+            self.summary_text.insert(tk.END, f"   {i}. {prod}: {count} hareket\n")
     
     def export_to_excel(self):
-        """🚀 Raporu Excel'e aktarır"""
+        """🚀 Raporu Excel'e aktarır (write-only modda, satırlar parça parça yazılır)"""
         try:
             from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
             from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
             from openpyxl.utils import get_column_letter
         except ImportError:
@@ -276,22 +326,33 @@ class StockReportsDialog:
         selected_text = self.product_combo.get()
         product_id = self.combo_values.get(selected_text, 0)
         
-        # Verileri getir
-        movements = get_stock_movements_report(
+        # Verileri akış olarak getir; boş sonucu ilk parçadan anla
+        batches = iter_stock_movements_report(
             self.branch_id,
             product_id if product_id > 0 else None,
             start_date,
             end_date
         )
+        first_batch = next(batches, None)
         
-        if not movements:
+        if not first_batch:
             show_info(self.dialog, "Bilgi", "Aktarılacak veri bulunamadı!")
             return
         
+        # Dosya yolu (write-only kitap satırları doğrudan yazar)
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            initialfile=f"stok_hareket_raporu_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        )
+        
+        if not file_path:
+            batches.close()
+            return
+        
         # Excel oluştur
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Stok Hareket Raporu"
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Stok Hareket Raporu")
         
         # Stil tanımları
         header_font = Font(name="Calibri", size=12, bold=True, color="FFFFFF")
@@ -308,86 +369,67 @@ class StockReportsDialog:
             top=Side(style='thin'),
             bottom=Side(style='thin')
         )
-        
-        # Başlık
-        ws['A1'] = "STOK HAREKET RAPORU"
-        ws['A1'].font = title_font
-        ws.merge_cells('A1:H1')
-        
-        # Filtre bilgileri
-        ws['A3'] = f"Rapor Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        ws['A4'] = f"Tarih Aralığı: {start_date} - {end_date}"
-        ws['A5'] = f"Ürün: {selected_text}"
-        
-        # Tablo başlıkları
+        center = Alignment(horizontal="center", vertical="center")
+        
+        def styled(value, font, fill=None, border=None, alignment=None):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.font = font
+            if fill:
+                cell.fill = fill
+            if border:
+                cell.border = border
+            if alignment:
+                cell.alignment = alignment
+            return cell
+        
+        # Sütun genişlikleri (write-only modda satırlardan önce verilmeli)
         headers = ["Tarih", "Ürün Adı", "Barkod", "İşlem", "Miktar", "Eski Miktar", "Yeni Miktar", "Not"]
+        widths = [20, 35, 18, 10, 10, 12, 12, 40]
+        for col_idx, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        
+        # Başlık ve filtre bilgileri
+        ws.append([styled("STOK HAREKET RAPORU", title_font)])
+        ws.append([])
+        ws.append([f"Rapor Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
+        ws.append([f"Tarih Aralığı: {start_date} - {end_date}"])
+        ws.append([f"Ürün: {selected_text}"])
+        ws.append([])
         
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=7, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = thin_border
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        # Tablo başlıkları
+        ws.append([styled(h, header_font, header_fill, thin_border, center) for h in headers])
         
         # Verileri ekle
-        row_idx = 8
-        for movement in movements:
-            move_type = movement['type']
-            row_data = [
-                movement['date'],
-                movement['product_name'],
-                movement['barcode'] or "-",
-                "GİRİŞ" if move_type == "IN" else "ÇIKIŞ",
-                movement['quantity'],
-                movement['old_quantity'],
-                movement['new_quantity'],
-                movement['note'] or "-"
-            ]
-            
-            for col_idx, value in enumerate(row_data, 1):
-                cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                cell.font = normal_font
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-                cell.fill = green_fill if move_type == "IN" else red_fill
-            
-            row_idx += 1
+        total_rows = 0
+        for batch in chain([first_batch], batches):
+            c = batch.columns
+            for movement in batch:
+                move_type = movement[c['type']]
+                fill = green_fill if move_type == "IN" else red_fill
+                row_data = [
+                    movement[c['date']],
+                    movement[c['product_name']],
+                    movement[c['barcode']] or "-",
+                    "GİRİŞ" if move_type == "IN" else "ÇIKIŞ",
+                    movement[c['quantity']],
+                    movement[c['old_quantity']],
+                    movement[c['new_quantity']],
+                    movement[c['note']] or "-"
+                ]
+                ws.append([styled(v, normal_font, fill, thin_border, center) for v in row_data])
+                total_rows += 1
         
-        # Otomatik genişlik ayarı
-        for col_idx in range(1, len(headers) + 1):
-            max_length = 0
-            column_letter = get_column_letter(col_idx)
-            
-            for row in ws.iter_rows(min_row=7, max_row=row_idx, min_col=col_idx, max_col=col_idx):
-                for cell in row:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Dosya kaydetme
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
-            initialfile=f"stok_hareket_raporu_{datetime.now().strftime('%Y%m%d_%H%M')}"
-        )
-        
-        if file_path:
-            try:
-                wb.save(file_path)
-                show_info(
-                    self.dialog,
-                    "✅ Başarılı",
-                    f"Excel dosyası kaydedildi:\n{file_path}\n\n"
-                    f"📊 Toplam {len(movements)} kayıt aktarıldı."
-                )
-            except Exception as e:
-                show_error(
-                    self.dialog,
-                    "❌ Hata",
-                    f"Excel dosyası kaydedilemedi:\n{str(e)}"
-                )
+        try:
+            wb.save(file_path)
+            show_info(
+                self.dialog,
+                "✅ Başarılı",
+                f"Excel dosyası kaydedildi:\n{file_path}\n\n"
+                f"📊 Toplam {total_rows} kayıt aktarıldı."
+            )
+        except Exception as e:
+            show_error(
+                self.dialog,
+                "❌ Hata",
+                f"Excel dosyası kaydedilemedi:\n{str(e)}"
+            )
@@ -9,13 +9,24 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import (
     get_all_products, add_product, update_product_quantity,
-    get_low_stock_products, update_product_info, fetch_one, delete_product
+    get_low_stock_products, update_product_info, fetch_one, delete_product,
+    apply_stock_movements, validate_stock_movements, search_products, SEARCH_LIMIT,
+    apply_barcode_scan, DUPLICATE_BARCODE, turkish_sort_key
 )
 
-from modules.stock_reports import StockReportsDialog
-from modules.ui_helpers import show_info, show_warning, show_error, ask_confirm, show_toast
+from modules.ui_helpers import (
+    show_info, show_warning, show_error, ask_confirm, show_toast, QueryRunner, make_busy_label,
+    VirtualTree
+)
 
 class StockTab:
+    # Gösterilen değerden sıralama anahtarı (verilmeyenler değerin kendisiyle sıralanır)
+    SORT_KEYS = {
+        "Name": turkish_sort_key,
+        "Barcode": lambda barcode: barcode.lower(),
+        "Price": lambda price: float(price.lstrip("₺")),
+    }
+    
     def __init__(self, parent, branch_id):
         self.parent = parent
         self.branch_id = branch_id
@@ -25,6 +36,7 @@ class StockTab:
         self.sort_reverse = False
         
         self.create_widgets()
+        self.queries = QueryRunner(self.parent, on_busy=self.on_busy)
         self.load_products()
     
     def create_widgets(self):
@@ -59,6 +71,12 @@ class StockTab:
             text="📉 Stok Azalt",
             command=self.decrease_stock
         ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            top_frame,
+            text="📦 Toplu Giriş/Çıkış",
+            command=self.bulk_stock_dialog
+        ).pack(side=tk.LEFT, padx=5)
         
         # Butonlar
         ttk.Button(
@@ -73,6 +91,22 @@ class StockTab:
             command=self.open_stock_reports
         ).pack(side=tk.RIGHT, padx=5)
         
+        # Barkod okuyucu modu: her okutma (Enter) stoğu 1 artırır / azaltır
+        scan_frame = ttk.Frame(self.parent)
+        scan_frame.pack(fill=tk.X, padx=16)
+        
+        ttk.Label(scan_frame, text="📷 Barkod Okut:").pack(side=tk.LEFT)
+        self.scan_entry = ttk.Entry(scan_frame, width=22)
+        self.scan_entry.pack(side=tk.LEFT, padx=5)
+        self.scan_entry.bind("<Return>", self.on_barcode_scan)
+        
+        self.scan_mode = tk.StringVar(value="IN")
+        ttk.Radiobutton(scan_frame, text="Giriş (+1)", variable=self.scan_mode, value="IN").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(scan_frame, text="Çıkış (-1)", variable=self.scan_mode, value="OUT").pack(side=tk.LEFT, padx=5)
+        
+        self.scan_status = ttk.Label(scan_frame, text="", foreground="#64748b")
+        self.scan_status.pack(side=tk.LEFT, padx=10)
+        
         # Orta çerçeve - Ürün listesi
         list_frame = ttk.Frame(self.parent)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=16, pady=8)
@@ -89,7 +123,6 @@ class StockTab:
             list_frame,
             columns=("ID", "Name", "Barcode", "Quantity", "MinStock", "Price", "Created"),
             show="headings",
-            yscrollcommand=y_scroll.set,
             xscrollcommand=x_scroll.set
         )
         
@@ -113,8 +146,9 @@ class StockTab:
             self.tree.column(col_id, width=width, anchor=anchor)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Büyük listelerde yalnızca görünen satırlar Treeview'de tutulur
+        self.rows = VirtualTree(self.tree, y_scroll)
 
-        y_scroll.config(command=self.tree.yview)
         x_scroll.config(command=self.tree.xview)
 
         self.empty_label = ttk.Label(list_frame, text="Henüz ürün yok. Yeni ürün ekleyin.", style="Empty.TLabel")
@@ -138,6 +172,9 @@ class StockTab:
         self.info_label = ttk.Label(bottom_frame, text="Toplam Ürün: 0 | Düşük Stok: 0")
         self.info_label.pack(side=tk.LEFT)
         
+        self.busy_label, self.on_busy = make_busy_label(bottom_frame)
+        self.busy_label.pack(side=tk.LEFT, padx=10)
+        
         # Refresh butonu
         ttk.Button(
             bottom_frame,
@@ -163,62 +200,51 @@ class StockTab:
         current_text = self.tree.heading(col, "text")
         self.tree.heading(col, text=f"{current_text} {arrow}")
         
-        # Ürünleri yeniden yükle
-        self.load_products()
+        # Yüklü satırlar bellekte sıralanır (veritabanına tekrar gidilmez)
+        self.rows.sort_by(col, self.sort_reverse, key=self.SORT_KEYS.get(col))
     
     def load_products(self):
-        """Ürünleri listeye yükler (sıralamalı)"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Düşük stok filtresi
-        if self.low_stock_var.get():
-            products = get_low_stock_products(self.branch_id)
-        else:
-            products = get_all_products(self.branch_id)
-        
-        # Arama filtresi
-        search_term = self.search_var.get().lower()
-        
-        # Filtrelenmiş ürünleri al
-        filtered_products = []
-        for product in products:
-            if search_term:
-                if (search_term not in product['name'].lower() and 
-                    search_term not in (product['barcode'] or '').lower()):
-                    continue
-            filtered_products.append(product)
-        
-        # SIRALA
-        if self.sort_column:
-            def sort_key(product):
-                if self.sort_column == "ID":
-                    return product['id']
-                elif self.sort_column == "Name":
-                    return product['name'].lower()
-                elif self.sort_column == "Barcode":
-                    return (product['barcode'] or "").lower()
-                elif self.sort_column == "Quantity":
-                    return product['quantity']
-                elif self.sort_column == "MinStock":
-                    return product['min_stock']
-                elif self.sort_column == "Price":
-                    # ₺ işaretini temizle
-                    return float(product['unit_price'])
-                elif self.sort_column == "Created":
-                    return product['created_date']
-                return 0
-            
-            filtered_products.sort(key=sort_key, reverse=self.sort_reverse)
+        """Ürünleri arka planda sorgular; sonuç gelince listeyi doldurur"""
+        search_term = self.search_var.get().strip()
+        low_stock = self.low_stock_var.get()
+        self.queries.submit(
+            "products", self.query_products, search_term, low_stock,
+            on_done=lambda result: self.show_products(*result)
+        )
+    
+    def query_products(self, search_term, low_stock):
+        """Worker thread'inde çalışır: Tk nesnelerine dokunmaz.
+
+        (ürünler, kesildi_mi) döner; kesildi_mi aramanın SEARCH_LIMIT'ten fazla eşleştiğini söyler.
+        """
+        # Arama FTS indeksinden, yoksa düşük stok filtresi / tüm ürünler
+        # (satırlar tuple, sütun indeksleri products.columns)
+        if search_term:
+            # Bir fazlası istenir; SEARCH_LIMIT'ten fazla eşleşme varsa kullanıcıya söylenir
+            products = search_products(
+                self.branch_id, search_term, limit=SEARCH_LIMIT + 1, compact=True, low_stock=low_stock
+            )
+            truncated = len(products) > SEARCH_LIMIT
+            del products[SEARCH_LIMIT:]
+            return products, truncated
+        elif low_stock:
+            return get_low_stock_products(self.branch_id, compact=True), False
+        return get_all_products(self.branch_id, compact=True), False
+    
+    def show_products(self, products, truncated):
+        """Ürünleri listeye yükler (yalnızca değişen / görünen satırlar Treeview'e gider)"""
+        c = products.columns
+        i_id, i_name, i_barcode = c['id'], c['name'], c['barcode']
+        i_qty, i_min, i_price, i_created = c['quantity'], c['min_stock'], c['unit_price'], c['created_date']
         
-        count = 0
+        rows = []
         low_stock_count = 0
         
-        # Sıralanmış ürünleri ekle
-        for product in filtered_products:
+        # Ürünleri ekle (seçili sütun sıralamasını VirtualTree uygular)
+        for product in products:
             # Renklendirme
-            quantity = product['quantity']
-            min_stock = product['min_stock']
+            quantity = product[i_qty]
+            min_stock = product[i_min]
             
             if quantity <= min_stock:
                 tag = 'low_stock'
@@ -226,20 +252,25 @@ class StockTab:
             else:
                 tag = 'normal'
             
-            self.tree.insert("", tk.END, values=(
-                product['id'],
-                product['name'],
-                product['barcode'] or "-",
+            rows.append((product[i_id], (
+                product[i_id],
+                product[i_name],
+                product[i_barcode] or "-",
                 quantity,
                 min_stock,
-                f"₺{product['unit_price']:.2f}",
-                product['created_date']
-            ), tags=(tag,))
-            
-            count += 1
+                f"₺{product[i_price]:.2f}",
+                product[i_created]
+            ), (tag,)))
+        
+        self.rows.set_rows(rows)
+        count = len(rows)
         
         # Bilgi etiketini güncelle
-        self.info_label.config(text=f"Toplam Ürün: {count} | Düşük Stok: {low_stock_count}")
+        if truncated:
+            count_text = f"İlk {count} eşleşme gösteriliyor (aramayı daraltın)"
+        else:
+            count_text = f"Toplam Ürün: {count}"
+        self.info_label.config(text=f"{count_text} | Düşük Stok: {low_stock_count}")
 
         if count == 0:
             self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
@@ -250,6 +281,33 @@ class StockTab:
         self.tree.tag_configure('low_stock', background='#ffebee', foreground='#c62828')
         self.tree.tag_configure('normal', background='#e8f5e9', foreground='#2e7d32')
     
+    def on_barcode_scan(self, event=None):
+        """Okutulan barkodu işler; yalnızca ilgili satırı günceller"""
+        barcode = self.scan_entry.get().strip()
+        self.scan_entry.delete(0, tk.END)
+        if not barcode:
+            return
+        
+        move_type = self.scan_mode.get()
+        result = apply_barcode_scan(self.branch_id, barcode, move_type)
+        if result is None:
+            self.scan_status.config(text=f"❌ {barcode}: bulunamadı ya da stok yetersiz", foreground="#c62828")
+            self.parent.bell()
+            return
+        
+        sign = "+1" if move_type == "IN" else "-1"
+        self.scan_status.config(
+            text=f"✅ {result['name']} ({sign}) → {result['quantity']}",
+            foreground="#2e7d32"
+        )
+        
+        values = self.rows.get(result['product_id'])
+        if values is not None:
+            min_stock = values[4]
+            tag = 'low_stock' if result['quantity'] <= min_stock else 'normal'
+            self.rows.set_value(result['product_id'], "Quantity", result['quantity'], tags=(tag,))
+            self.rows.see(result['product_id'])
+    
     def on_search_change(self, *args):
         """Arama kutusu değiştiğinde"""
         self.load_products()
@@ -345,6 +403,8 @@ class StockTab:
             show_toast(self.parent, f"Ürün eklendi: {name}")
             dialog.destroy()
             self.load_products()
+        elif product_id is DUPLICATE_BARCODE:
+            show_warning(dialog, "Barkod Kayıtlı", f"{barcode} barkodu bu şubede zaten kayıtlı!")
         else:
             show_error(dialog, "Hata", "Ürün eklenemedi!")
     
@@ -439,6 +499,149 @@ class StockTab:
         except ValueError:
             show_warning(dialog, "Hatalı Değer", "Miktar sayısal olmalı!")
     
+    def bulk_stock_dialog(self):
+        """Ürünleri arka planda yükler; gelince toplu stok penceresini açar"""
+        if self.queries.is_pending("bulk_products"):
+            return  # pencere zaten açılıyor
+        self.queries.submit(
+            "bulk_products", get_all_products, self.branch_id,
+            on_done=self.show_bulk_stock_dialog
+        )
+    
+    def show_bulk_stock_dialog(self, products):
+        """Çok satırlı stok giriş/çıkış penceresi (teslimat kabulü vb.)"""
+        if not products:
+            show_warning(self.parent, "Ürün Yok", "Önce ürün ekleyin!")
+            return
+        
+        # Ürünler id ile tutulur; aynı adlı ürünler çakışmasın diye metinde id de var
+        products_by_id = {product['id']: product for product in products}
+        product_lookup = {}  # combobox metni / barkod -> ürün id
+        combo_values = []
+        for product in products:
+            text = f"{product['name']} ({product['barcode'] or 'Barkodsuz'}) #{product['id']}"
+            combo_values.append(text)
+            product_lookup[text] = product['id']
+            if product['barcode']:
+                product_lookup[product['barcode']] = product['id']
+        
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("📦 Toplu Stok Giriş/Çıkış")
+        dialog.geometry("700x500")
+        dialog.configure(bg="#f5f7fb")
+        dialog.transient(self.parent)
+        dialog.grab_set()
+        dialog.bind("<Escape>", lambda e: dialog.destroy())
+        
+        # Satır ekleme formu
+        form = ttk.Frame(dialog)
+        form.pack(fill=tk.X, padx=10, pady=10)
+        
+        move_type = tk.StringVar(value="IN")
+        ttk.Radiobutton(form, text="Giriş", variable=move_type, value="IN").grid(row=0, column=0, padx=5)
+        ttk.Radiobutton(form, text="Çıkış", variable=move_type, value="OUT").grid(row=0, column=1, padx=5)
+        
+        ttk.Label(form, text="Ürün / Barkod:").grid(row=0, column=2, padx=5)
+        product_combo = ttk.Combobox(form, values=combo_values, width=30)
+        product_combo.grid(row=0, column=3, padx=5)
+        
+        ttk.Label(form, text="Miktar:").grid(row=0, column=4, padx=5)
+        qty_spinbox = tk.Spinbox(form, from_=1, to_=99999, width=8)
+        qty_spinbox.grid(row=0, column=5, padx=5)
+        
+        ttk.Label(form, text="Not:").grid(row=1, column=2, padx=5, pady=5, sticky="e")
+        note_entry = ttk.Entry(form, width=33)
+        note_entry.grid(row=1, column=3, padx=5, pady=5)
+        
+        # Satır listesi
+        lines_tree = ttk.Treeview(
+            dialog,
+            columns=("Type", "Product", "Qty", "Note"),
+            show="headings",
+            height=12
+        )
+        for col, text, width in [("Type", "İşlem", 70), ("Product", "Ürün", 280),
+                                 ("Qty", "Miktar", 80), ("Note", "Not", 200)]:
+            lines_tree.heading(col, text=text)
+            lines_tree.column(col, width=width, anchor="w" if col in ("Product", "Note") else "center")
+        lines_tree.pack(fill=tk.BOTH, expand=True, padx=10)
+        
+        lines = []
+        
+        def add_line(event=None):
+            product = products_by_id.get(product_lookup.get(product_combo.get().strip()))
+            if not product:
+                show_warning(dialog, "Ürün Yok", "Listeden bir ürün seçin veya barkod girin!")
+                return
+            try:
+                quantity = int(qty_spinbox.get())
+            except ValueError:
+                show_warning(dialog, "Hatalı Değer", "Miktar sayısal olmalı!")
+                return
+            if quantity <= 0:
+                show_warning(dialog, "Hatalı Miktar", "Miktar 0'dan büyük olmalı!")
+                return
+            
+            note = note_entry.get().strip()
+            lines.append((product['id'], move_type.get(), quantity, note))
+            lines_tree.insert("", tk.END, values=(
+                "GİRİŞ" if move_type.get() == "IN" else "ÇIKIŞ",
+                product['name'],
+                quantity,
+                note or "-"
+            ))
+            
+            product_combo.set("")
+            qty_spinbox.delete(0, tk.END)
+            qty_spinbox.insert(0, "1")
+            product_combo.focus_set()
+        
+        def remove_line():
+            for item in lines_tree.selection():
+                index = lines_tree.index(item)
+                lines_tree.delete(item)
+                del lines[index]
+        
+        ttk.Button(form, text="➕ Satır Ekle", command=add_line).grid(row=0, column=6, padx=5)
+        product_combo.bind("<Return>", add_line)
+        qty_spinbox.bind("<Return>", add_line)
+        
+        # Butonlar
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(pady=10)
+        
+        ttk.Button(
+            button_frame,
+            text="✅ Tümünü Uygula",
+            command=lambda: self.apply_bulk_stock(dialog, lines),
+            style="Primary.TButton"
+        ).pack(side=tk.LEFT, padx=10)
+        
+        ttk.Button(button_frame, text="🗑️ Satırı Sil", command=remove_line).pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="İptal", command=dialog.destroy).pack(side=tk.LEFT, padx=10)
+        
+        product_combo.focus_set()
+    
+    def apply_bulk_stock(self, dialog, lines):
+        """Toplu stok hareketlerini tek işlemde uygular"""
+        if not lines:
+            show_warning(dialog, "Boş Liste", "En az bir satır ekleyin!")
+            return
+        
+        errors = validate_stock_movements(self.branch_id, lines)
+        if errors:
+            show_warning(dialog, "Hatalı Satırlar", "\n".join(errors[:10]))
+            return
+        
+        new_quantities = apply_stock_movements(self.branch_id, lines)
+        
+        if new_quantities is not None:
+            show_toast(self.parent, f"{len(lines)} stok hareketi kaydedildi!")
+            dialog.destroy()
+            self.load_products()
+        else:
+            show_error(dialog, "Hata", "Stok hareketleri kaydedilemedi!")
+    
     def edit_product(self):
         """✏️ Ürün düzenleme"""
         selection = self.tree.selection()
@@ -541,6 +744,8 @@ class StockTab:
             show_toast(self.parent, f"Ürün güncellendi: {name}")
             dialog.destroy()
             self.load_products()
+        elif success is DUPLICATE_BARCODE:
+            show_warning(dialog, "Barkod Kayıtlı", f"{barcode} barkodu bu şubede zaten kayıtlı!")
         else:
             show_error(dialog, "Hata", "Ürün güncellenemedi!")
     
@@ -566,4 +771,5 @@ class StockTab:
     
     def open_stock_reports(self):
         """Stok raporları penceresini açar"""
+        from modules.stock_reports import StockReportsDialog  # yalnızca açıldığında yüklenir
         StockReportsDialog(self.parent, self.branch_id)
@@ -10,11 +10,24 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import (
     get_all_suppliers, add_supplier, update_supplier, delete_supplier,
     get_supplier_balances, add_smart_balance_transaction, get_supplier_total_balance,
-    get_due_supplier_balances, fetch_one, get_supplier_transaction_history
+    get_due_supplier_balances, fetch_one, get_supplier_transaction_history,
+    get_supplier_overview, iter_suppliers, iter_supplier_balances, count_suppliers
+)
+from modules.ui_helpers import (
+    show_info, show_warning, show_error, ask_confirm, show_toast, QueryRunner, make_busy_label,
+    TreeBinder
 )
-from modules.ui_helpers import show_info, show_warning, show_error, ask_confirm, show_toast
 
 class SupplierTab:
+    # Treeview kolonu -> get_supplier_overview sıralama anahtarı
+    SORT_KEYS = {
+        "ID": "id",
+        "Name": "name",
+        "Type": "type",
+        "Phone": "phone",
+        "TotalBalance": "balance",
+    }
+    
     def __init__(self, parent, branch_id):
         self.parent = parent
         self.branch_id = branch_id
@@ -25,6 +38,7 @@ class SupplierTab:
         self.selected_supplier_id = None
         
         self.create_widgets()
+        self.queries = QueryRunner(self.parent, on_busy=self.on_busy)
         self.load_suppliers()
         self.load_balances()
     
@@ -46,6 +60,12 @@ class SupplierTab:
             command=self.show_due_payments
         ).pack(side=tk.LEFT, padx=5)
         
+        # Arama
+        ttk.Label(supplier_frame, text="🔍 Ara:").pack(side=tk.LEFT, padx=(20, 0))
+        self.search_var = tk.StringVar()
+        self.search_var.trace("w", lambda *args: self.load_suppliers())
+        ttk.Entry(supplier_frame, textvariable=self.search_var, width=25).pack(side=tk.LEFT, padx=5)
+        
         ttk.Button(
             supplier_frame,
             text="📊 Excel Raporu",
@@ -88,6 +108,7 @@ class SupplierTab:
         self.supplier_tree.column("TotalBalance", width=100, anchor="e")
         
         self.supplier_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.supplier_rows = TreeBinder(self.supplier_tree)
         scroll_y.config(command=self.supplier_tree.yview)
 
         self.supplier_empty_label = ttk.Label(left_panel, text="Henüz toptancı yok.", style="Empty.TLabel")
@@ -144,6 +165,7 @@ class SupplierTab:
         self.balance_tree.column("Desc", width=150)
         
         self.balance_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.balance_rows = TreeBinder(self.balance_tree)
         scroll_y2.config(command=self.balance_tree.yview)
 
         self.balance_empty_label = ttk.Label(right_panel, text="Bakiye kaydı bulunmuyor.", style="Empty.TLabel")
@@ -165,6 +187,9 @@ class SupplierTab:
         self.info_label = ttk.Label(bottom_frame, text="Toptancı: 0 | Aktif Bakiye: 0 | Gecikmiş: 0")
         self.info_label.pack(side=tk.LEFT)
         
+        self.busy_label, self.on_busy = make_busy_label(bottom_frame)
+        self.busy_label.pack(side=tk.LEFT, padx=10)
+        
         ttk.Button(
             bottom_frame,
             text="🔄 Yenile",
@@ -181,32 +206,24 @@ class SupplierTab:
         self.load_suppliers()
     
     def load_suppliers(self):
-        """Toptancıları listeler"""
-        for item in self.supplier_tree.get_children():
-            self.supplier_tree.delete(item)
-        
-        suppliers = get_all_suppliers(self.branch_id)
-        
-        # Sıralama
-        if self.sort_column:
-            def sort_key(supplier):
-                if self.sort_column == "ID":
-                    return supplier['id']
-                elif self.sort_column == "Name":
-                    return supplier['name'].lower()
-                elif self.sort_column == "Type":
-                    return supplier['supplier_type'].lower()
-                elif self.sort_column == "Phone":
-                    return supplier['phone'] or ""
-                elif self.sort_column == "TotalBalance":
-                    return get_supplier_total_balance(supplier['id'])
-                return 0
-            
-            suppliers.sort(key=sort_key, reverse=self.sort_reverse)
+        """Toptancıları arka planda sorgular (sıralama ve arama SQL'de yapılır)"""
+        self.queries.submit(
+            "suppliers", get_supplier_overview,
+            self.branch_id,
+            sort=self.SORT_KEYS.get(self.sort_column, "name"),
+            direction="DESC" if self.sort_reverse else "ASC",
+            search=self.search_var.get().strip(),
+            on_done=self.show_suppliers
+        )
+    
+    def show_suppliers(self, overview):
+        """Toptancıları listeler (yalnızca değişen satırlar güncellenir)"""
+        suppliers = overview['suppliers']
         
         # Toptancıları ekle
+        rows = []
         for supplier in suppliers:
-            total_balance = get_supplier_total_balance(supplier['id'])
+            total_balance = supplier['balance']
             
             # Renklendirme
             if total_balance > 0:
@@ -216,20 +233,22 @@ class SupplierTab:
             else:
                 tag = 'neutral'
             
-            self.supplier_tree.insert("", tk.END, values=(
+            rows.append((supplier['id'], (
                 supplier['id'],
                 supplier['name'],
                 supplier['supplier_type'],
                 supplier['phone'] or "-",
                 f"₺{total_balance:.2f}"
-            ), tags=(tag,))
+            ), (tag,)))
+        
+        self.supplier_rows.update(rows)
         
         # Renk ayarları
         self.supplier_tree.tag_configure('positive', background='#e8f5e9', foreground='#2e7d32')
         self.supplier_tree.tag_configure('negative', background='#ffebee', foreground='#c62828')
         self.supplier_tree.tag_configure('neutral', background='#f5f5f5', foreground='#616161')
         
-        self.update_info_label()
+        self.update_info_label(overview)
 
         if len(suppliers) == 0:
             self.supplier_empty_label.place(relx=0.5, rely=0.5, anchor="center")
@@ -237,17 +256,22 @@ class SupplierTab:
             self.supplier_empty_label.place_forget()
     
     def load_balances(self):
-        """Bakiye hareketlerini listeler"""
-        for item in self.balance_tree.get_children():
-            self.balance_tree.delete(item)
-        
-        balances = get_supplier_balances(self.branch_id)
+        """Bakiye hareketlerini arka planda sorgular"""
+        self.queries.submit(
+            "balances", get_supplier_balances, self.branch_id, compact=True,
+            on_done=self.show_balances
+        )
+    
+    def show_balances(self, balances):
+        """Bakiye hareketlerini listeler (yalnızca değişen satırlar güncellenir)"""
+        c = balances.columns
         
+        rows = []
         for balance in balances:
             # Durum renklendirme
-            status = balance['status']
-            due_date = balance['due_date']
-            balance_type = balance['balance_type']
+            status = balance[c['status']]
+            due_date = balance[c['due_date']]
+            balance_type = balance[c['balance_type']]
             
             if status == 'GECIKMIS':
                 tag = 'late'
@@ -266,16 +290,18 @@ class SupplierTab:
             else:
                 tag = 'active'
             
-            self.balance_tree.insert("", tk.END, values=(
-                balance['id'],
-                balance['date'],
-                balance['supplier_name'],
+            rows.append((balance[c['id']], (
+                balance[c['id']],
+                balance[c['date']],
+                balance[c['supplier_name']],
                 balance_type,
-                f"₺{balance['amount']:.2f}",
+                f"₺{balance[c['amount']]:.2f}",
                 due_date or "-",
                 status,
-                balance['description'] or "-"
-            ), tags=(tag,))
+                balance[c['description']] or "-"
+            ), (tag,)))
+        
+        self.balance_rows.update(rows)
         
         # Renk ayarları
         self.balance_tree.tag_configure('late', background='#ffebee', foreground='#c62828')
@@ -289,16 +315,14 @@ class SupplierTab:
         else:
             self.balance_empty_label.place_forget()
     
-    def update_info_label(self):
+    def update_info_label(self, overview):
         """Bilgi etiketini günceller"""
-        suppliers = get_all_suppliers(self.branch_id)
-        balances = get_supplier_balances(self.branch_id)
-        
-        active_balances = len([b for b in balances if b['status'] == 'AKTIF'])
-        overdue_balances = len([b for b in balances if b['status'] == 'GECIKMIS'])
-        
+        supplier_text = f"Toptancı: {overview['supplier_count']}"
+        if overview['match_count'] != overview['supplier_count']:
+            supplier_text += f" (eşleşen: {overview['match_count']})"
         self.info_label.config(
-            text=f"Toptancı: {len(suppliers)} | Aktif Bakiye: {active_balances} | Gecikmiş: {overdue_balances}"
+            text=f"{supplier_text} | Aktif Bakiye: {overview['active_count']} "
+                 f"| Gecikmiş: {overview['overdue_count']}"
         )
     
     def show_supplier_menu(self, event):
@@ -563,7 +587,7 @@ class SupplierTab:
                     return
             
             # Akıllı ödeme işlemi
-            new_balance = add_smart_balance_transaction(
+            result = add_smart_balance_transaction(
                 supplier_id, 
                 "ODEME", 
                 amount, 
@@ -572,8 +596,8 @@ class SupplierTab:
                 transaction_date=payment_date
             )
             
-            if new_balance is not None:
-                supplier = fetch_one("SELECT * FROM suppliers WHERE id = ?", (supplier_id,))
+            if result is not None:
+                new_balance = result['new_balance']
                 if new_balance > 0:
                     show_info(self.parent, "Başarılı", f"Ödeme tamamlandı!\nYeni alacağınız: ₺{new_balance:.2f}")
                 elif new_balance < 0:
@@ -684,7 +708,7 @@ class SupplierTab:
                 return
             
             # Akıllı bakiye işlemi
-            new_balance = add_smart_balance_transaction(
+            result = add_smart_balance_transaction(
                 supplier_id,
                 transaction_type,
                 amount,
@@ -693,9 +717,8 @@ class SupplierTab:
                 transaction_date
             )
             
-            if new_balance is not None:
-                supplier = fetch_one("SELECT * FROM suppliers WHERE id = ?", (supplier_id,))
-                show_info(self.parent, "Başarılı", f"İşlem kaydedildi!\nYeni bakiye: ₺{new_balance:.2f}")
+            if result is not None:
+                show_info(self.parent, "Başarılı", f"İşlem kaydedildi!\nYeni bakiye: ₺{result['new_balance']:.2f}")
                 dialog.destroy()
                 self.load_balances()
                 self.load_suppliers()
@@ -825,6 +848,7 @@ class SupplierTab:
             show_toast(self.parent, f"Bakiye durumu güncellendi: {status}")
             dialog.destroy()
             self.load_balances()
+            self.load_suppliers()
         else:
             show_error(self.parent, "Hata", "Durum güncellenemedi!")
     
@@ -1010,9 +1034,10 @@ Açıklama: {values[7] or 'Yok'}
         except Exception as e:
             show_error(self.parent, "Hata", f"Yaklaşan ödemeler getirilirken hata oluştu:\n{str(e)}")
     def export_to_excel(self):
-        """Excel raporu oluştur - HATASIZ VERSİYON"""
+        """Excel raporu oluştur - write-only modda, kayıtlar parça parça yazılır"""
         try:
             from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
             from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
         except ImportError:
             show_error(
@@ -1023,20 +1048,28 @@ Açıklama: {values[7] or 'Yok'}
             )
             return
 
-        # Verileri getir
-        suppliers = get_all_suppliers(self.branch_id)
-        balances = get_supplier_balances(self.branch_id)
+        # Toptancı sayısı (başlıkta satırlardan önce gerekiyor)
+        supplier_count = count_suppliers(self.branch_id)
 
-        if not suppliers:
+        if not supplier_count:
             show_info(self.parent, "Bilgi", "Aktarılacak toptancı bulunmuyor!")
             return
 
+        # Dosya yolu (write-only kitap satırları doğrudan yazar)
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            initialfile=f"toptanci_raporu_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        )
+
+        if not file_path:
+            return
+
         # Excel oluştur
-        wb = Workbook()
+        wb = Workbook(write_only=True)
 
         # Toptancı sayfası
-        ws_suppliers = wb.active
-        ws_suppliers.title = "Toptancı Listesi"
+        ws_suppliers = wb.create_sheet("Toptancı Listesi")
 
         # Stil tanımları
         header_font = Font(name="Calibri", size=12, bold=True, color="FFFFFF")
@@ -1044,6 +1077,10 @@ Açıklama: {values[7] or 'Yok'}
         normal_font = Font(name="Calibri", size=10)
 
         header_fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+        green_fill = PatternFill(start_color="d4edda", end_color="d4edda", fill_type="solid")
+        red_fill = PatternFill(start_color="f8d7da", end_color="f8d7da", fill_type="solid")
+        yellow_fill = PatternFill(start_color="fff3cd", end_color="fff3cd", fill_type="solid")
+        status_fills = {'GECIKMIS': red_fill, 'ODENDI': green_fill, 'AKTIF': yellow_fill}
         thin_border = Border(
             left=Side(style='thin'),
             right=Side(style='thin'),
@@ -1051,127 +1088,98 @@ Açıklama: {values[7] or 'Yok'}
             bottom=Side(style='thin')
         )
 
+        def styled(sheet, value, font, fill=None, alignment=Alignment(horizontal="center")):
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.font = font
+            cell.border = thin_border
+            cell.alignment = alignment
+            if fill:
+                cell.fill = fill
+            return cell
+
+        # Ortak sütun genişlikleri (write-only modda satırlardan önce verilmeli)
+        width_settings = {
+            'A': 12, 'B': 20, 'C': 15, 'D': 15, 'E': 15, 'F': 12, 'G': 25
+        }
+
+        def set_widths(sheet):
+            for col_letter, width in width_settings.items():
+                sheet.column_dimensions[col_letter].width = width
+
+        set_widths(ws_suppliers)
+
         # Başlık
-        ws_suppliers['A1'] = "TOPTANCI RAPORU"
-        ws_suppliers['A1'].font = title_font
-        ws_suppliers.merge_cells('A1:E1')
+        title_cell = WriteOnlyCell(ws_suppliers, value="TOPTANCI RAPORU")
+        title_cell.font = title_font
+        ws_suppliers.append([title_cell])
+        ws_suppliers.append([])
 
         # Bilgiler
-        ws_suppliers['A3'] = f"Rapor Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        ws_suppliers['A4'] = f"Toplam Toptancı: {len(suppliers)}"
+        ws_suppliers.append([f"Rapor Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
+        ws_suppliers.append([f"Toplam Toptancı: {supplier_count}"])
+        ws_suppliers.append([])
 
         # Toptancı tablosu başlıkları
+        center = Alignment(horizontal="center", vertical="center")
         supplier_headers = ["ID", "Adı", "Türü", "Telefon", "Toplam Bakiye"]
-
-        for col_idx, header in enumerate(supplier_headers, 1):
-            cell = ws_suppliers.cell(row=6, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = thin_border
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        ws_suppliers.append([styled(ws_suppliers, h, header_font, header_fill, center) for h in supplier_headers])
 
         # Toptancı verileri
-        row_idx = 7
-        for supplier in suppliers:
-            total_balance = get_supplier_total_balance(supplier['id'])
-
-            row_data = [
-                supplier['id'],
-                supplier['name'],
-                supplier['supplier_type'],
-                supplier['phone'] or "-",
-                f"₺{total_balance:.2f}"
-            ]
-
-            for col_idx, value in enumerate(row_data, 1):
-                cell = ws_suppliers.cell(row=row_idx, column=col_idx, value=value)
-                cell.font = normal_font
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal="center")
-
-                # Renklendirme
-                if col_idx == 5:
-                    if total_balance > 0:
-                        cell.fill = PatternFill(start_color="d4edda", end_color="d4edda", fill_type="solid")
-                    elif total_balance < 0:
-                        cell.fill = PatternFill(start_color="f8d7da", end_color="f8d7da", fill_type="solid")
+        for batch in iter_suppliers(self.branch_id):
+            c = batch.columns
+            for supplier in batch:
+                total_balance = supplier[c['balance']]
+                if total_balance > 0:
+                    balance_fill = green_fill
+                elif total_balance < 0:
+                    balance_fill = red_fill
+                else:
+                    balance_fill = None
 
-            row_idx += 1
+                ws_suppliers.append([
+                    styled(ws_suppliers, supplier[c['id']], normal_font),
+                    styled(ws_suppliers, supplier[c['name']], normal_font),
+                    styled(ws_suppliers, supplier[c['supplier_type']], normal_font),
+                    styled(ws_suppliers, supplier[c['phone']] or "-", normal_font),
+                    styled(ws_suppliers, f"₺{total_balance:.2f}", normal_font, balance_fill)
+                ])
 
         # Bakiye detay sayfası
         ws_balances = wb.create_sheet("Bakiye Detayları")
+        set_widths(ws_balances)
 
         # Bakiye tablosu başlıkları
         balance_headers = ["Tarih", "Toptancı", "İşlem Türü", "Tutar", "Vade Tarihi", "Durum", "Açıklama"]
-
-        for col_idx, header in enumerate(balance_headers, 1):
-            cell = ws_balances.cell(row=1, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = thin_border
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        ws_balances.append([styled(ws_balances, h, header_font, header_fill, center) for h in balance_headers])
 
         # Bakiye verileri
-        row_idx = 2
-        for balance in balances:
-            row_data = [
-                balance['date'],
-                balance['supplier_name'],
-                balance['balance_type'],
-                f"₺{balance['amount']:.2f}",
-                balance['due_date'] or "-",
-                balance['status'],
-                balance['description'] or "-"
-            ]
-
-            for col_idx, value in enumerate(row_data, 1):
-                cell = ws_balances.cell(row=row_idx, column=col_idx, value=value)
-                cell.font = normal_font
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal="center")
-
-                # Duruma göre renklendirme
-                if col_idx == 6:
-                    status = balance['status']
-                    if status == 'GECIKMIS':
-                        cell.fill = PatternFill(start_color="f8d7da", end_color="f8d7da", fill_type="solid")
-                    elif status == 'ODENDI':
-                        cell.fill = PatternFill(start_color="d4edda", end_color="d4edda", fill_type="solid")
-                    elif status == 'AKTIF':
-                        cell.fill = PatternFill(start_color="fff3cd", end_color="fff3cd", fill_type="solid")
+        balance_count = 0
+        for batch in iter_supplier_balances(self.branch_id):
+            c = batch.columns
+            for balance in batch:
+                status = balance[c['status']]
+                ws_balances.append([
+                    styled(ws_balances, balance[c['date']], normal_font),
+                    styled(ws_balances, balance[c['supplier_name']], normal_font),
+                    styled(ws_balances, balance[c['balance_type']], normal_font),
+                    styled(ws_balances, f"₺{balance[c['amount']]:.2f}", normal_font),
+                    styled(ws_balances, balance[c['due_date']] or "-", normal_font),
+                    styled(ws_balances, status, normal_font, status_fills.get(status)),
+                    styled(ws_balances, balance[c['description']] or "-", normal_font)
+                ])
+                balance_count += 1
 
-            row_idx += 1
-
-        # 🔥 HATANIN OLDUĞU KISIM - DÜZELTİLDİ
-        # Manuel genişlik ayarı (birleştirilmiş hücreler için güvenli)
-        width_settings = {
-            'A': 12, 'B': 20, 'C': 15, 'D': 15, 'E': 15, 'F': 12, 'G': 25
-        }
-        
-        for sheet in [ws_suppliers, ws_balances]:
-            for col_letter, width in width_settings.items():
-                if width_settings.get(col_letter):
-                    sheet.column_dimensions[col_letter].width = width
-
-        # Dosya kaydet
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
-            initialfile=f"toptanci_raporu_{datetime.now().strftime('%Y%m%d_%H%M')}"
-        )
-
-        if file_path:
-            try:
-                wb.save(file_path)
-                show_info(
-                    self.parent,
-                    "✅ Başarılı",
-                    f"Excel dosyası kaydedildi:\n{file_path}\n\n"
-                    f"📊 {len(suppliers)} toptancı ve {len(balances)} bakiye kaydı aktarıldı."
-                )
-            except Exception as e:
-                show_error(
-                    self.parent,
-                    "❌ Hata",
-                    f"Excel dosyası kaydedilemedi:\n{str(e)}"
-                )
+        try:
+            wb.save(file_path)
+            show_info(
+                self.parent,
+                "✅ Başarılı",
+                f"Excel dosyası kaydedildi:\n{file_path}\n\n"
+                f"📊 {supplier_count} toptancı ve {balance_count} bakiye kaydı aktarıldı."
+            )
+        except Exception as e:
+            show_error(
+                self.parent,
+                "❌ Hata",
+                f"Excel dosyası kaydedilemedi:\n{str(e)}"
+            )
@@ -91,3 +91,505 @@ def show_toast(parent, message, duration_ms=2000):
     toast.update_idletasks()
     _center_window(toast, parent)
     toast.after(duration_ms, toast.destroy)
+
+
+# --- Arka plan sorguları ---------------------------------------------------
+# Veritabanı okumaları Tk ana thread'ini kilitlemesin diye küçük bir thread
+# havuzunda çalışır. Her worker thread'i database.py'deki thread-local
+# bağlantıyı kullandığından sorgular birbirini beklemez. Tk thread-safe
+# olmadığı için sonuç worker'dan değil, ana thread'de `after` ile
+# yoklanarak teslim edilir.
+QUERY_WORKERS = 2
+QUERY_POLL_MS = 15
+
+_query_executor = None
+
+
+def _get_query_executor():
+    global _query_executor
+    if _query_executor is None:
+        # concurrent.futures (logging ile birlikte) ilk sorguda yüklenir, açılışta değil
+        from concurrent.futures import ThreadPoolExecutor
+        _query_executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="db-query")
+    return _query_executor
+
+
+def shutdown_query_executor():
+    """Kapanışta sıradaki sorguları iptal eder, çalışanların bitmesini bekler.
+
+    Bağlantılar (shutdown_database) ancak bundan sonra kapatılmalıdır.
+    """
+    global _query_executor
+    if _query_executor is not None:
+        _query_executor.shutdown(wait=True, cancel_futures=True)
+        _query_executor = None
+
+
+class QueryRunner:
+    """Bir sekmenin arka plan sorgularını yönetir.
+
+    Aynı anahtarla (ör. "list") yeni bir istek gelince öncekinin sonucu
+    atılır: arama kutusuna hızlı yazılırken yalnızca son aramanın sonucu
+    listeye yansır. `on_busy(True/False)` bekleyen sorgu olup olmadığını
+    bildirir (yükleniyor göstergesi için).
+    """
+
+    def __init__(self, widget, on_busy=None):
+        self.widget = widget
+        self.on_busy = on_busy
+        self._pending = {}  # anahtar -> Future (en son istek)
+        self._busy = False
+
+    def submit(self, key, func, *args, on_done=None, on_error=None, **kwargs):
+        """func(*args, **kwargs)'ı arka planda çalıştırır; sonuç ana thread'de on_done'a gider"""
+        previous = self._pending.get(key)
+        if previous is not None:
+            previous.cancel()  # son istek kazanır
+        future = _get_query_executor().submit(func, *args, **kwargs)
+        self._pending[key] = future
+        self._update_busy()
+        self._poll(key, future, on_done, on_error)
+        return future
+
+    def cancel(self, key):
+        """Bekleyen isteği iptal eder; çalışmaya başladıysa sonucu yok sayılır"""
+        future = self._pending.pop(key, None)
+        if future is not None:
+            future.cancel()
+            self._update_busy()
+
+    def cancel_all(self):
+        for key in list(self._pending):
+            self.cancel(key)
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def _poll(self, key, future, on_done, on_error):
+        if not future.done():
+            try:
+                self.widget.after(QUERY_POLL_MS, self._poll, key, future, on_done, on_error)
+            except tk.TclError:
+                future.cancel()  # pencere kapandı
+            return
+
+        if self._pending.get(key) is not future:
+            return  # yerine daha yeni bir istek geldi
+        del self._pending[key]
+        self._update_busy()
+
+        if future.cancelled() or not self.widget.winfo_exists():
+            return  # iptal edildi ya da pencere kapandı
+        error = future.exception()
+        if error is not None:
+            print(f"❌ Arka plan sorgusu hatası ({key}): {error}")
+            if on_error:
+                on_error(error)
+            return
+        if on_done:
+            on_done(future.result())
+
+    def _update_busy(self):
+        busy = bool(self._pending)
+        if busy != self._busy:
+            self._busy = busy
+            if self.on_busy:
+                try:
+                    self.on_busy(busy)
+                except tk.TclError:
+                    pass
+
+
+def make_busy_label(parent):
+    """QueryRunner için "Yükleniyor" göstergesi; (label, on_busy) döner"""
+    label = ttk.Label(parent, text="", foreground="#64748b")
+
+    def on_busy(busy):
+        label.config(text="⏳ Yükleniyor..." if busy else "")
+
+    return label, on_busy
+
+
+# --- Toplu Treeview ekleme ---------------------------------------------------
+# Tek Tcl çağrısında eklenen satır sayısı (büyük listelerde her dilim ayrı after_idle'da)
+INSERT_SLICE_ROWS = 2000
+
+# Satırlar Tcl listesi olarak geçer; tkinter tuple'ları liste nesnesine çevirdiğinden
+# değerlerde boşluk / parantez için ayrıca tırnaklama gerekmez
+_BULK_INSERT_PROC = """
+proc ::ui_bulk_insert {w rows} {
+    foreach {iid values tags} $rows {
+        $w insert {} end -id $iid -values $values -tags $tags
+    }
+}
+"""
+
+
+def bulk_insert(tree, rows):
+    """(iid, değerler, etiketler) satırlarını satır başına Tk çağrısı yerine tek Tcl çağrısıyla ekler"""
+    if not rows:
+        return
+    if not tree.tk.call("info", "commands", "::ui_bulk_insert"):
+        tree.tk.eval(_BULK_INSERT_PROC)
+    flat = []
+    for row in rows:
+        flat.extend(row)
+    tree.tk.call("::ui_bulk_insert", str(tree), tuple(flat))
+
+
+def make_progress_label(label):
+    """TreeBinder / VirtualTree on_progress'i için: ilerlemeyi etikette gösterir"""
+    def on_progress(done, total):
+        label.config(text=f"⏳ {done} / {total} satır" if done < total else "")
+    return on_progress
+
+
+# --- Anahtarlı Treeview güncellemesi ----------------------------------------
+class TreeBinder:
+    """Treeview satırlarını birincil anahtara göre günceller.
+
+    Her yenilemede tüm satırları silip yeniden eklemek yerine yeni sonuç
+    gösterilenle karşılaştırılır: yalnızca silinen, eklenen ve değişen satırlar
+    için Tk çağrısı yapılır, sıra değiştiyse tek set_children ile düzeltilir.
+    Seçim ve kaydırma konumu korunur. Satırlar (anahtar, değerler, etiketler)
+    üçlüsüdür; iid olarak str(anahtar) kullanılır.
+
+    Yeni satırlar bulk_insert ile eklenir. on_progress verilmişse ve eklenecek
+    satır INSERT_SLICE_ROWS'u aşıyorsa ekleme after_idle dilimlerine bölünür,
+    arada arayüz tepki vermeye devam eder; on_progress(eklenen, toplam) çağrılır.
+    Dilimler sürerken gelen her işlem önce kalanları ekler (flush).
+    """
+
+    def __init__(self, tree, on_progress=None):
+        self.tree = tree
+        self.on_progress = on_progress
+        self._rows = {}   # iid -> (değerler, etiketler), Tk'ye sormadan karşılaştırma için
+        self._order = []  # gösterilen iid sırası
+        self._pending = []  # henüz Treeview'e eklenmemiş (iid, değerler, etiketler)
+        self._pending_total = 0
+        self._slice_job = None
+
+    def __len__(self):
+        return len(self._order)
+
+    def get(self, key):
+        """Satırın gösterilen değerleri (yoksa None)"""
+        row = self._rows.get(str(key))
+        return row[0] if row else None
+
+    def update(self, rows):
+        """Listeyi verilen satırlarla eşitler (silinenler çıkar, yeniler eklenir)"""
+        self.flush()
+        tree = self.tree
+        new_rows = {}
+        order = []
+        for key, values, tags in rows:
+            iid = str(key)
+            new_rows[iid] = (tuple(values), tuple(tags))
+            order.append(iid)
+
+        removed = [iid for iid in self._order if iid not in new_rows]
+        # Yeni satırlar sona eklenir; sonuç istenen sıra değilse tek seferde düzeltilir
+        expected = [iid for iid in self._order if iid in new_rows]
+        expected += [iid for iid in order if iid not in self._rows]
+        moved = expected != order
+        if removed or moved:
+            first = tree.yview()[0]
+        if removed:
+            tree.delete(*removed)
+
+        inserted = []
+        for iid in order:
+            row = new_rows[iid]
+            old = self._rows.get(iid)
+            if old is None:
+                inserted.append((iid,) + row)
+            elif old != row:
+                tree.item(iid, values=row[0], tags=row[1])
+        self._insert(inserted)
+
+        if moved:
+            self.flush()  # set_children tüm satırların Treeview'de olmasını ister
+            tree.set_children("", *order)
+        self._rows = new_rows
+        self._order = order
+        if removed or moved:
+            tree.yview_moveto(first)
+
+    def append(self, rows):
+        """Satırları sona ekler (keyset "daha fazla yükle" sayfaları); var olanlar güncellenir"""
+        self.flush()
+        inserted = []
+        for key, values, tags in rows:
+            iid = str(key)
+            row = (tuple(values), tuple(tags))
+            old = self._rows.get(iid)
+            if old is None:
+                inserted.append((iid,) + row)
+                self._order.append(iid)
+            elif old != row:
+                self.tree.item(iid, values=row[0], tags=row[1])
+            self._rows[iid] = row
+        self._insert(inserted)
+
+    def _insert(self, rows):
+        if not rows:
+            return
+        if self.on_progress is None or len(rows) <= INSERT_SLICE_ROWS:
+            for start in range(0, len(rows), INSERT_SLICE_ROWS):
+                bulk_insert(self.tree, rows[start:start + INSERT_SLICE_ROWS])
+            return
+        self._pending = rows
+        self._pending_total = len(rows)
+        self._insert_slice()
+
+    def _insert_slice(self):
+        self._slice_job = None
+        chunk = self._pending[:INSERT_SLICE_ROWS]
+        del self._pending[:INSERT_SLICE_ROWS]
+        bulk_insert(self.tree, chunk)
+        self.on_progress(self._pending_total - len(self._pending), self._pending_total)
+        if self._pending:
+            self._slice_job = self.tree.after_idle(self._insert_slice)
+
+    def flush(self):
+        """Dilimlere kalmış satırları hemen ekler"""
+        if not self._pending:
+            return
+        if self._slice_job is not None:
+            self.tree.after_cancel(self._slice_job)
+            self._slice_job = None
+        for start in range(0, len(self._pending), INSERT_SLICE_ROWS):
+            bulk_insert(self.tree, self._pending[start:start + INSERT_SLICE_ROWS])
+        self._pending = []
+        self.on_progress(self._pending_total, self._pending_total)
+
+    def set_value(self, key, column, value, tags=None):
+        """Tek hücreyi (ve istenirse etiketleri) günceller"""
+        self.flush()
+        iid = str(key)
+        row = self._rows.get(iid)
+        if row is None:
+            return False
+        values = list(row[0])
+        values[list(self.tree["columns"]).index(column)] = value
+        row = (tuple(values), row[1] if tags is None else tuple(tags))
+        self.tree.item(iid, values=row[0], tags=row[1])
+        self._rows[iid] = row
+        return True
+
+    def clear(self):
+        self.flush()
+        if self._order:
+            self.tree.delete(*self._order)
+        self._rows = {}
+        self._order = []
+
+
+# --- Sanal (pencereli) Treeview ---------------------------------------------
+# Bu sayıdan fazla satırda Treeview'de yalnızca görünen pencere tutulur
+VIRTUAL_ROW_THRESHOLD = 5000
+# Pencerenin altına eklenen tampon satır sayısı
+VIRTUAL_BUFFER_ROWS = 10
+
+
+class VirtualTree:
+    """Büyük listeler için pencereli Treeview.
+
+    Tüm satırlar (anahtar, değerler, etiketler) bellekte tutulur. Satır sayısı
+    `threshold`'u aşmadıkça hepsi Treeview'e konur; aşınca Treeview'de yalnızca
+    görünen satırlar ve küçük bir tampon bulunur, kaydırma çubuğu ve fare
+    tekerleği pencereyi kaydırır. Pencere TreeBinder ile güncellendiğinden bir
+    satır kaydırmak birkaç Tk çağrısıdır. SQL'den sayfa sayfa gelen listelerde
+    `on_scroll(first, last)` ile sona yaklaşıldığı anlaşılır, yeni sayfa
+    append() ile eklenir.
+    """
+
+    def __init__(self, tree, scrollbar=None, threshold=None, buffer=None, on_scroll=None, on_progress=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.threshold = VIRTUAL_ROW_THRESHOLD if threshold is None else threshold
+        self.buffer = VIRTUAL_BUFFER_ROWS if buffer is None else buffer
+        self.on_scroll = on_scroll
+        self.binder = TreeBinder(tree, on_progress=on_progress)
+        self.rows = []
+        self._positions = {}  # iid -> self.rows içindeki sıra
+        self._sort = None     # (sütun indeksi, ters, anahtar fonksiyonu)
+        self._selected = set()
+        self.offset = 0
+        self.virtual = False
+
+        tree.configure(yscrollcommand=self._on_tree_yview)
+        if scrollbar is not None:
+            scrollbar.configure(command=self._on_scrollbar)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tree.bind(sequence, self._on_wheel, add="+")
+        tree.bind("<Up>", self._on_key_up, add="+")
+        tree.bind("<Prior>", lambda e: self._scroll_pages(-1), add="+")
+        tree.bind("<Next>", lambda e: self._scroll_pages(1), add="+")
+        tree.bind("<Configure>", lambda e: self.virtual and self._render(), add="+")
+
+    def __len__(self):
+        return len(self.rows)
+
+    # --- veri ---
+    def set_rows(self, rows):
+        """Tüm satırları değiştirir (geçerli sıralama korunur)"""
+        self.rows = [(str(key), tuple(values), tuple(tags)) for key, values, tags in rows]
+        self._apply_sort()
+        self._render()
+
+    def append(self, rows):
+        """Satırları sona ekler (keyset sayfaları); var olan anahtarlar güncellenir"""
+        for key, values, tags in rows:
+            iid = str(key)
+            row = (iid, tuple(values), tuple(tags))
+            position = self._positions.get(iid)
+            if position is None:
+                self._positions[iid] = len(self.rows)
+                self.rows.append(row)
+            else:
+                self.rows[position] = row
+        if self._sort:
+            self._apply_sort()
+        self._render()
+
+    def get(self, key):
+        """Satırın değerleri (yoksa None)"""
+        position = self._positions.get(str(key))
+        return None if position is None else self.rows[position][1]
+
+    def set_value(self, key, column, value, tags=None):
+        """Tek hücreyi günceller; satır pencerede değilse yalnızca bellekte değişir"""
+        iid = str(key)
+        position = self._positions.get(iid)
+        if position is None:
+            return False
+        _, values, old_tags = self.rows[position]
+        values = list(values)
+        values[list(self.tree["columns"]).index(column)] = value
+        self.rows[position] = (iid, tuple(values), old_tags if tags is None else tuple(tags))
+        self.binder.set_value(iid, column, value, tags)
+        return True
+
+    def sort_by(self, column, reverse=False, key=None):
+        """Başlık tıklaması için: satırları sütuna göre sıralar (column=None: sıralama yok)"""
+        if column is None:
+            self._sort = None
+        else:
+            self._sort = (list(self.tree["columns"]).index(column), reverse, key)
+        self._apply_sort()
+        self._render()
+
+    def _apply_sort(self):
+        if self._sort:
+            index, reverse, key = self._sort
+            if key is None:
+                self.rows.sort(key=lambda row: row[1][index], reverse=reverse)
+            else:
+                self.rows.sort(key=lambda row: key(row[1][index]), reverse=reverse)
+        self._positions = {row[0]: i for i, row in enumerate(self.rows)}
+
+    # --- görünüm ---
+    def see(self, key):
+        """Satırı görünür yapar"""
+        iid = str(key)
+        position = self._positions.get(iid)
+        if position is None:
+            return
+        if self.virtual and not self.offset <= position < self.offset + self._visible_rows():
+            self.offset = position - self._visible_rows() // 2
+            self._render()
+        self.tree.see(iid)
+
+    def _visible_rows(self):
+        rows = self.binder._order
+        bbox = self.tree.bbox(rows[0]) if rows else None
+        if bbox:
+            row_height = bbox[3]
+        else:
+            row_height = int(ttk.Style(self.tree).lookup("Treeview", "rowheight") or 20)
+        return max(1, self.tree.winfo_height() // row_height - 1)
+
+    def _render(self):
+        total = len(self.rows)
+        self.virtual = total > self.threshold
+        if not self.virtual:
+            self.offset = 0
+            self.binder.update(self.rows)
+            return
+
+        visible = self._visible_rows()
+        self.offset = max(0, min(self.offset, total - visible))
+        window = self.rows[self.offset:self.offset + visible + self.buffer]
+
+        # Pencereden çıkan satırların seçimi bellekte tutulur
+        shown = set(self.binder._order)
+        self._selected = (self._selected - shown) | set(self.tree.selection())
+        self.binder.update(window)
+        self.tree.yview_moveto(0)
+        selection = [row[0] for row in window if row[0] in self._selected]
+        if set(selection) != set(self.tree.selection()):
+            self.tree.selection_set(selection)
+
+        first, last = self.offset / total, min(1.0, (self.offset + visible) / total)
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if self.on_scroll:
+            self.on_scroll(first, last)
+
+    def _scroll_to(self, offset):
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _scroll_pages(self, pages):
+        if not self.virtual:
+            return None
+        self._scroll_to(self.offset + pages * self._visible_rows())
+        return "break"
+
+    def _on_tree_yview(self, first, last):
+        if not self.virtual:
+            if self.scrollbar is not None:
+                self.scrollbar.set(first, last)
+            if self.on_scroll:
+                self.on_scroll(first, last)
+            return
+        # Klavye ya da see() pencerenin içinde kaydırdıysa pencereyi o kadar ilerlet
+        shift = round(float(first) * len(self.binder))
+        if shift > 0:
+            self._scroll_to(self.offset + shift)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if not self.virtual:
+            if unit:
+                self.tree.yview(action, amount, unit)
+            else:
+                self.tree.yview(action, amount)
+            return
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * len(self.rows)))
+        elif unit == "pages":
+            self._scroll_to(self.offset + int(amount) * self._visible_rows())
+        else:
+            self._scroll_to(self.offset + int(amount))
+
+    def _on_wheel(self, event):
+        if not self.virtual:
+            return None
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self._scroll_to(self.offset + step)
+        return "break"
+
+    def _on_key_up(self, event):
+        # Pencerenin en üst satırındayken yukarı ok bir önceki satırı getirir
+        if self.virtual and self.offset > 0 and self.binder._order \
+                and self.tree.focus() == self.binder._order[0]:
+            self._scroll_to(self.offset - 1)
+        return None
@@ -0,0 +1,25 @@
+# tests/conftest.py
+"""Testler için ortak fixture'lar: her test geçici bir veritabanında çalışır."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Şemaları kurulmuş boş bir test veritabanı; test bitince bağlantılar kapanır"""
+    monkeypatch.setattr(database, "DB_NAME", str(tmp_path / "test.db"))
+    database.close_all_connections()
+    database.initialize_database()
+    yield database
+    database.close_all_connections()
+
+
+@pytest.fixture
+def branch_id(db):
+    return db.create_branch("Test Şube")
@@ -0,0 +1,83 @@
+# tests/test_barcode.py
+"""Barkod çözümleme, LRU önbellek doğrulaması ve barkod okuyucu modu"""
+import sqlite3
+
+
+def _other_connection(db):
+    """Önbelleği bilmeyen başka bir istemciyi taklit eden ayrı bağlantı"""
+    conn = sqlite3.connect(db.DB_NAME, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
+
+def test_scan_updates_stock(db, branch_id):
+    product_id = db.add_product(branch_id, "Çay", "8690000000011", 5)
+
+    result = db.apply_barcode_scan(branch_id, " 8690000000011 ", "IN", 3)
+    assert result == {'product_id': product_id, 'name': "Çay", 'quantity': 8}
+    assert db.apply_barcode_scan(branch_id, "8690000000011", "OUT", 10) is None
+    assert db.apply_barcode_scan(branch_id, "0000000000000") is None
+    assert db.get_product_by_barcode(branch_id, "8690000000011")['quantity'] == 8
+
+
+def test_barcode_is_resolved_per_branch(db, branch_id):
+    other_branch = db.create_branch("Diğer Şube")
+    first = db.add_product(branch_id, "Çay", "8690000000011", 1)
+    second = db.add_product(other_branch, "Çay", "8690000000011", 1)
+
+    assert db.get_product_by_barcode(branch_id, "8690000000011")['id'] == first
+    assert db.get_product_by_barcode(other_branch, "8690000000011")['id'] == second
+
+
+def test_stale_cache_entry_is_evicted_and_resolved_again(db, branch_id):
+    old_id = db.add_product(branch_id, "Çay", "8690000000011", 5)
+    assert db.get_product_by_barcode(branch_id, "8690000000011")['id'] == old_id
+
+    # Barkod başka bir istemciden yeni ürüne taşınır; bu süreçteki önbellek haberdar değil
+    conn = _other_connection(db)
+    conn.execute("UPDATE products SET barcode = '8690000000099' WHERE id = ?", (old_id,))
+    new_id = conn.execute(
+        "INSERT INTO products (branch_id, name, name_key, barcode, quantity, created_date) "
+        "VALUES (?, 'Kahve', ?, '8690000000011', 2, '2025-01-01 00:00:00')",
+        (branch_id, db.turkish_sort_key("Kahve"))
+    ).lastrowid
+    conn.close()
+
+    product = db.get_product_by_barcode(branch_id, "8690000000011")
+    assert product['id'] == new_id
+
+    result = db.apply_barcode_scan(branch_id, "8690000000011", "IN", 1)
+    assert result == {'product_id': new_id, 'name': "Kahve", 'quantity': 3}
+    old = db.fetch_one("SELECT quantity FROM products WHERE id = ?", (old_id,))
+    assert old['quantity'] == 5
+
+
+def test_scan_does_not_move_stock_of_deleted_product(db, branch_id):
+    product_id = db.add_product(branch_id, "Çay", "8690000000011", 5)
+    assert db.apply_barcode_scan(branch_id, "8690000000011")['quantity'] == 6
+
+    conn = _other_connection(db)
+    conn.execute("DELETE FROM products WHERE id = ?", (product_id,))
+    conn.close()
+
+    assert db.apply_barcode_scan(branch_id, "8690000000011") is None
+    assert db.get_product_by_barcode(branch_id, "8690000000011") is None
+    moves = db.fetch_one("SELECT COUNT(*) AS n FROM stock_movements WHERE product_id = ?", (product_id,))
+    assert moves['n'] == 1
+
+
+def test_duplicate_barcode_is_reported(db, branch_id):
+    first = db.add_product(branch_id, "Çay", "8690000000011", 5)
+    second = db.add_product(branch_id, "Kahve", "8690000000022", 5)
+
+    assert db.add_product(branch_id, "Çay 2", "8690000000011", 1) is db.DUPLICATE_BARCODE
+    assert db.update_product_info(second, "Kahve", "8690000000011", 10, 0) is db.DUPLICATE_BARCODE
+    assert not db.DUPLICATE_BARCODE
+    assert db.get_product_by_barcode(branch_id, "8690000000011")['id'] == first
+    assert db.get_product_by_barcode(branch_id, "8690000000022")['id'] == second
+    assert [row['name'] for row in db.search_products(branch_id, "Çay")] == ["Çay"]
+
+    # Başka şubede ve boş barkodla çakışma yok
+    other_branch = db.create_branch("Diğer Şube")
+    assert db.add_product(other_branch, "Çay", "8690000000011", 1)
+    assert db.add_product(branch_id, "Su", "", 1) and db.add_product(branch_id, "Soda", "", 1)
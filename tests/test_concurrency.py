@@ -0,0 +1,70 @@
+# tests/test_concurrency.py
+"""Thread'lerin aynı veritabanına eşzamanlı yazması: kayıp güncelleme ve kilit hatası olmamalı"""
+import threading
+
+THREADS = 8
+ROUNDS = 40
+
+
+def _run_threads(db, work):
+    """work(thread_no) fonksiyonunu THREADS thread'de çalıştırır, oluşan hataları döner"""
+    errors = []
+    start = threading.Barrier(THREADS)
+
+    def runner(thread_no):
+        start.wait()
+        try:
+            work(thread_no)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close_db_connection()
+
+    threads = [threading.Thread(target=runner, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_nested_transactions_from_threads(db, branch_id):
+    product_id = db.add_product(branch_id, "Çay", "8690000000028", 0)
+
+    def work(thread_no):
+        for round_no in range(ROUNDS):
+            def write():
+                with db.transaction(immediate=True) as cursor:
+                    cursor.execute("UPDATE products SET quantity = quantity + 1 WHERE id = ?", (product_id,))
+                    with db.transaction() as inner:
+                        db._apply_stock_move(inner, product_id, "IN", 2, note=f"{thread_no}-{round_no}")
+            db.run_with_busy_retry(write)
+
+    errors = _run_threads(db, work)
+
+    assert errors == []
+    product = db.fetch_one("SELECT quantity FROM products WHERE id = ?", (product_id,))
+    assert product['quantity'] == THREADS * ROUNDS * 3
+    moves = db.fetch_one("SELECT COUNT(*) AS n FROM stock_movements WHERE product_id = ?", (product_id,))
+    assert moves['n'] == THREADS * ROUNDS
+
+
+def test_update_product_quantity_from_threads(db, branch_id, capsys):
+    start_qty = THREADS * ROUNDS
+    product_id = db.add_product(branch_id, "Şeker", "8690000000035", start_qty)
+    results = []
+
+    def work(thread_no):
+        move_type = "IN" if thread_no % 2 else "OUT"
+        for _ in range(ROUNDS):
+            results.append((move_type, db.update_product_quantity(product_id, move_type, 1)))
+
+    errors = _run_threads(db, work)
+
+    assert errors == []
+    assert "locked" not in capsys.readouterr().out
+    assert all(new_qty is not None for _, new_qty in results)
+    product = db.fetch_one("SELECT quantity FROM products WHERE id = ?", (product_id,))
+    assert product['quantity'] == start_qty
+    moves = db.fetch_one("SELECT COUNT(*) AS n FROM stock_movements WHERE product_id = ?", (product_id,))
+    assert moves['n'] == THREADS * ROUNDS
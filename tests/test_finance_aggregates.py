@@ -0,0 +1,87 @@
+# tests/test_finance_aggregates.py
+"""Rastgele ekleme/güncelleme/silme sonrası günlük toplamlar ve şube sayaçları ham tabloyla tutarlı olmalı"""
+import random
+
+import pytest
+
+TYPES = ("GELIR", "GIDER")
+METHODS = ("NAKIT", "KREDI", "BANKA")
+CATEGORIES = ("", "Kira", "Satış", "Maaş")
+OPERATIONS = 300
+
+
+def _random_fields(rng):
+    date = f"2025-0{rng.randint(1, 3)}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+    # 0.25'in katları ikili kayan noktada tam ifade edilir; toplamlar birebir karşılaştırılabilir
+    amount = rng.randint(1, 4000) * 0.25
+    return rng.choice(TYPES), amount, rng.choice(METHODS), date, rng.choice(CATEGORIES)
+
+
+def _raw_stats(db, branch_id):
+    row = db.fetch_one('''
+        SELECT COUNT(*) AS total_count,
+               COALESCE(SUM(type = 'GELIR'), 0) AS income_count,
+               COALESCE(SUM(type = 'GIDER'), 0) AS expense_count,
+               COALESCE(SUM(CASE WHEN payment_method = 'NAKIT' THEN amount END), 0) AS cash_total,
+               COALESCE(SUM(CASE WHEN payment_method = 'KREDI' THEN amount END), 0) AS credit_total,
+               COALESCE(SUM(CASE WHEN payment_method = 'BANKA' THEN amount END), 0) AS bank_total
+        FROM transactions WHERE branch_id = ?
+    ''', (branch_id,))
+    return dict(row)
+
+
+def _raw_rollup(db):
+    rows = db.fetch_all('''
+        SELECT branch_id, substr(date, 1, 10) AS day, type, COALESCE(payment_method, '') AS payment_method,
+               COALESCE(category, '') AS category, SUM(amount) AS amount, COUNT(*) AS count
+        FROM transactions GROUP BY 1, 2, 3, 4, 5
+    ''')
+    return {tuple(row[k] for k in ("branch_id", "day", "type", "payment_method", "category")):
+            (row['amount'], row['count']) for row in rows}
+
+
+def _stored_rollup(db):
+    rows = db.fetch_all("SELECT * FROM transaction_daily_rollup")
+    return {tuple(row[k] for k in ("branch_id", "day", "type", "payment_method", "category")):
+            (row['amount'], row['count']) for row in rows}
+
+
+@pytest.mark.parametrize("seed", [1, 7, 2024])
+def test_random_writes_keep_aggregates_consistent(db, seed):
+    rng = random.Random(seed)
+    branches = [db.create_branch(f"Şube {i}") for i in range(3)]
+    ids = []
+
+    for _ in range(OPERATIONS):
+        action = rng.random()
+        if action < 0.5 or not ids:
+            trans_type, amount, method, date, category = _random_fields(rng)
+            trans_id = db.add_transaction(rng.choice(branches), trans_type, amount, method, date, "test", category)
+            assert trans_id
+            ids.append(trans_id)
+        elif action < 0.8:
+            trans_type, amount, method, date, category = _random_fields(rng)
+            assert db.update_transaction(rng.choice(ids), trans_type, amount, method, date, "güncel", category)
+        else:
+            trans_id = ids.pop(rng.randrange(len(ids)))
+            assert db.delete_transaction(trans_id)
+
+    assert _stored_rollup(db) == _raw_rollup(db)
+    assert db.verify_transaction_stats() == []
+    for branch_id in branches:
+        stats = db.get_transaction_stats(branch_id)
+        raw = _raw_stats(db, branch_id)
+        for column in db.TRANSACTION_STATS_COLUMNS:
+            assert stats[column] == pytest.approx(raw[column]), column
+
+        for start, end in (("2025-01-01", "2025-01-31"), ("2025-02-10", "2025-03-05"), ("2025-01-01", "2025-03-28")):
+            summary = db.get_period_summary(branch_id, start, end)
+            raw = db.fetch_one('''
+                SELECT COALESCE(SUM(CASE WHEN type = 'GELIR' THEN amount END), 0) AS income,
+                       COALESCE(SUM(CASE WHEN type = 'GIDER' THEN amount END), 0) AS expense,
+                       COUNT(*) AS count
+                FROM transactions WHERE branch_id = ? AND date >= ? AND date < ?
+            ''', (branch_id, start, db._day_after(end)))
+            assert summary['income'] == pytest.approx(raw['income'])
+            assert summary['expense'] == pytest.approx(raw['expense'])
+            assert summary['count'] == raw['count']
@@ -0,0 +1,42 @@
+# tests/test_product_search.py
+"""search_products: şube filtreli sıralama eşiği, SQL'de düşük stok filtresi ve kısa barkod araması"""
+
+
+def _names(rows):
+    return [row['name'] for row in rows]
+
+
+def test_rank_cutoff_counts_only_branch_matches(db, branch_id, monkeypatch):
+    monkeypatch.setattr(db, "SEARCH_RANK_LIMIT", 5)
+    db.add_product(branch_id, "Green tea bag premium selection extra large box", "", 10)
+    db.add_product(branch_id, "tea", "", 10)
+    other_branch = db.create_branch("Diğer Şube")
+    for i in range(10):
+        db.add_product(other_branch, f"tea {i}", "", 10)
+
+    # Diğer şubenin eşleşmeleri sayılmaz; iki eşleşme bm25'e göre sıralanır
+    assert _names(db.search_products(branch_id, "tea")) == [
+        "tea", "Green tea bag premium selection extra large box"
+    ]
+
+
+def test_low_stock_filter_applies_before_limit(db, branch_id):
+    for i in range(5):
+        db.add_product(branch_id, f"Çay {i}", f"86900000000{i}", 50, min_stock=10)
+    db.add_product(branch_id, "Çay az", "8690000000090", 3, min_stock=10)
+    db.add_product(branch_id, "Çay bitti", "8690000000091", 0, min_stock=10)
+
+    for query in ("Çay", "Ça", "869"):
+        rows = db.search_products(branch_id, query, limit=2, low_stock=True)
+        assert sorted(_names(rows)) == ["Çay az", "Çay bitti"], query
+    assert len(db.search_products(branch_id, "Çay", limit=3)) == 3
+
+
+def test_short_digit_query_matches_barcode_prefix(db, branch_id):
+    db.add_product(branch_id, "Ayran", "8690000000001", 10)
+    db.add_product(branch_id, "86 Cola", "", 10)
+    db.add_product(branch_id, "Su", "5900000000001", 10)
+
+    assert _names(db.search_products(branch_id, "86")) == ["86 Cola", "Ayran"]
+    assert _names(db.search_products(branch_id, "5")) == ["Su"]
+    assert _names(db.search_products(branch_id, "Su")) == ["Su"]
@@ -0,0 +1,31 @@
+# tests/test_query_plans.py
+"""Sıcak sorguların indeks kullandığını ve --check-plans komutunun çalıştığını doğrular"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+DATABASE_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database.py")
+
+
+def test_check_query_plans(db, branch_id):
+    db.add_product(branch_id, "Şeker", "8690000000011", 5)
+    db.add_supplier(branch_id, "İstanbul Toptan", "Gıda")
+    assert db.check_query_plans(branch_id)
+
+
+def test_check_plans_command(tmp_path):
+    # __main__ bloğu dosyanın sonunda olmalı: komut tüm kontrolleri NameError'sız çalıştırır
+    result = subprocess.run(
+        [sys.executable, DATABASE_PY, "--check-plans"],
+        cwd=tmp_path, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Sorgu planları indeks kullanıyor" in result.stdout
+
+
+def test_check_query_plans_requires_listed_index(db, branch_id, monkeypatch):
+    monkeypatch.setitem(db.REQUIRED_PLAN_INDEXES, "get_transactions", "idx_olmayan")
+    with pytest.raises(RuntimeError, match="get_transactions: idx_olmayan kullanılmıyor"):
+        db.check_query_plans(branch_id)
@@ -0,0 +1,35 @@
+# tests/test_startup.py
+"""Açılış: güncel şemada initialize_database yazmaz, --startup-time bütçeyi denetler"""
+import main
+
+
+class _FakeRoot:
+    """report_startup_time için ekran gerektirmeyen pencere yerine geçen nesne"""
+    def update(self):
+        pass
+
+
+def test_initialize_skips_ddl_on_up_to_date_schema(db):
+    conn = db.get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        db.initialize_database()
+    finally:
+        conn.set_trace_callback(None)
+    assert statements and all(sql.lstrip().upper().startswith(("PRAGMA", "SELECT")) for sql in statements)
+
+
+def test_initialize_migrates_outdated_schema(db):
+    db.get_db_connection().execute(f"PRAGMA user_version = {db.SCHEMA_VERSION - 1}")
+    db.initialize_database()
+    assert db.get_db_connection().execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+
+
+def test_report_startup_time_checks_budget(monkeypatch, capsys):
+    monkeypatch.setattr(main, "STARTUP_BUDGET_MS", 10 ** 9)
+    assert main.report_startup_time(_FakeRoot())
+
+    monkeypatch.setattr(main, "STARTUP_BUDGET_MS", 0)
+    assert not main.report_startup_time(_FakeRoot())
+    assert "bütçeyi aştı" in capsys.readouterr().out
@@ -0,0 +1,40 @@
+# tests/test_stock_movements.py
+"""apply_stock_movements: toplu stok hareketleri ya hep ya hiç uygulanır"""
+
+
+def _quantity(db, product_id):
+    return db.fetch_one("SELECT quantity FROM products WHERE id = ?", (product_id,))['quantity']
+
+
+def _move_count(db):
+    return db.fetch_one("SELECT COUNT(*) AS n FROM stock_movements")['n']
+
+
+def test_bulk_movements_apply_in_order(db, branch_id):
+    tea = db.add_product(branch_id, "Çay", "8690000000028", 5)
+    sugar = db.add_product(branch_id, "Şeker", "8690000000035", 0)
+
+    result = db.apply_stock_movements(branch_id, [
+        (tea, "OUT", 5, "satış"),
+        (sugar, "IN", 10, "teslimat"),
+        (tea, "IN", 3, "teslimat"),
+    ])
+
+    assert result == {tea: 3, sugar: 10}
+    assert _quantity(db, tea) == 3
+    assert _move_count(db) == 3
+
+
+def test_failing_line_writes_nothing(db, branch_id):
+    tea = db.add_product(branch_id, "Çay", "8690000000028", 5)
+    sugar = db.add_product(branch_id, "Şeker", "8690000000035", 2)
+    other_branch = db.create_branch("Diğer Şube")
+    foreign = db.add_product(other_branch, "Un", "8690000000042", 9)
+
+    assert db.apply_stock_movements(branch_id, [(tea, "IN", 1, ""), (sugar, "OUT", 3, "")]) is None
+    assert db.apply_stock_movements(branch_id, [(tea, "IN", 1, ""), (foreign, "IN", 1, "")]) is None
+    assert (_quantity(db, tea), _quantity(db, sugar), _quantity(db, foreign)) == (5, 2, 9)
+    assert _move_count(db) == 0
+
+    errors = db.validate_stock_movements(branch_id, [(sugar, "OUT", 3, ""), (tea, "IN", 0, "")])
+    assert len(errors) == 2
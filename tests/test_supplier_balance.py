@@ -0,0 +1,64 @@
+# tests/test_supplier_balance.py
+"""suppliers.balance sütununun supplier_balances satırlarıyla tutarlı kalması"""
+import threading
+
+
+def _recomputed_balance(db, supplier_id):
+    return db.fetch_one('''
+        SELECT COALESCE(SUM(CASE WHEN type = 'ALACAK' THEN amount ELSE -amount END), 0) AS balance
+        FROM supplier_balances WHERE supplier_id = ? AND status = 'AKTIF'
+    ''', (supplier_id,))['balance']
+
+
+def _stored_balance(db, supplier_id):
+    return db.fetch_one("SELECT balance FROM suppliers WHERE id = ?", (supplier_id,))['balance']
+
+
+def test_status_change_updates_stored_balance(db, branch_id):
+    supplier_id = db.add_supplier(branch_id, "İstanbul Toptan", "Gıda")
+    db.add_smart_balance_transaction(supplier_id, "ALIS", 100.0)
+    db.add_smart_balance_transaction(supplier_id, "ALACAK", 30.0)
+    assert _stored_balance(db, supplier_id) == -70.0
+
+    balance_id = db.fetch_one(
+        "SELECT id FROM supplier_balances WHERE supplier_id = ? AND type = 'BORC'", (supplier_id,)
+    )['id']
+    assert db.update_balance_status(balance_id, "ODENDI")
+    assert _stored_balance(db, supplier_id) == 30.0
+    assert db.update_balance_status(balance_id, "AKTIF")
+    assert _stored_balance(db, supplier_id) == _recomputed_balance(db, supplier_id) == -70.0
+
+
+def test_concurrent_status_changes_keep_balance_consistent(db, branch_id):
+    supplier_id = db.add_supplier(branch_id, "Ankara Toptan", "Gıda")
+    for i in range(40):
+        db.add_smart_balance_transaction(supplier_id, "ALACAK", float(i + 1))
+    balance_ids = [row['id'] for row in db.fetch_all(
+        "SELECT id FROM supplier_balances WHERE supplier_id = ? ORDER BY id", (supplier_id,)
+    )]
+    results = []
+
+    def worker(thread_no):
+        for round_no in range(20):
+            balance_id = balance_ids[(thread_no * 7 + round_no) % len(balance_ids)]
+            status = "ODENDI" if (thread_no + round_no) % 2 else "AKTIF"
+            results.append(db.update_balance_status(balance_id, status))
+        db.close_db_connection()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(results)
+    assert _stored_balance(db, supplier_id) == _recomputed_balance(db, supplier_id)
+
+
+def test_returned_balance_matches_stored_balance(db, branch_id):
+    supplier_id = db.add_supplier(branch_id, "Bursa Toptan", "Gıda")
+    for transaction_type, amount in [("ALIS", 100.0), ("ODEME", 40.0), ("ALACAK", 25.0), ("BORC", 5.0)]:
+        result = db.add_smart_balance_transaction(supplier_id, transaction_type, amount)
+        assert result['new_balance'] == _stored_balance(db, supplier_id) == _recomputed_balance(db, supplier_id)
+    # ODEME satırı ODENDI yazılır ve bakiyeyi değiştirmez
+    assert _stored_balance(db, supplier_id) == -80.0
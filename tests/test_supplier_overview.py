@@ -0,0 +1,21 @@
+# tests/test_supplier_overview.py
+"""get_supplier_overview: arama varken de özet sayaçlar şube toplamıdır"""
+
+
+def test_totals_ignore_search(db, branch_id):
+    izmir = db.add_supplier(branch_id, "İzmir Toptan", "Gıda")
+    bursa = db.add_supplier(branch_id, "Bursa Tekstil", "Tekstil")
+    db.add_smart_balance_transaction(izmir, "ALACAK", 50.0)
+    db.add_smart_balance_transaction(bursa, "ALIS", 20.0)
+    db.add_smart_balance_transaction(bursa, "ALIS", 10.0)
+
+    overview = db.get_supplier_overview(branch_id, search="İzmir")
+    assert [s['id'] for s in overview['suppliers']] == [izmir]
+    assert overview['match_count'] == 1
+    assert overview['supplier_count'] == 2
+    assert overview['active_count'] == 3
+
+    overview = db.get_supplier_overview(branch_id)
+    assert overview['match_count'] == overview['supplier_count'] == 2
+    assert overview['active_count'] == 3
+
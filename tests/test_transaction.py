@@ -0,0 +1,63 @@
+# tests/test_transaction.py
+"""transaction() bağlam yöneticisinin commit/geri alma davranışı"""
+import sqlite3
+
+import pytest
+
+
+def _deferred_fk_tables(db):
+    conn = db.get_db_connection()
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+    conn.execute(
+        "CREATE TABLE child (parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED)"
+    )
+    return conn
+
+
+def test_failed_commit_rolls_back_and_resets_depth(db):
+    conn = _deferred_fk_tables(db)
+
+    # Ertelenmiş yabancı anahtar ihlali COMMIT anında hata verir
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as cursor:
+            cursor.execute("INSERT INTO child (parent_id) VALUES (99)")
+
+    assert not conn.in_transaction
+    assert db._local.depth == 0
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM child")['n'] == 0
+
+    # Bağlantı sonraki işlemler için temiz kalır
+    with db.transaction() as cursor:
+        cursor.execute("INSERT INTO parent (id) VALUES (1)")
+        cursor.execute("INSERT INTO child (parent_id) VALUES (1)")
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM child")['n'] == 1
+
+
+def test_nested_blocks_commit_once(db):
+    conn = _deferred_fk_tables(db)
+    with db.transaction() as cursor:
+        cursor.execute("INSERT INTO parent (id) VALUES (1)")
+        with db.transaction() as inner:
+            inner.execute("INSERT INTO parent (id) VALUES (2)")
+        assert conn.in_transaction
+        assert db._local.depth == 1
+    assert not conn.in_transaction
+    assert db._local.depth == 0
+    rows = db.fetch_all("SELECT id FROM parent ORDER BY id")
+    assert [row['id'] for row in rows] == [1, 2]
+
+
+def test_nested_failure_rolls_back_only_savepoint(db):
+    conn = _deferred_fk_tables(db)
+    with db.transaction() as cursor:
+        cursor.execute("INSERT INTO parent (id) VALUES (1)")
+        with pytest.raises(ValueError):
+            with db.transaction() as inner:
+                inner.execute("INSERT INTO parent (id) VALUES (2)")
+                raise ValueError("iç blok")
+        assert conn.in_transaction
+        assert db._local.depth == 1
+    assert not conn.in_transaction
+    rows = db.fetch_all("SELECT id FROM parent ORDER BY id")
+    assert [row['id'] for row in rows] == [1]
@@ -0,0 +1,18 @@
+# tests/test_transactions_search.py
+"""İşlem listesindeki serbest metin aramasının LIKE joker karakterlerini düz araması"""
+
+
+def _descriptions(db, branch_id, search):
+    page = db.get_transactions_page(branch_id, search=search, compact=False)
+    return sorted(row['description'] for row in page['rows'])
+
+
+def test_search_treats_wildcards_literally(db, branch_id):
+    for description in ("%10 indirim", "kira_ocak", "kiralama", "yol\\masrafı"):
+        db.add_transaction(branch_id, "GIDER", 50.0, "NAKIT", "2025-01-10", description)
+
+    assert _descriptions(db, branch_id, "%") == ["%10 indirim"]
+    assert _descriptions(db, branch_id, "a_o") == ["kira_ocak"]
+    assert _descriptions(db, branch_id, "\\") == ["yol\\masrafı"]
+    assert _descriptions(db, branch_id, "kira") == ["kira_ocak", "kiralama"]
+    assert len(_descriptions(db, branch_id, "50")) == 4
@@ -0,0 +1,138 @@
+# tests/test_turkish.py
+"""Türkçe büyük/küçük harf katlama, sıralama anahtarı ve ad araması"""
+import random
+import time
+
+import pytest
+
+import database
+
+
+def test_fold_dotted_and_dotless_i():
+    assert database.turkish_fold("IŞIK") == "ışık"
+    assert database.turkish_fold("İSTANBUL") == "istanbul"
+    assert database.turkish_fold("Irmak") == "ırmak"
+
+
+def test_fold_circumflex():
+    assert database.turkish_fold("Kâğıt") == "kağıt"
+    assert database.turkish_fold("KÂĞIT") == "kağıt"
+    assert database.turkish_fold("İslâmî") == "islami"
+    assert database.turkish_fold("Ûmit") == "umit"
+    assert database.turkish_sort_key("Kâğıt") == database.turkish_sort_key("KAĞIT")
+
+
+def test_sort_key_follows_turkish_alphabet():
+    names = ["Zeytin", "Çay", "ışık", "İncir", "Üzüm", "Ceviz", "Şeker", "Irmak", "Kâğıt", "kalem", "Sabun"]
+    assert sorted(names, key=database.turkish_sort_key) == [
+        "Ceviz", "Çay", "Irmak", "ışık", "İncir", "Kâğıt", "kalem", "Sabun", "Şeker", "Üzüm", "Zeytin",
+    ]
+
+
+def test_prefix_listing_is_case_and_circumflex_insensitive(db, branch_id):
+    for name in ("Kâğıt Havlu", "kağıt mendil", "Kalem", "Irmak Suyu", "İnce Kalem"):
+        db.add_product(branch_id, name, None, 1)
+
+    def names(prefix):
+        return [row['name'] for row in db.get_all_products(branch_id, prefix=prefix)]
+
+    assert names("KAĞ") == ["Kâğıt Havlu", "kağıt mendil"]
+    assert names("kâ") == ["Kâğıt Havlu", "kağıt mendil", "Kalem"]
+    assert names("ır") == ["Irmak Suyu"]
+    assert names("İN") == ["İnce Kalem"]
+
+
+def test_migration_recomputes_name_keys(db, branch_id):
+    product_id = db.add_product(branch_id, "Kâğıt", None, 1)
+    # Şapkalar katlanmadan önce hesaplanmış eski anahtarı taklit et
+    old_key = "kâğıt".translate(db._TURKISH_KEY_TABLE)
+    db.execute_query("UPDATE products SET name_key = ? WHERE id = ?", (old_key, product_id))
+    db.execute_query("PRAGMA user_version = 9")
+
+    db.initialize_database()
+
+    row = db.fetch_one("SELECT name_key FROM products WHERE id = ?", (product_id,))
+    assert row['name_key'] == db.turkish_sort_key("kağıt")
+
+
+def _search(db, branch_id, query):
+    return sorted(row['name'] for row in db.search_products(branch_id, query))
+
+
+@pytest.mark.skipif(not database.HAS_FTS5_TRIGRAM, reason="FTS5 trigram yok")
+def test_search_folds_turkish_letters(db, branch_id):
+    for name, barcode in (("Irmak Suyu", "8690000000011"), ("Işıklı Ayna", None),
+                          ("Kâğıt Havlu", "ABC-123"), ("İnce Kalem", None), ("Sabun", None)):
+        db.add_product(branch_id, name, barcode, 1)
+
+    assert _search(db, branch_id, "ırm") == ["Irmak Suyu"]
+    assert _search(db, branch_id, "IRM") == ["Irmak Suyu"]
+    assert _search(db, branch_id, "ışı") == ["Işıklı Ayna"]
+    assert _search(db, branch_id, "IŞI") == ["Işıklı Ayna"]
+    assert _search(db, branch_id, "kağ") == ["Kâğıt Havlu"]
+    assert _search(db, branch_id, "KÂĞIT") == ["Kâğıt Havlu"]
+    assert _search(db, branch_id, "ince") == ["İnce Kalem"]
+    assert _search(db, branch_id, "kalem") == ["İnce Kalem"]
+    # ı ile i ayrı harflerdir
+    assert _search(db, branch_id, "ırmı") == []
+    # Barkod içinde de aranır
+    assert _search(db, branch_id, "0000011") == ["Irmak Suyu"]
+    assert _search(db, branch_id, "abc-1") == ["Kâğıt Havlu"]
+
+
+@pytest.mark.skipif(not database.HAS_FTS5_TRIGRAM, reason="FTS5 trigram yok")
+def test_search_index_follows_updates_and_deletes(db, branch_id):
+    product_id = db.add_product(branch_id, "Irmak Suyu", None, 1)
+    assert db.update_product_info(product_id, "Işıl Sabun", "555", 10, 0)
+    assert _search(db, branch_id, "ırm") == []
+    assert _search(db, branch_id, "IŞIL") == ["Işıl Sabun"]
+    assert db.delete_product(product_id)
+    assert _search(db, branch_id, "ışıl") == []
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM products_fts WHERE products_fts MATCH ?",
+                        (db._product_search_phrase("sabun"),))['n'] == 0
+
+
+@pytest.mark.skipif(not database.HAS_FTS5_TRIGRAM, reason="FTS5 trigram yok")
+def test_migration_rebuilds_old_search_index(db, branch_id):
+    db.add_product(branch_id, "Kâğıt Havlu", None, 1)
+    # Sürüm 10'daki ham ad üzerindeki indeksi taklit et
+    with db.transaction() as cursor:
+        cursor.execute("DROP TABLE products_fts")
+        cursor.execute('''
+            CREATE VIRTUAL TABLE products_fts USING fts5(
+                name, barcode, content='products', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+        cursor.execute("PRAGMA user_version = 10")
+
+    db.initialize_database()
+
+    assert _search(db, branch_id, "kağ") == ["Kâğıt Havlu"]
+
+
+@pytest.mark.skipif(not database.HAS_FTS5_TRIGRAM, reason="FTS5 trigram yok")
+def test_search_speed_on_large_catalog(db, branch_id):
+    words = ["Irmak", "Suyu", "Işıklı", "Lamba", "Kâğıt", "Havlu", "Çay", "Şeker", "İncir", "Üzüm", "Sabun"]
+    rng = random.Random(16)
+    with db.transaction() as cursor:
+        for i in range(20000):
+            name = " ".join(rng.choice(words) for _ in range(3)) + f" {i}"
+            cursor.execute('''
+                INSERT INTO products (branch_id, name, name_key, barcode, quantity, created_date)
+                VALUES (?, ?, ?, ?, 0, '2025-01-01 00:00:00')
+            ''', (branch_id, name, db.turkish_sort_key(name), f"869{i:010d}"))
+    db.rebuild_product_search()
+
+    for query in ("ırm", "IŞIKLI", "kâğıt hav", "8690000012"):
+        rows = db.search_products(branch_id, query)
+        assert rows
+        assert all(query.lower() in row['barcode'].lower()
+                   or db.turkish_sort_key(query) in row['name_key'] for row in rows)
+        started = time.perf_counter()
+        for _ in range(10):
+            db.search_products(branch_id, query)
+        # Sınır yavaş makineler için geniş tutuldu (burada 2-15 ms)
+        assert (time.perf_counter() - started) / 10 < 0.1, query
+    # Arama FTS eşleşmelerinden başlar, products tablosunu taramaz
+    assert db.check_query_plans(branch_id)
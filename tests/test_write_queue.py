@@ -0,0 +1,90 @@
+# tests/test_write_queue.py
+"""WriteQueue: gönderim sırası, istek başına hata yalıtımı ve flush/stop dayanıklılığı"""
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def writer(db):
+    queue = db.WriteQueue(interval_ms=20).start()
+    yield queue
+    queue.stop()
+
+
+def _committed_count(db, query, params=()):
+    """Yazıcıdan bağımsız, yeni bir bağlantıdan commit edilmiş satırları sayar"""
+    conn = sqlite3.connect(db.DB_NAME)
+    try:
+        return conn.execute(query, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_requests_apply_in_submit_order(db, branch_id, writer):
+    futures = [writer.submit(db.add_transaction, branch_id, "GELIR", float(i + 1), "NAKIT",
+                             "2025-01-01", f"sıra {i}") for i in range(300)]
+    ids = [future.result(timeout=10) for future in futures]
+
+    assert all(ids)
+    assert ids == sorted(ids)
+    rows = db.fetch_all("SELECT description FROM transactions WHERE branch_id = ? ORDER BY id", (branch_id,))
+    assert [row['description'] for row in rows] == [f"sıra {i}" for i in range(300)]
+    # İstekler toplu işlemlerde uygulanmış olmalı
+    assert writer.batches < len(ids)
+
+
+def test_later_request_sees_earlier_writes(db, branch_id, writer):
+    product_id = writer.submit(db.add_product, branch_id, "Çay", "8690000000011", 0).result(timeout=10)
+    futures = [writer.submit(db.update_product_quantity, product_id, "IN", 1) for _ in range(50)]
+    assert [future.result(timeout=10) for future in futures] == list(range(1, 51))
+
+
+def test_failing_request_is_isolated_in_its_savepoint(db, branch_id):
+    # Uzun aralık: tüm istekler aynı toplu işleme düşsün
+    writer = db.WriteQueue(interval_ms=200).start()
+
+    def failing():
+        db.execute_query(
+            "INSERT INTO transactions (branch_id, type, amount, payment_method, date, description) "
+            "VALUES (?, 'GIDER', 5, 'NAKIT', '2025-01-01 00:00:00', 'geri alınmalı')", (branch_id,)
+        )
+        raise ValueError("istek hatası")
+
+    try:
+        futures = [writer.submit(db.add_transaction, branch_id, "GELIR", 10.0, "NAKIT", "2025-01-01", "önce"),
+                   writer.submit(failing),
+                   writer.submit(db.add_transaction, branch_id, "GELIR", 20.0, "NAKIT", "2025-01-01", "sonra")]
+        assert futures[0].result(timeout=10)
+        with pytest.raises(ValueError, match="istek hatası"):
+            futures[1].result(timeout=10)
+        assert futures[2].result(timeout=10)
+        assert writer.batches == 1
+    finally:
+        writer.stop()
+
+    descriptions = db.fetch_all("SELECT description FROM transactions ORDER BY id")
+    assert [row['description'] for row in descriptions] == ["önce", "sonra"]
+    assert db.verify_transaction_stats() == []
+
+
+def test_flush_commits_everything_submitted(db, branch_id, writer):
+    futures = [writer.submit(db.add_transaction, branch_id, "GIDER", 1.0, "KREDI", "2025-01-02")
+               for _ in range(120)]
+    writer.flush()
+
+    assert all(future.done() for future in futures)
+    assert _committed_count(db, "SELECT COUNT(*) FROM transactions WHERE branch_id = ?", (branch_id,)) == 120
+
+
+def test_stop_drains_the_queue(db, branch_id):
+    writer = db.WriteQueue(interval_ms=50, max_ops=25).start()
+    futures = [writer.submit(db.add_transaction, branch_id, "GELIR", 2.0, "BANKA", "2025-01-03")
+               for _ in range(200)]
+    writer.stop()
+
+    assert all(future.done() and future.result() for future in futures)
+    assert _committed_count(db, "SELECT COUNT(*) FROM transactions WHERE branch_id = ?", (branch_id,)) == 200
+    assert writer.batches >= 200 // 25
+    with pytest.raises(RuntimeError):
+        writer.submit(db.add_transaction, branch_id, "GELIR", 1.0, "NAKIT")